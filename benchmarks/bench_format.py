@@ -0,0 +1,103 @@
+"""Benchmark dei formati di output di _fmt.
+
+Misura byte prodotti e tempo di serializzazione per ogni formato su risposte
+realistiche generate localmente (nessuna chiamata API):
+
+- keyword_serp: 100 keyword × 50 risultati organici;
+- project_keywords: 5000 keyword monitorate con trend mensile.
+
+Uso: uv run python benchmarks/bench_format.py
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import time
+
+os.environ.setdefault("SEOZOOM_API_KEY", "benchmark")
+os.environ.setdefault("SEOZOOM_LEDGER_PATH", "off")
+# Misura il formato completo: senza paginazione in handle e prima pagina
+os.environ["SEOZOOM_RESULT_MAX_BYTES"] = "0"
+
+from seozoom_mcp.server import _fmt  # noqa: E402
+
+INTENTS = ["informational", "commercial", "transactional", "navigational"]
+WORDS = ["scarpe", "running", "uomo", "donna", "offerte", "nike", "adidas", "trail", "bambino", "estive"]
+
+
+def _keyword(rng: random.Random) -> str:
+    return " ".join(rng.sample(WORDS, rng.randint(2, 4)))
+
+
+def serp_fixture(rng: random.Random, keywords: int = 100, results: int = 50) -> dict:
+    response = []
+    for _ in range(keywords):
+        kw = _keyword(rng)
+        response.append({
+            "keyword": kw,
+            "results": [
+                {
+                    "position": pos,
+                    "url": f"https://www.sito{rng.randint(1, 500)}.it/{kw.replace(' ', '-')}/{pos}",
+                    "domain": f"sito{rng.randint(1, 500)}.it",
+                    "title": f"{kw.title()} – Guida e offerte {pos}",
+                    "pza": rng.randint(1, 100),
+                }
+                for pos in range(1, results + 1)
+            ],
+        })
+    return {"UnitsUsed": keywords * 50, "UnitsRemaining": 100000, "ResultRows": keywords, "response": response}
+
+
+def project_keywords_fixture(rng: random.Random, rows: int = 5000) -> dict:
+    response = [
+        {
+            "keyword": _keyword(rng),
+            "volume": rng.randint(10, 100000),
+            "position": rng.randint(1, 100),
+            "url": f"https://www.example.it/pagina-{rng.randint(1, 800)}",
+            "traffic": rng.randint(0, 5000),
+            "cpc": round(rng.uniform(0, 3), 2),
+            "kd": rng.randint(0, 100),
+            "intent": rng.choice(INTENTS),
+            "trend": [rng.randint(0, 100) for _ in range(12)],
+        }
+        for _ in range(rows)
+    ]
+    return {"UnitsUsed": rows * 10, "UnitsRemaining": 100000, "ResultRows": rows, "response": response}
+
+
+MODES: list[tuple[str, dict]] = [
+    ("json", {}),
+    ("compact", {"format": "compact"}),
+    ("table", {"format": "table"}),
+    ("csv", {"format": "csv"}),
+    ("table + fields", {"format": "table", "fields": ["keyword", "volume", "position", "url"]}),
+    ("table + top 100 per volume", {"format": "table", "sort": "-volume", "top": 100}),
+]
+
+
+def bench(name: str, data: dict, repeat: int = 5) -> None:
+    print(f"\n{name}")
+    print(f"{'modo':<28}{'byte':>12}{'vs json':>10}{'ms':>10}")
+    baseline = None
+    for label, options in MODES:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            out = _fmt(data, **options)
+            best = min(best, time.perf_counter() - start)
+        size = len(out.encode("utf-8"))
+        baseline = baseline or size
+        print(f"{label:<28}{size:>12,}{size / baseline:>9.0%}{best * 1000:>10.1f}")
+
+
+def main() -> None:
+    rng = random.Random(42)
+    bench("keyword_serp (100 keyword × 50 risultati)", serp_fixture(rng))
+    bench("project_keywords (5000 righe)", project_keywords_fixture(rng))
+
+
+if __name__ == "__main__":
+    main()
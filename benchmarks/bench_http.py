@@ -0,0 +1,164 @@
+"""Load test del server streamable HTTP (`seozoom-mcp http`) contro il simulatore locale.
+
+Avvia il server in un processo separato, con SEOZoomClient collegato a
+SEOZoomSimulator, e apre N sessioni MCP contemporanee via HTTP. Ogni sessione
+esegue le sue chiamate di tool in sequenza; le sessioni chiedono in parte gli
+stessi domini e le stesse keyword, così si vede l'effetto di pool, cache e
+deduplica condivisi. Riporta chiamate al secondo, latenza p50/p99, errori e le
+richieste arrivate al simulatore (da server_metrics).
+
+Uso: uv run python benchmarks/bench_http.py [--sessions 50] [--calls 20] [--workers 1] [--latency 0.05]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR))
+os.environ.setdefault("SEOZOOM_API_KEY", "benchmark")
+
+# Chiamate della i-esima iterazione di una sessione: valori in un insieme piccolo,
+# condiviso tra le sessioni
+CALLS: list[tuple[str, Any]] = [
+    ("keyword_metrics", lambda i: {"keywords": [f"scarpe running {i % 25}"]}),
+    ("domain_authority", lambda i: {"domains": [f"sito{i % 25}.it"]}),
+    ("domain_metrics", lambda i: {"domains": [f"sito{i % 25}.it", f"blog{i % 10}.it"]}),
+    ("keyword_serp", lambda i: {"keywords": [f"regime forfettario {i % 25}"]}),
+]
+
+
+def simulated_app() -> Any:
+    """Factory uvicorn: app HTTP del server con il client collegato al simulatore."""
+    import logging
+
+    from simulator import SEOZoomSimulator
+
+    from seozoom_mcp import server
+    from seozoom_mcp.client import SEOZoomClient
+    from seozoom_mcp.units import UnitLedger
+
+    logging.getLogger().setLevel(logging.WARNING)
+    simulator = SEOZoomSimulator(latency=float(os.environ.get("BENCH_LATENCY", "0.05")))
+    server._client = SEOZoomClient(transport=simulator, units=UnitLedger())
+    return server.http_app()
+
+
+def serve(port: int, workers: int) -> None:
+    """Processo server: uvicorn con uno o più worker."""
+    import uvicorn
+
+    os.environ["SEOZOOM_HTTP_HOST"] = "127.0.0.1"
+    if workers > 1:
+        os.environ["SEOZOOM_HTTP_STATELESS"] = "1"
+    uvicorn.run("bench_http:simulated_app", factory=True, host="127.0.0.1", port=port, workers=workers,
+                log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Il server non risponde su {url}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamable_http_client
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    env = {
+        **os.environ,
+        "BENCH_LATENCY": str(args.latency),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(BENCH_DIR), str(BENCH_DIR.parent / "src"), os.environ.get("PYTHONPATH")])),
+        # Stato su file temporanei: il benchmark non tocca la cache dell'utente
+        "SEOZOOM_LEDGER_PATH": "off",
+        "SEOZOOM_HISTORY_PATH": "off",
+        "SEOZOOM_CACHE": "sqlite" if args.workers > 1 else "memory",
+        "SEOZOOM_CACHE_PATH": str(Path(os.environ.get("TMPDIR", "/tmp")) / f"seozoom-bench-{port}.sqlite3"),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--port", str(port), "--workers", str(args.workers)], env=env
+    )
+    latencies: list[float] = []
+    errors = 0
+    try:
+        await wait_ready(url)
+
+        async def session(n: int) -> None:
+            nonlocal errors
+            async with streamable_http_client(url) as (read, write, _), ClientSession(read, write) as s:
+                await s.initialize()
+                for i in range(args.calls):
+                    name, make_args = CALLS[(n + i) % len(CALLS)]
+                    start = time.perf_counter()
+                    try:
+                        result = await s.call_tool(name, make_args(n + i))
+                        errors += bool(result.isError)
+                    except Exception:
+                        errors += 1
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(session(n) for n in range(args.sessions)))
+        elapsed = time.perf_counter() - start
+
+        async with streamable_http_client(url) as (read, write, _), ClientSession(read, write) as s:
+            await s.initialize()
+            metrics = json.loads((await s.call_tool("server_metrics", {})).content[0].text)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    counters = metrics.get("counters", {})
+    total = args.sessions * args.calls
+    print(f"Sessioni: {args.sessions} | chiamate: {total} | worker: {args.workers} | latenza API: {args.latency}s")
+    print(f"Throughput: {total / elapsed:.1f} calls/s in {elapsed:.2f}s | errori: {errors}")
+    ordered = sorted(latencies)
+    print(f"Latenza p50: {statistics.median(ordered):.1f} ms | p99: {ordered[int(0.99 * (len(ordered) - 1))]:.1f} ms")
+    scope = " (solo il worker che ha risposto)" if args.workers > 1 else ""
+    print(f"Richieste HTTP al simulatore{scope}: {int(sum(counters.get('http_requests_total', {}).values()))}"
+          f" | cache hit: {int(sum(counters.get('cache_hits_total', {}).values()))}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help="sessioni MCP contemporanee")
+    parser.add_argument("--calls", type=int, default=20, help="chiamate di tool per sessione")
+    parser.add_argument("--workers", type=int, default=1, help="processi worker del server")
+    parser.add_argument("--latency", type=float, default=0.05, help="latenza simulata delle API (secondi)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.port, args.workers)
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
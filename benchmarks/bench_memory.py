@@ -0,0 +1,139 @@
+"""Benchmark della memoria: risposte decodificate in dizionari o in righe compatte.
+
+Ogni caso gira in un processo separato con tracemalloc attivo:
+
+- decode: una risposta di domain_keywords con N righe, decodificata con
+  json.loads come resp.json() ("dict") oppure a blocchi da 64 KB con
+  StreamDecoder ("compact");
+- export: export paginato di un dominio con N keyword attraverso il client,
+  il simulatore e la cache in memoria, scrivendo le righe come
+  domain_keywords_export. "dict" pagina domain_keywords come prima di
+  Records, "compact" usa domain_keywords_pages.
+
+Riporta il picco e la memoria ancora occupata a fine caso (tracemalloc, per
+l'export comprende le pagine in cache), l'RSS massimo del processo e il tempo.
+
+Uso: uv run python benchmarks/bench_memory.py [--rows 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR))
+os.environ.setdefault("SEOZOOM_API_KEY", "benchmark")
+os.environ.setdefault("SEOZOOM_LEDGER_PATH", "off")
+os.environ.setdefault("SEOZOOM_HISTORY_PATH", "off")
+os.environ.setdefault("SEOZOOM_KEYWORD_INDEX_PATH", "off")
+
+from simulator import CHUNK_SIZE, SEOZoomSimulator, _ranked_keyword, _rng  # noqa: E402
+
+from seozoom_mcp.cache import MemoryCache  # noqa: E402
+from seozoom_mcp.client import DEFAULT_PAGE_SIZE, DEFAULT_PREFETCH, SEOZoomClient  # noqa: E402
+from seozoom_mcp.records import StreamDecoder  # noqa: E402
+from seozoom_mcp.units import UnitLedger  # noqa: E402
+
+CASES = ["decode dict", "decode compact", "export dict", "export compact"]
+
+
+def _measure(payload: int | None, seconds: float) -> dict[str, Any]:
+    """Memoria tracciata (con i dati decodificati ancora in uso) e RSS massimo del processo."""
+    current, peak = tracemalloc.get_traced_memory()
+    # ru_maxrss è in KB su Linux, in byte su macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {"payload": payload, "seconds": seconds, "peak": peak, "retained": current, "rss": rss}
+
+
+def decode(rows: int, compact: bool) -> dict[str, Any]:
+    body = {"UnitsUsed": rows * 10, "UnitsRemaining": 10_000_000, "ResultRows": rows,
+            "response": [_ranked_keyword(_rng("bench", i), "esempio.it") for i in range(rows)]}
+    raw = json.dumps(body).encode()
+    del body
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    if compact:
+        decoder = StreamDecoder()
+        for i in range(0, len(raw), CHUNK_SIZE):
+            decoder.feed(raw[i:i + CHUNK_SIZE])
+        data = decoder.close()
+    else:
+        data = json.loads(raw)
+    elapsed = time.perf_counter() - start
+    assert len(data["response"]) == rows
+    return _measure(len(raw), elapsed)
+
+
+async def export(rows: int, compact: bool) -> dict[str, Any]:
+    client = SEOZoomClient(cache=MemoryCache(), transport=SEOZoomSimulator(latency=0, jitter=0, domain_rows=rows),
+                           units=UnitLedger())
+    if compact:
+        pages = client.domain_keywords_pages("esempio.it", "best")
+    else:
+        pages = client._paginate(
+            lambda offset, limit: client.domain_keywords("esempio.it", "best", None, offset, limit),
+            DEFAULT_PAGE_SIZE, DEFAULT_PREFETCH, None, None, client.units.row_cost("domains", "keywords"),
+        )
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = 0
+    with open(os.devnull, "w", encoding="utf-8") as out:
+        async with aclosing(pages):
+            async for page in pages:
+                for row in page.get("response") or []:
+                    count += 1
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    elapsed = time.perf_counter() - start
+    assert count == rows, count
+    # La cache del client trattiene ancora le pagine
+    result = _measure(None, elapsed)
+    await client.aclose()
+    return result
+
+
+def child(case: str, rows: int) -> None:
+    kind, path = case.split()
+    if kind == "decode":
+        result = decode(rows, path == "compact")
+    else:
+        result = asyncio.run(export(rows, path == "compact"))
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.rows)
+        return
+
+    print(f"{args.rows:,} righe di domain_keywords")
+    print(f"{'caso':<18}{'picco MB':>10}{'in uso MB':>11}{'RSS MB':>9}{'s':>8}")
+    for case in CASES:
+        out = subprocess.run([sys.executable, __file__, "--child", case, "--rows", str(args.rows)],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        mb = 1024 * 1024
+        line = f"{case:<18}{r['peak'] / mb:>10.1f}{r['retained'] / mb:>11.1f}{r['rss'] / mb:>9.1f}{r['seconds']:>8.2f}"
+        if r["payload"]:
+            line += f"   (risposta: {r['payload'] / mb:.1f} MB)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
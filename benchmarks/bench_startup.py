@@ -0,0 +1,89 @@
+"""Benchmark di avvio del server: tempo fino alla prima risposta a tools/list.
+
+Avvia `python -m seozoom_mcp.server` su stdio (senza SEOZOOM_API_KEY, per
+verificare che l'elenco dei tool non richieda il client API), esegue
+l'handshake MCP e misura il tempo fino alla risposta a tools/list.
+Esce con codice 1 se la mediana supera la soglia indicata.
+
+Uso: uv run python benchmarks/bench_startup.py [--runs 5] [--max-ms 3000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROTOCOL_VERSION = "2025-06-18"
+
+
+def _send(proc: subprocess.Popen[bytes], message: dict) -> None:
+    assert proc.stdin is not None
+    proc.stdin.write((json.dumps(message) + "\n").encode())
+    proc.stdin.flush()
+
+
+def _read_response(proc: subprocess.Popen[bytes], id: int) -> dict:
+    assert proc.stdout is not None
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("il server ha chiuso stdout prima di rispondere")
+        message = json.loads(line)
+        if message.get("id") == id:
+            return message
+
+
+def time_to_tools_list() -> tuple[float, int]:
+    """Avvia il server e restituisce (secondi fino a tools/list, numero di tool)."""
+    env = {k: v for k, v in os.environ.items() if k != "SEOZOOM_API_KEY"}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "seozoom_mcp.server"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+    )
+    try:
+        _send(proc, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "bench-startup", "version": "0"},
+            },
+        })
+        _read_response(proc, 1)
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = _read_response(proc, 2)["result"]["tools"]
+        return time.perf_counter() - start, len(tools)
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=3000, help="soglia sulla mediana in millisecondi")
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        elapsed, count = time_to_tools_list()
+        samples.append(elapsed * 1000)
+    median = statistics.median(samples)
+    print(f"tools/list ({count} tool): mediana {median:.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms")
+    if median > args.max_ms:
+        print(f"FAIL: mediana oltre la soglia di {args.max_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Benchmark end-to-end di tutti i tool MCP contro il simulatore locale.
+
+Ogni tool di seozoom_mcp.server viene invocato attraverso lo stack FastMCP
+completo (sessione client MCP in memoria, JSON-RPC, validazione argomenti,
+_fmt) con SEOZoomClient collegato a SEOZoomSimulator: nessuna unità spesa.
+Per ogni tool riporta latenza p50/p99, chiamate al secondo, richieste HTTP
+simulate e picco di memoria (RSS) del processo.
+
+Uso: uv run python benchmarks/bench_tools.py [--calls 50] [--concurrency 10] [--latency 0.05]
+     [--throttle-rate 0.0] [--error-rate 0.0] [--only keyword_metrics,domain_metrics]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import resource
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent))
+os.environ.setdefault("SEOZOOM_API_KEY", "benchmark")
+
+from mcp.shared.memory import create_connected_server_and_client_session  # noqa: E402
+from simulator import SEOZoomSimulator, past_dates  # noqa: E402
+
+from seozoom_mcp import server  # noqa: E402
+from seozoom_mcp.client import SEOZoomClient  # noqa: E402
+from seozoom_mcp.units import UnitLedger  # noqa: E402
+
+DATE = past_dates(1)[0]
+
+# Handle di un risultato paginato per fetch_page, ottenuto prima di misurarlo (vedi run)
+HANDLE: list[str] = []
+
+# Argomenti per la i-esima chiamata di ogni tool (variano per non colpire la deduplica)
+TOOL_ARGS: dict[str, Callable[[int], dict[str, Any]]] = {
+    "keyword_metrics": lambda i: {"keywords": [f"scarpe running {i}", f"scarpe trail {i}"]},
+    "keyword_serp": lambda i: {"keywords": [f"regime forfettario {i}"]},
+    "keyword_serp_history": lambda i: {"keyword": f"partita iva {i}", "date": DATE},
+    "keyword_serp_history_range": lambda i: {"keyword": f"partita iva {i}", "start": past_dates(12)[-1], "end": DATE},
+    "keyword_serp_volatility": lambda i: {"keywords": [f"mutuo casa {i}", f"partita iva {i}"], "start": past_dates(6)[-1], "end": DATE},
+    "keyword_related": lambda i: {"keyword": f"mutuo casa {i}", "limit": 50},
+    "keyword_search": lambda i: {"query": "scarpe", "where": ["volume>1000", f"kd<{30 + i}"]},
+    "domain_metrics": lambda i: {"domains": [f"sito{i}.it", f"blog{i}.it"]},
+    "domain_metrics_history": lambda i: {"domains": [f"sito{i}.it"], "date": DATE},
+    "domain_metrics_history_range": lambda i: {"domains": [f"sito{i}.it", f"blog{i}.it"], "start": past_dates(24)[-1], "end": DATE},
+    "domain_authority": lambda i: {"domains": [f"sito{i}.it"]},
+    "domain_niches": lambda i: {"domains": [f"sito{i}.it"], "limit": 5},
+    "domain_best_pages": lambda i: {"domain": f"sito{i}.it", "limit": 20},
+    "domain_ai_keywords": lambda i: {"domain": f"sito{i}.it", "limit": 100},
+    "domain_keywords": lambda i: {"domain": f"sito{i}.it", "type": "best", "limit": 100},
+    "domain_keywords_export": lambda i: {"domain": f"sito{i}.it", "type": "best", "max_rows": 2000},
+    "domain_competitors": lambda i: {"domains": [f"sito{i}.it"], "limit": 10},
+    "keyword_gap": lambda i: {"domain": f"sito{i}.it", "max_competitors": 3, "max_rows": 2000},
+    "domain_report": lambda i: {"domain": f"sito{i}.it"},
+    "url_page_authority": lambda i: {"url": f"https://www.sito{i}.it/pagina/"},
+    "url_metrics": lambda i: {"urls": [f"https://www.sito{i}.it/a/", f"https://www.sito{i}.it/b/"]},
+    "url_keywords": lambda i: {"url": f"https://www.sito{i}.it/pagina/", "limit": 100},
+    "url_intent_gap": lambda i: {"url": f"https://www.sito{i}.it/pagina/", "limit": 50},
+    "url_report": lambda i: {"url": f"https://www.sito{i}.it/pagina/"},
+    "project_list": lambda i: {},
+    "project_overview": lambda i: {"id": str(190000 + i)},
+    "project_keywords": lambda i: {"id": str(190000 + i)},
+    "project_best_pages": lambda i: {"id": str(190000 + i), "limit": 20},
+    "project_pages_with_more_keywords": lambda i: {"id": str(190000 + i), "limit": 20},
+    "project_pages_with_potential": lambda i: {"id": str(190000 + i), "limit": 20},
+    "project_winner_pages": lambda i: {"id": str(190000 + i), "limit": 20},
+    "project_loser_pages": lambda i: {"id": str(190000 + i), "limit": 20},
+    "project_report": lambda i: {"id": str(190000 + i)},
+    "fetch_page": lambda i: {"handle": HANDLE[0], "cursor": 50 * (i % 10), "size": 50},
+    "check_units": lambda i: {},
+    "server_metrics": lambda i: {},
+}
+
+
+def peak_rss_mb() -> float:
+    """Picco di memoria residente del processo (MB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux riporta KB, macOS byte
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    simulator = SEOZoomSimulator(latency=args.latency, throttle_rate=args.throttle_rate, error_rate=args.error_rate)
+    # Cache disattivata: si misura il percorso completo fino al simulatore
+    server._client = SEOZoomClient(cache=None, transport=simulator, units=UnitLedger())
+    names = args.only.split(",") if args.only else list(TOOL_ARGS)
+
+    print(f"{'tool':<34}{'p50 ms':>9}{'p99 ms':>9}{'calls/s':>9}{'http':>7}{'errori':>8}{'RSS MB':>9}")
+    async with create_connected_server_and_client_session(server.mcp) as session:
+        listed = {t.name for t in (await session.list_tools()).tools}
+        missing = listed - set(TOOL_ARGS)
+        if missing:
+            print(f"Attenzione: tool senza argomenti di benchmark: {', '.join(sorted(missing))}")
+        if "fetch_page" in names:
+            # Un risultato abbastanza grande da essere paginato, fuori dalle misure
+            result = await session.call_tool("project_keywords", {"id": "190000", "format": "compact"})
+            HANDLE.append(re.search(r'handle="([^"]+)"', result.content[0].text).group(1))
+        for name in names:
+            sem = asyncio.Semaphore(args.concurrency)
+            latencies: list[float] = []
+            errors = 0
+            before = sum(simulator.requests.values())
+
+            async def call(i: int) -> None:
+                nonlocal errors
+                async with sem:
+                    start = time.perf_counter()
+                    result = await session.call_tool(name, TOOL_ARGS[name](i))
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    errors += bool(result.isError)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(call(i) for i in range(args.calls)))
+            elapsed = time.perf_counter() - start
+            http = sum(simulator.requests.values()) - before
+            print(
+                f"{name:<34}{statistics.median(latencies):>9.1f}{percentile(latencies, 99):>9.1f}"
+                f"{args.calls / elapsed:>9.1f}{http:>7}{errors:>8}{peak_rss_mb():>9.1f}"
+            )
+    await server._client.aclose()
+    print(f"\nUnità simulate consumate: {simulator.units_used:,} | risposte HTTP: {dict(simulator.status)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50, help="chiamate per tool")
+    parser.add_argument("--concurrency", type=int, default=10, help="chiamate contemporanee per tool")
+    parser.add_argument("--latency", type=float, default=0.05, help="latenza simulata delle API (secondi)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="probabilità di 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probabilità di 500")
+    parser.add_argument("--only", help="elenco di tool separati da virgola")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
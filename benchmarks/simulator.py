@@ -0,0 +1,285 @@
+"""Simulatore locale delle API SEOZoom v2.
+
+SEOZoomSimulator è un trasporto httpx che risponde al posto di
+https://apiv2.seozoom.com/api/v2 per tutte le azioni usate da
+seozoom_mcp.client (keywords, domains, urls, projects), con risposte
+deterministiche dalla forma realistica, latenza configurabile, iniezione di
+errori 5xx e 429 (casuali o oltre una soglia di concorrenza) e contabilità
+delle unità. Nessuna chiamata reale, nessuna unità spesa.
+
+Uso:
+    client = SEOZoomClient(transport=SEOZoomSimulator(latency=0.05))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+from collections import Counter
+from collections.abc import AsyncIterator, Callable
+from datetime import date, timedelta
+from typing import Any
+
+import httpx
+
+WORDS = [
+    "scarpe", "running", "uomo", "donna", "offerte", "prezzi", "migliori", "online",
+    "come", "fare", "ricetta", "pasta", "vacanze", "mare", "hotel", "roma", "milano",
+    "partita", "iva", "forfettario", "calcolo", "tasse", "mutuo", "casa", "auto",
+]
+INTENTS = ["informational", "commercial", "transactional", "navigational"]
+NICHES = ["Finanza", "Viaggi", "Cucina", "Moda", "Sport", "Tecnologia", "Salute", "Casa"]
+
+# Unità per riga per (endpoint, action); le altre azioni costano DEFAULT_COST
+UNIT_COST = {("keywords", "serp"): 50, ("keywords", "serphistory"): 50, ("domains", "competitor"): 20}
+DEFAULT_COST = 10
+
+# Dimensione dei blocchi in cui viene inviato il corpo delle risposte
+CHUNK_SIZE = 64 * 1024
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Generatore deterministico: stessi parametri, stessa risposta."""
+    seed = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest()
+    return random.Random(int.from_bytes(seed, "big"))
+
+
+def _keyword(rng: random.Random) -> str:
+    return " ".join(rng.sample(WORDS, rng.randint(1, 4)))
+
+
+def _domain(rng: random.Random) -> str:
+    return f"{rng.choice(WORDS)}{rng.randint(1, 999)}.it"
+
+
+def _url(rng: random.Random, domain: str | None = None) -> str:
+    return f"https://www.{domain or _domain(rng)}/{rng.choice(WORDS)}-{rng.choice(WORDS)}/"
+
+
+def _trend(rng: random.Random) -> list[int]:
+    return [rng.randint(0, 100) for _ in range(12)]
+
+
+def _kw_metrics(keyword: str, db: str) -> dict[str, Any]:
+    rng = _rng("kw", keyword, db)
+    return {
+        "keyword": keyword, "volume": rng.randint(10, 200_000), "kd": rng.randint(0, 100),
+        "cpc": round(rng.uniform(0, 4), 2), "intent": rng.choice(INTENTS), "trend": _trend(rng),
+    }
+
+
+def _serp(keyword: str, db: str, day: str) -> dict[str, Any]:
+    rng = _rng("serp", keyword, db, day)
+    pool = [_url(_rng("url", keyword, db, i)) for i in range(70)]
+    rng.shuffle(pool)
+    results = [{"position": i + 1, "url": u, "domain": u.split("/")[2].removeprefix("www."),
+                "title": f"{keyword.title()} | {rng.choice(WORDS).title()}"} for i, u in enumerate(pool[:50])]
+    return {"keyword": keyword, "date": day, "results": results}
+
+
+def _ranked_keyword(rng: random.Random, domain: str) -> dict[str, Any]:
+    return {
+        "keyword": _keyword(rng), "position": rng.randint(1, 100), "volume": rng.randint(10, 100_000),
+        "url": _url(rng, domain), "traffic": rng.randint(0, 20_000), "cpc": round(rng.uniform(0, 4), 2),
+        "kd": rng.randint(0, 100), "intent": rng.choice(INTENTS),
+    }
+
+
+def _domain_total(domain: str, db: str) -> int:
+    """Numero di keyword posizionate (deterministico) per la paginazione."""
+    return 500 + _rng("size", domain, db).randint(0, 9_500)
+
+
+def _page(rows: Callable[[int], dict[str, Any]], total: int, offset: int, limit: int) -> list[dict[str, Any]]:
+    return [rows(i) for i in range(offset, min(offset + limit, total))]
+
+
+def _values(params: dict[str, str], field: str) -> list[str]:
+    return [v for v in params.get(field, "").split("|") if v]
+
+
+def _respond(path: str, action: str, p: dict[str, str], domain_rows: int | None = None) -> list[Any]:
+    """Genera il corpo "response" per un'azione (`domain_rows`: keyword posizionate di ogni dominio)."""
+    db = p.get("db", "it")
+    limit = int(p.get("limit") or 0)
+    offset = int(p.get("offset") or 0)
+    today = date.today().isoformat()
+
+    if path == "keywords":
+        if action == "metrics":
+            return [_kw_metrics(k, db) for k in _values(p, "keyword")]
+        if action == "serp":
+            return [_serp(k, db, today) for k in _values(p, "keyword")]
+        if action == "serphistory":
+            return [_serp(p["keyword"], db, p["date"])]
+        if action == "related":
+            rng = _rng("related", p["keyword"], db)
+            return [{**_kw_metrics(_keyword(rng), db), "affinity": rng.randint(0, 100)} for _ in range(limit or 50)]
+    if path == "domains":
+        domains = _values(p, "domain")
+        if action in ("metrics", "metricshistory"):
+            day = p.get("date", today)
+            return [{"domain": d, "date": day, "traffic": _rng("tr", d, db, day).randint(0, 5_000_000),
+                     "keywords": _domain_total(d, db), "za": _rng("za", d, db).randint(1, 100)} for d in domains]
+        if action == "authority":
+            out = []
+            for d in domains:
+                rng = _rng("auth", d, db)
+                out.append({"domain": d, "za": rng.randint(1, 100), "trust": rng.randint(1, 100),
+                            "stability": rng.randint(1, 100), "opportunity": rng.randint(1, 100)})
+            return out
+        if action == "niches":
+            return [{"domain": d, "niche": n, "topical_authority": _rng("ta", d, n).randint(1, 100),
+                     "keywords_pct": round(_rng("pct", d, n).uniform(0, 50), 1)}
+                    for d in domains for n in NICHES[:limit or 10]]
+        if action == "competitor":
+            return [{"domain": d, "competitor": _domain(_rng("comp", d, db, i)),
+                     "common_keywords": _rng("ck", d, i).randint(10, 50_000)}
+                    for d in domains for i in range(limit or 10)]
+        domain = p["domain"]
+        if action == "bestpages":
+            return [{"url": _url(_rng("bp", domain, i), domain), "pza": _rng("pza", domain, i).randint(1, 100),
+                     "keywords": _rng("bpk", domain, i).randint(1, 5_000)} for i in range(limit or 20)]
+        if action in ("keywords", "aikeywords"):
+            total = (domain_rows or _domain_total(domain, db)) // (5 if action == "aikeywords" else 1)
+            kind = p.get("type", "ai")
+            return _page(lambda i: _ranked_keyword(_rng(action, kind, domain, db, i), domain),
+                         total, offset, limit or 100)
+    if path == "urls":
+        if action == "urlpza":
+            return [{"url": p["url"], "pza": _rng("pza", p["url"]).randint(1, 100)}]
+        if action == "metrics":
+            return [{"url": u, "keywords": _rng("uk", u).randint(0, 3_000), "traffic": _rng("ut", u).randint(0, 50_000),
+                     "pza": _rng("pza", u).randint(1, 100)} for u in _values(p, "url")]
+        domain = p["url"].split("/")[2] if "//" in p["url"] else p["url"]
+        if action == "keywords":
+            return [_ranked_keyword(_rng("urlkw", p["url"], i), domain) for i in range(limit or 100)]
+        if action == "intentgap":
+            return [{**_kw_metrics(_keyword(_rng("gap", p["url"], i)), db), "potential": _rng("pot", p["url"], i).randint(0, 100)}
+                    for i in range(limit or 50)]
+    if path == "projects":
+        if action == "list":
+            return [{"id": str(190000 + i), "name": f"Progetto {i}", "domain": _domain(_rng("proj", i))} for i in range(12)]
+        pid = p["id"]
+        domain = _domain(_rng("proj", pid))
+        if action == "overview":
+            rng = _rng("ov", pid)
+            return [{"id": pid, "domain": domain, "keywords": rng.randint(100, 5_000), "traffic": rng.randint(0, 500_000),
+                     "za": rng.randint(1, 100), "trust": rng.randint(1, 100)}]
+        if action == "keywords":
+            return [_ranked_keyword(_rng("pk", pid, i), domain) for i in range(_rng("pks", pid).randint(500, 5_000))]
+        return [{"url": _url(_rng(action, pid, i), domain), "pza": _rng("ppza", pid, i).randint(1, 100),
+                 "keywords": _rng("pkw", pid, i).randint(1, 2_000),
+                 "traffic_delta": _rng("pd", action, pid, i).randint(-5_000, 5_000)} for i in range(limit or 20)]
+    raise KeyError(f"{path}/{action}")
+
+
+class _JSONStream(httpx.AsyncByteStream):
+    """Corpo JSON codificato man mano e inviato a blocchi, come da una connessione reale."""
+
+    def __init__(self, body: Any) -> None:
+        self._body = body
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunk: list[str] = []
+        size = 0
+        for part in json.JSONEncoder().iterencode(self._body):
+            chunk.append(part)
+            size += len(part)
+            if size >= CHUNK_SIZE:
+                yield "".join(chunk).encode()
+                chunk, size = [], 0
+        if chunk:
+            yield "".join(chunk).encode()
+
+
+class SEOZoomSimulator(httpx.AsyncBaseTransport):
+    """Trasporto httpx che simula le API SEOZoom.
+
+    latency/jitter: ritardo (secondi) per richiesta; error_rate: probabilità di 500;
+    throttle_rate: probabilità di 429; max_concurrency: oltre questa soglia di
+    richieste contemporanee risponde 429 con Retry-After; units: unità iniziali
+    dell'account (0 rimanenti = 403 "units exhausted"); api_keys: chiavi valide
+    (None = qualsiasi chiave); key_units: unità iniziali per chiave, per simulare
+    più abbonamenti (le chiavi elencate sono anche le sole valide); domain_rows:
+    keyword posizionate di ogni dominio (default: tra 500 e 10000 secondo il dominio).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        max_concurrency: int | None = None,
+        units: int = 10_000_000,
+        api_keys: set[str] | None = None,
+        key_units: dict[str, int] | None = None,
+        domain_rows: int | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_concurrency = max_concurrency
+        self.units = units
+        self.api_keys = set(key_units) if key_units is not None else api_keys
+        self.key_units = dict(key_units) if key_units is not None else None
+        self.domain_rows = domain_rows
+        self._rng = random.Random(seed)
+        self.inflight = 0
+        # Statistiche: richieste per azione, codici di risposta, unità consumate
+        self.requests: Counter[str] = Counter()
+        self.status: Counter[int] = Counter()
+        self.units_used = 0
+
+    def _json(self, status: int, body: Any, headers: dict[str, str] | None = None) -> httpx.Response:
+        self.status[status] += 1
+        return httpx.Response(status, stream=_JSONStream(body),
+                              headers={"Content-Type": "application/json", **(headers or {})})
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        path = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        action = params.get("action", "")
+        self.requests[f"{path}/{action}"] += 1
+        if self.api_keys is not None and params.get("api_key") not in self.api_keys:
+            return self._json(401, {"message": "Invalid API key"})
+
+        self.inflight += 1
+        try:
+            if self.max_concurrency is not None and self.inflight > self.max_concurrency:
+                return self._json(429, {"message": "Too many requests"}, {"Retry-After": "0.1"})
+            await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+            if self._rng.random() < self.throttle_rate:
+                return self._json(429, {"message": "Too many requests"}, {"Retry-After": "0.1"})
+            if self._rng.random() < self.error_rate:
+                return self._json(500, {"message": "Internal server error"})
+            try:
+                rows = _respond(path, action, params, self.domain_rows)
+            except KeyError:
+                return self._json(400, {"message": f"Unknown action {path}/{action}"})
+            cost = len(rows) * UNIT_COST.get((path, action), DEFAULT_COST)
+            key = params.get("api_key", "")
+            available = self.key_units[key] if self.key_units is not None else self.units
+            if cost > available:
+                return self._json(403, {"message": "API units exhausted"})
+            if self.key_units is not None:
+                self.key_units[key] -= cost
+            else:
+                self.units -= cost
+            self.units_used += cost
+            return self._json(200, {
+                "UnitsUsed": cost, "UnitsRemaining": available - cost, "ResultRows": len(rows), "response": rows,
+            })
+        finally:
+            self.inflight -= 1
+
+
+def past_dates(count: int, step_days: int = 30) -> list[str]:
+    """Date passate (yyyy-MM-dd) a intervalli regolari, dalla più recente."""
+    today = date.today()
+    return [(today - timedelta(days=step_days * (i + 1))).isoformat() for i in range(count)]
@@ -0,0 +1,197 @@
+"""Esecuzione di job massivi da riga di comando: `seozoom-mcp batch`.
+
+Il file dei job è in formato JSONL, una chiamata a SEOZoomClient per riga:
+
+    {"id": "auth-1", "method": "domain_authority", "args": {"domains": ["a.it", "b.it"]}}
+    {"method": "domain_competitors", "args": [["a.it"], "it", 20]}
+
+`args` può essere un oggetto (argomenti per nome) o una lista (posizionali);
+`id` è facoltativo (default: hash di metodo e argomenti). I job vengono letti
+in streaming ed eseguiti con concorrenza limitata; ogni risultato viene
+scritto sul file NDJSON di output appena disponibile, senza tenere in memoria
+l'insieme dei risultati.
+
+Il file di output fa anche da checkpoint: rilanciando lo stesso comando i job
+già completati con successo vengono saltati, quelli falliti ripetuti.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from seozoom_mcp.client import SEOZoomClient, SEOZoomError
+
+# Metodi del client che non rappresentano chiamate API
+_EXCLUDED = {"aclose"}
+
+
+def allowed_methods() -> set[str]:
+    """Metodi pubblici asincroni di SEOZoomClient invocabili da un job."""
+    return {
+        name for name, fn in inspect.getmembers(SEOZoomClient, inspect.iscoroutinefunction)
+        if not name.startswith("_") and name not in _EXCLUDED
+    }
+
+
+def job_id(job: dict[str, Any]) -> str:
+    """Identificativo del job: `id` esplicito o hash di metodo e argomenti."""
+    if job.get("id") is not None:
+        return str(job["id"])
+    canonical = json.dumps([job.get("method"), job.get("args")], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def read_jobs(path: Path) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """Legge i job in streaming: (numero di riga, job, errore di parsing)."""
+    with path.open(encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as exc:
+                yield line_no, None, f"JSON non valido: {exc}"
+                continue
+            if not isinstance(job, dict) or "method" not in job:
+                yield line_no, None, "ogni riga deve essere un oggetto con almeno il campo 'method'"
+                continue
+            yield line_no, job, None
+
+
+def completed_ids(output: Path) -> set[str]:
+    """Job completati con successo in un output precedente.
+
+    Un'eventuale ultima riga troncata (interruzione durante la scrittura) viene rimossa.
+    """
+    done: set[str] = set()
+    if not output.exists():
+        return done
+    with output.open("rb+") as f:
+        end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                f.truncate(end)
+                break
+            end += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("ok"):
+                done.add(record["id"])
+    return done
+
+
+async def run_batch(
+    client: SEOZoomClient,
+    jobs: Path,
+    output: IO[str],
+    concurrency: int = 8,
+    skip: set[str] | None = None,
+) -> dict[str, int]:
+    """Esegue i job di `jobs` scrivendo i risultati su `output` (una riga NDJSON per job).
+
+    Al massimo `concurrency` job sono in esecuzione contemporaneamente; i job con
+    id in `skip` vengono saltati. Restituisce i conteggi ok/failed/skipped e le unità usate.
+    """
+    methods = allowed_methods()
+    skip = skip or set()
+    stats = {"ok": 0, "failed": 0, "skipped": 0, "units": 0}
+    queue: asyncio.Queue[tuple[int, dict[str, Any]] | None] = asyncio.Queue(maxsize=concurrency * 2)
+
+    def write(record: dict[str, Any]) -> None:
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+
+    async def execute(line_no: int, job: dict[str, Any]) -> None:
+        jid = job_id(job)
+        record: dict[str, Any] = {"id": jid, "line": line_no, "method": job["method"], "args": job.get("args")}
+        try:
+            if job["method"] not in methods:
+                raise SEOZoomError(f"Metodo '{job['method']}' non disponibile")
+            fn = getattr(client, job["method"])
+            args = job.get("args") or {}
+            result = await (fn(*args) if isinstance(args, list) else fn(**args))
+        except Exception as exc:
+            # Un job errato o un errore di rete non deve fermare il worker
+            stats["failed"] += 1
+            write({**record, "ok": False, "error": str(exc) or type(exc).__name__})
+            return
+        stats["ok"] += 1
+        if isinstance(result, dict) and isinstance(result.get("UnitsUsed"), (int, float)):
+            stats["units"] += int(result["UnitsUsed"])
+        write({**record, "ok": True, "result": result})
+
+    async def worker() -> None:
+        while (item := await queue.get()) is not None:
+            try:
+                await execute(*item)
+            finally:
+                queue.task_done()
+        queue.task_done()
+
+    # I task copiano il contesto alla creazione: lo scope va aperto prima
+    with client.tool_scope("batch"):
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for line_no, job, error in read_jobs(jobs):
+                if job is None:
+                    stats["failed"] += 1
+                    write({"id": f"line-{line_no}", "line": line_no, "ok": False, "error": error})
+                elif job_id(job) in skip:
+                    stats["skipped"] += 1
+                else:
+                    await queue.put((line_no, job))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for w in workers:
+                w.cancel()
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point di `seozoom-mcp batch`."""
+    parser = argparse.ArgumentParser(
+        prog="seozoom-mcp batch",
+        description="Esegue un file JSONL di chiamate a SEOZoomClient e scrive i risultati in NDJSON.",
+    )
+    parser.add_argument("jobs", type=Path, help="file JSONL dei job ({\"method\": ..., \"args\": ...} per riga)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="file NDJSON dei risultati (e checkpoint)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="job contemporanei (default: 8)")
+    parser.add_argument("--fresh", action="store_true", help="ignora l'output esistente e riparte da zero")
+    args = parser.parse_args(argv)
+
+    skip = set() if args.fresh else completed_ids(args.output)
+
+    async def run() -> dict[str, int]:
+        client = SEOZoomClient()
+        try:
+            with args.output.open("w" if args.fresh else "a", encoding="utf-8") as out:
+                return await run_batch(client, args.jobs, out, args.concurrency, skip)
+        finally:
+            await client.aclose()
+
+    try:
+        stats = asyncio.run(run())
+    except SEOZoomError as exc:
+        print(f"Errore: {exc}", file=sys.stderr)
+        sys.exit(2)
+    except KeyboardInterrupt:
+        print(f"Interrotto: rilancia lo stesso comando per riprendere da {args.output}", file=sys.stderr)
+        sys.exit(130)
+    print(
+        f"Completati: {stats['ok']} | Falliti: {stats['failed']} | Saltati (già completati): {stats['skipped']}"
+        f" | Unità usate: {stats['units']}",
+        file=sys.stderr,
+    )
+    sys.exit(1 if stats["failed"] else 0)
@@ -0,0 +1,209 @@
+"""Micro-batching delle richieste a valori multipli.
+
+Le API accettano più keyword, domini o URL separati da "|" nella stessa
+richiesta. Quando molti tool vengono invocati in parallelo con un solo
+valore ciascuno, il Coalescer li raccoglie per una breve finestra temporale
+(o finché non si raggiunge il limite dell'azione), esegue una sola richiesta
+e restituisce a ogni chiamante la sua parte della risposta. Se la risposta
+aggregata non si può dividere tra i chiamanti, ognuno viene servito con una
+richiesta separata.
+
+SingleFlight, invece, fa condividere un'unica richiesta HTTP alle chiamate
+concorrenti identiche.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any
+
+Fetch = Callable[[str, dict[str, Any]], Awaitable[Any]]
+Discard = Callable[[str, dict[str, Any], Any], None]
+
+
+class _Batch:
+    """Richieste in attesa per lo stesso gruppo (endpoint, action, db, ...)."""
+
+    def __init__(self, path: str, base: dict[str, Any], field: str) -> None:
+        self.path = path
+        self.base = base
+        self.field = field
+        self.values: list[str] = []
+        self.waiters: list[tuple[list[str], asyncio.Future[Any]]] = []
+        self.timer: asyncio.TimerHandle | None = None
+
+
+def _norm(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def _split(data: Any, field: str, batch_values: list[str], values: list[str]) -> Any | None:
+    """Estrae dalla risposta aggregata la parte relativa a `values`.
+
+    I record vengono associati tramite il campo omonimo del parametro
+    (keyword, domain, url); se manca, per posizione quando il numero di record
+    coincide con i valori richiesti. Se la risposta non è divisibile
+    restituisce None. UnitsUsed è ripartito in proporzione alle righe.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("response"), list):
+        return None
+    records = data["response"]
+    wanted = {_norm(v) for v in values}
+    if all(isinstance(r, dict) and field in r for r in records):
+        own = [r for r in records if _norm(r[field]) in wanted]
+    elif len(records) == len(batch_values):
+        own = [r for v, r in zip(batch_values, records) if _norm(v) in wanted]
+    else:
+        return None
+    part = {**data, "response": own, "ResultRows": len(own)}
+    used = data.get("UnitsUsed")
+    if isinstance(used, (int, float)):
+        # Senza righe (nessun risultato) la ripartizione avviene per valori richiesti
+        share = len(own) / len(records) if records else len(set(values)) / len(batch_values)
+        part["UnitsUsed"] = round(used * share)
+    return part
+
+
+class Coalescer:
+    """Unisce richieste concorrenti compatibili in un'unica richiesta "|"-separata.
+
+    `window` è la finestra di raccolta in secondi; `max_items` il numero massimo
+    di valori per richiesta per (endpoint, action). Le richieste restano
+    raggruppate solo se tutti gli altri parametri (db, limit, date, ...) coincidono.
+    Quando la risposta aggregata non è divisibile viene passata a `discard`
+    (path, params, risposta), così le sue unità sono registrate una volta sola,
+    e ogni chiamante ripete la propria richiesta da solo.
+    """
+
+    def __init__(
+        self, fetch: Fetch, window: float, max_items: dict[tuple[str, str], int], discard: Discard | None = None,
+    ) -> None:
+        self._fetch = fetch
+        self._window = window
+        self._max_items = max_items
+        self._discard = discard
+        self._pending: dict[tuple[Any, ...], _Batch] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        # Statistiche: chiamate ricevute e richieste HTTP effettivamente eseguite
+        self.submitted = 0
+        self.batches = 0
+        # Batch la cui risposta non era divisibile tra i chiamanti
+        self.unsplit = 0
+
+    async def submit(self, path: str, params: dict[str, Any], field: str) -> Any:
+        """Accoda i valori di params[field] e attende la risposta del batch."""
+        loop = asyncio.get_running_loop()
+        values = str(params[field]).split("|")
+        base = {k: v for k, v in params.items() if k != field}
+        group = (path, field, tuple(sorted((k, str(v)) for k, v in base.items())))
+        limit = self._max_items[(path, base["action"])]
+        self.submitted += 1
+
+        batch = self._pending.get(group)
+        new_values = list(dict.fromkeys(values))
+        if batch is not None:
+            new_values = [v for v in new_values if v not in batch.values]
+            if len(batch.values) + len(new_values) > limit:
+                # Il batch corrente è pieno: parte subito e se ne apre uno nuovo
+                self._flush(group)
+                batch = None
+                new_values = list(dict.fromkeys(values))
+        if batch is None:
+            batch = _Batch(path, base, field)
+            self._pending[group] = batch
+            batch.timer = loop.call_later(self._window, self._flush, group)
+
+        fut: asyncio.Future[Any] = loop.create_future()
+        batch.waiters.append((values, fut))
+        batch.values.extend(new_values)
+        if len(batch.values) >= limit:
+            self._flush(group)
+        return await fut
+
+    def _flush(self, group: tuple[Any, ...]) -> None:
+        batch = self._pending.pop(group, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        self.batches += 1
+        params = {**batch.base, batch.field: "|".join(batch.values)}
+        try:
+            data = await self._fetch(batch.path, params)
+            if len(batch.waiters) == 1:
+                parts = [data]
+            else:
+                parts = [_split(data, batch.field, batch.values, values) for values, _ in batch.waiters]
+                if any(part is None for part in parts):
+                    # La risposta intera non appartiene a nessuno: né in cache né ripetuta a ogni chiamante
+                    self.unsplit += 1
+                    if self._discard is not None:
+                        self._discard(batch.path, params, data)
+                    await asyncio.gather(*(self._single(batch, values, fut) for values, fut in batch.waiters))
+                    return
+        except asyncio.CancelledError:
+            for _, fut in batch.waiters:
+                fut.cancel()
+            raise
+        except Exception as exc:
+            for _, fut in batch.waiters:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for (_, fut), part in zip(batch.waiters, parts):
+            if not fut.done():
+                fut.set_result(part)
+
+    async def _single(self, batch: _Batch, values: list[str], fut: asyncio.Future[Any]) -> None:
+        """Richiesta separata per i soli `values` di un chiamante."""
+        if fut.done():
+            return
+        try:
+            data = await self._fetch(batch.path, {**batch.base, batch.field: "|".join(values)})
+        except Exception as exc:
+            if not fut.done():
+                fut.set_exception(exc)
+            return
+        if not fut.done():
+            fut.set_result(data)
+
+
+class SingleFlight:
+    """Deduplica le richieste identiche in corso.
+
+    Le chiamate concorrenti con la stessa chiave condividono un'unica
+    esecuzione e ne ricevono lo stesso risultato (o la stessa eccezione).
+    L'esecuzione è protetta da shield: se un chiamante viene annullato,
+    gli altri continuano ad attenderla.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        # Statistiche: chiamate ricevute e chiamate accorpate a una già in corso
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._done, key))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Segna l'eccezione come letta anche se tutti i chiamanti sono stati annullati
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,303 @@
+"""Cache delle risposte API SEOZoom.
+
+Ogni chiamata costa da 10 a 120 unità per riga: le risposte già ottenute
+vengono conservate e riutilizzate finché sono valide. Sono disponibili due
+backend intercambiabili:
+
+- MemoryCache: LRU in memoria, si svuota al riavvio del processo;
+- SQLiteCache: file SQLite su disco, sopravvive ai riavvii.
+
+La durata (TTL) dipende dall'azione: gli storici di date passate non cambiano
+mai e restano in cache finché non vengono espulsi, la SERP attuale scade presto.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from datetime import date as _date
+from pathlib import Path
+from typing import Any, Protocol
+from urllib.parse import urlencode
+
+from seozoom_mcp.records import Records
+
+# Durata della cache in secondi per (endpoint, action).
+# None = la risposta non scade mai (dati storici immutabili).
+HOUR = 3600
+DAY = 24 * HOUR
+
+CACHE_TTL: dict[tuple[str, str], float | None] = {
+    ("keywords", "metrics"): 7 * DAY,
+    ("keywords", "serp"): 6 * HOUR,
+    ("keywords", "serphistory"): None,
+    ("keywords", "related"): 7 * DAY,
+    ("domains", "metrics"): DAY,
+    ("domains", "metricshistory"): None,
+    ("domains", "authority"): DAY,
+    ("domains", "niches"): DAY,
+    ("domains", "bestpages"): DAY,
+    ("domains", "aikeywords"): DAY,
+    ("domains", "keywords"): DAY,
+    ("domains", "competitor"): DAY,
+    ("urls", "urlpza"): DAY,
+    ("urls", "metrics"): DAY,
+    ("urls", "keywords"): DAY,
+    ("urls", "intentgap"): DAY,
+    ("projects", "list"): HOUR,
+    ("projects", "overview"): HOUR,
+    ("projects", "keywords"): HOUR,
+    ("projects", "bestpages"): HOUR,
+    ("projects", "pageswithmorekeywords"): HOUR,
+    ("projects", "pageswithpotential"): HOUR,
+    ("projects", "winnerpages"): HOUR,
+    ("projects", "loserpages"): HOUR,
+}
+
+# TTL usato per le azioni non presenti in CACHE_TTL
+DEFAULT_TTL = HOUR
+
+# Percorso di default del backend su disco
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "seozoom-mcp" / "cache.sqlite3"
+
+# Memoria massima (byte, approssimata) occupata dalle risposte in MemoryCache
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Stima dei byte per riga di una risposta come lista di dizionari (MemoryCache)
+ROW_BYTES = 600
+
+# Secondi minimi tra due aggiornamenti di `accessed` per la stessa voce (SQLiteCache)
+ACCESS_RESOLUTION = 60.0
+
+# Frazione di max_entries espulsa in una volta quando SQLiteCache supera il limite
+EVICT_FRACTION = 0.1
+
+
+def cache_key(path: str, params: dict[str, Any]) -> str:
+    """Chiave di cache: endpoint + parametri ordinati, senza api_key e valori None."""
+    items = sorted((k, str(v)) for k, v in params.items() if k != "api_key" and v is not None)
+    return f"{path}?{urlencode(items)}"
+
+
+def ttl_for(path: str, params: dict[str, Any]) -> float | None:
+    """TTL in secondi per una richiesta.
+
+    Le azioni storiche sono immutabili solo per date passate: uno snapshot
+    richiesto per oggi (o per il futuro) può ancora cambiare e usa il TTL di default.
+    """
+    ttl = CACHE_TTL.get((path, params.get("action", "")), DEFAULT_TTL)
+    if ttl is None and str(params.get("date", "")) >= _date.today().isoformat():
+        return DEFAULT_TTL
+    return ttl
+
+
+class ResponseCache(Protocol):
+    """Interfaccia comune dei backend di cache."""
+
+    hits: int
+    misses: int
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        """Restituisce (valore, timestamp di scrittura) o None se assente/scaduto."""
+        ...
+
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        """Salva un valore con il TTL indicato (None = nessuna scadenza)."""
+        ...
+
+    def clear(self) -> None:
+        """Svuota la cache."""
+        ...
+
+
+def approx_size(value: Any) -> int:
+    """Byte occupati (stima) da una risposta: righe compatte misurate, dizionari a ROW_BYTES per riga."""
+    body = value.get("response") if isinstance(value, dict) else value
+    if isinstance(body, Records):
+        return body.nbytes + 512
+    if isinstance(body, list):
+        return len(body) * ROW_BYTES + 512
+    return sys.getsizeof(body) + 512
+
+
+class MemoryCache:
+    """Cache LRU in memoria con numero massimo di voci e di byte (approssimati, vedi approx_size).
+
+    Poche pagine di export da 500 righe occupano più di molte risposte brevi:
+    il limite in byte espelle le voci usate meno di recente anche sotto
+    max_entries, e una risposta più grande del limite non viene conservata.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self.bytes = 0
+        # chiave -> (valore, scritto_il, scade_il, byte)
+        self._data: OrderedDict[str, tuple[Any, float, float | None, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, stored, expires, _ = entry
+        if expires is not None and expires <= time.time():
+            self._discard(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value, stored
+
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        now = time.time()
+        size = approx_size(value)
+        self._discard(key)
+        if size > self._max_bytes:
+            return
+        self._data[key] = (value, now, now + ttl if ttl is not None else None, size)
+        self.bytes += size
+        # Espelle le voci usate meno di recente oltre i limiti
+        while len(self._data) > self._max_entries or self.bytes > self._max_bytes:
+            self.bytes -= self._data.popitem(last=False)[1][3]
+
+    def _discard(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[3]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """Cache persistente su file SQLite con espulsione LRU oltre max_entries.
+
+    Le scritture non scandiscono la tabella: un contatore delle voci (risincronizzato
+    a ogni espulsione, anche per le scritture di altri processi) fa partire
+    l'espulsione solo oltre il limite; questa rimuove le voci scadute e poi
+    quelle usate meno di recente fino a scendere di EVICT_FRACTION sotto il limite.
+    `accessed` viene aggiornato al più ogni ACCESS_RESOLUTION secondi per voce.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH, max_entries: int = 50_000) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max_entries
+        self._db = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored REAL NOT NULL,"
+            " expires REAL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)")
+        # Voci stimate: ogni scrittura conta come nuova finché un'espulsione non lo corregge
+        self._count = len(self)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        now = time.time()
+        row = self._db.execute(
+            "SELECT value, stored, expires, accessed FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        value, stored, expires, accessed = row
+        if expires is not None and expires <= now:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+        if now - accessed >= ACCESS_RESOLUTION:
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return json.loads(value), stored
+
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        now = time.time()
+        # default=list: le righe compatte (seozoom_mcp.records.Records) vengono salvate come lista
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, stored, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False, default=list), now, now + ttl if ttl is not None else None, now),
+        )
+        self._count += 1
+        if self._count > self._max_entries:
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Espelle le voci scadute e, se serve, quelle usate meno di recente."""
+        self._db.execute("DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        self._count = len(self)
+        keep = self._max_entries - int(self._max_entries * EVICT_FRACTION)
+        if self._count > keep:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (self._count - keep,),
+            )
+            self._count = keep
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM responses")
+        self._count = 0
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def _env_number(name: str) -> float | None:
+    """Valore numerico positivo della variabile `name`, None se assente; ValueError se non valido."""
+    value = os.environ.get(name)
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0.0
+    if number <= 0:
+        raise ValueError(f"{name} '{value}' non valido: indica un numero maggiore di zero")
+    return number
+
+
+def cache_from_env() -> ResponseCache | None:
+    """Costruisce la cache dalle variabili d'ambiente.
+
+    SEOZOOM_CACHE: "memory" (default), "sqlite" oppure "off".
+    SEOZOOM_CACHE_PATH: file SQLite (default ~/.cache/seozoom-mcp/cache.sqlite3).
+    SEOZOOM_CACHE_MAX_ENTRIES: numero massimo di risposte conservate.
+    SEOZOOM_CACHE_MAX_MB: memoria massima del backend memory in MB (default 64).
+    Solleva ValueError per valori non validi.
+    """
+    backend = os.environ.get("SEOZOOM_CACHE", "memory").lower()
+    if backend == "off":
+        return None
+    max_entries = _env_number("SEOZOOM_CACHE_MAX_ENTRIES")
+    if backend == "memory":
+        max_mb = _env_number("SEOZOOM_CACHE_MAX_MB")
+        return MemoryCache(
+            int(max_entries) if max_entries else 1000,
+            int(max_mb * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES,
+        )
+    if backend == "sqlite":
+        path = os.environ.get("SEOZOOM_CACHE_PATH") or DEFAULT_CACHE_PATH
+        return SQLiteCache(path, int(max_entries)) if max_entries else SQLiteCache(path)
+    raise ValueError(f"SEOZOOM_CACHE '{backend}' non valido. Usa: memory, sqlite, off")
@@ -6,11 +6,36 @@ HTTP verso i 4 endpoint principali: keywords, domains, urls, projects.
 
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Any
+import sqlite3
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from datetime import date as _date
+from functools import cached_property, partial
+from typing import TYPE_CHECKING, Any
 
 import httpx
 
+from seozoom_mcp.batching import Coalescer, SingleFlight
+from seozoom_mcp.cache import ResponseCache, cache_from_env, cache_key, ttl_for
+from seozoom_mcp.gap import GapIndex
+from seozoom_mcp.history import HistoryStore, date_range, history_from_env
+from seozoom_mcp.keyword_index import KeywordIndex, keyword_index_from_env
+from seozoom_mcp.keys import AUTH_STATUS, QUOTA_STATUS, NoKeyAvailable, key_pool_from_env, quota_exhausted
+from seozoom_mcp.limiter import backoff_delay, retry_after
+from seozoom_mcp.metrics import metrics_from_env
+from seozoom_mcp.records import Records, decode_stream
+from seozoom_mcp.report import build_report
+from seozoom_mcp.units import BudgetExceeded, UnitLedger, ledger_from_env
+from seozoom_mcp.volatility import SerpSeries, serp_results
+
+if TYPE_CHECKING:
+    from seozoom_mcp.prefetch import ProjectPrefetcher
+
 # URL base delle API SEOZoom v2 — tutti gli endpoint partono da qui
 BASE_URL = "https://apiv2.seozoom.com/api/v2"
 
@@ -19,29 +44,203 @@ class SEOZoomError(Exception):
     """Eccezione sollevata per errori API SEOZoom (autenticazione, HTTP, validazione)."""
 
 
-# Database supportati: Italia, Spagna, Francia, Germania, Regno Unito
-VALID_DBS = {"it", "es", "fr", "de", "uk"}
+# Database supportati: Italia, Spagna, Francia, Germania, Regno Unito (nell'ordine usato per "all")
+ALL_DBS = ("it", "es", "fr", "de", "uk")
+VALID_DBS = set(ALL_DBS)
+
+# Se True le richieste del contesto corrente ignorano la cache (vedi SEOZoomClient.bypass_cache)
+_bypass_cache: ContextVar[bool] = ContextVar("seozoom_bypass_cache", default=False)
+
+# Nome del tool MCP che ha originato le richieste del contesto corrente (vedi SEOZoomClient.tool_scope)
+_tool_name: ContextVar[str | None] = ContextVar("seozoom_tool_name", default=None)
+
+# Numero massimo di valori "|"-separati accettati dalle API per (endpoint, action).
+# Le liste più lunghe vengono divise in blocchi ed eseguite in parallelo.
+MAX_ITEMS: dict[tuple[str, str], int] = {
+    ("keywords", "metrics"): 100,
+    ("keywords", "serp"): 100,
+    ("domains", "metrics"): 50,
+    ("domains", "metricshistory"): 50,
+    ("domains", "authority"): 100,
+    ("domains", "niches"): 10,
+    ("domains", "competitor"): 10,
+    ("urls", "metrics"): 30,
+}
+
+# Richieste contemporanee massime per una singola chiamata divisa in blocchi
+DEFAULT_MAX_CONCURRENCY = 5
+
+# Righe per pagina e pagine richieste in anticipo negli iteratori paginati
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_PREFETCH = 2
+
+# Tentativi aggiuntivi per le risposte 429/5xx e gli errori di rete
+DEFAULT_MAX_RETRIES = 3
+
+# Codici HTTP che indicano un sovraccarico temporaneo: la richiesta viene ripetuta
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Righe per fonte di project_report (il prefetch dei progetti aggiorna la stessa variante delle pagine)
+DEFAULT_REPORT_TOP = 20
+
+# Finestra (ms) in cui le chiamate concorrenti a valori multipli vengono unite in un'unica richiesta
+DEFAULT_BATCH_WINDOW_MS = 5
+
+_FROM_ENV: Any = object()
+
+
+def _error_message(resp: httpx.Response) -> str:
+    """Messaggio d'errore di una risposta API (campo "message" o codice HTTP)."""
+    try:
+        return resp.json().get("message", f"HTTP {resp.status_code}")
+    except Exception:
+        return f"HTTP {resp.status_code}"
+
+
+def _plain(data: Any) -> Any:
+    """Risposta con le righe compatte (Records) convertite in lista, per chi non le ha richieste."""
+    if isinstance(data, dict) and isinstance(data.get("response"), Records):
+        return {**data, "response": list(data["response"])}
+    return data
+
+
+def _merge_responses(parts: list[Any]) -> Any:
+    """Unisce le risposte dei singoli blocchi in un unico risultato.
+
+    Concatena gli array "response", somma UnitsUsed e ResultRows e riporta
+    le unità rimanenti più basse (le più recenti) tra le risposte non in cache.
+    """
+    if len(parts) == 1:
+        return parts[0]
+    if not all(isinstance(p, dict) for p in parts):
+        return parts
+    merged: dict[str, Any] = {k: v for k, v in parts[0].items() if k not in ("response", "Cache")}
+    response: list[Any] = []
+    for p in parts:
+        body = p.get("response")
+        if isinstance(body, list):
+            response.extend(body)
+        elif body is not None:
+            response.append(body)
+    merged["response"] = response
+    merged["UnitsUsed"] = sum(p.get("UnitsUsed") or 0 for p in parts)
+    merged["ResultRows"] = sum(p.get("ResultRows") or 0 for p in parts)
+    fresh = [p for p in parts if not p.get("Cache")] or parts
+    remaining = [p["UnitsRemaining"] for p in fresh if isinstance(p.get("UnitsRemaining"), (int, float))]
+    if remaining:
+        merged["UnitsRemaining"] = min(remaining)
+    hits = [p["Cache"] for p in parts if p.get("Cache")]
+    if hits:
+        merged["Cache"] = {
+            "hit": True,
+            "partial": len(hits) < len(parts),
+            "age": max(h["age"] for h in hits),
+            "saved": sum(h["saved"] for h in hits),
+        }
+    return merged
 
 
 class SEOZoomClient:
     """Client asincrono per le API SEOZoom v2.
 
-    Legge la chiave API dalla variabile d'ambiente SEOZOOM_API_KEY
-    e il database di default da SEOZOOM_DEFAULT_DB (fallback: "it").
-    Utilizza httpx.AsyncClient per le richieste HTTP con timeout di 30s.
+    Legge la chiave API da SEOZOOM_API_KEY (o più chiavi da SEOZOOM_API_KEYS /
+    SEOZOOM_API_KEYS_FILE, vedi seozoom_mcp.keys) e il database di default da
+    SEOZOOM_DEFAULT_DB (fallback: "it").
+    Utilizza httpx.AsyncClient per le richieste HTTP con timeout di 30s; pool di
+    connessioni, keep-alive e HTTP/2 sono configurabili con SEOZOOM_HTTP_MAX_CONNECTIONS,
+    SEOZOOM_HTTP_MAX_KEEPALIVE e SEOZOOM_HTTP2. `transport` permette di sostituire
+    il trasporto HTTP (ad esempio con httpx.MockTransport).
+
+    Le richieste contemporanee sono regolate da un AdaptiveLimiter per chiave (AIMD,
+    tra 1 e SEOZOOM_LIMITER_MAX) e le risposte 429/5xx o gli errori di rete vengono ripetuti
+    fino a SEOZOOM_MAX_RETRIES volte con backoff esponenziale, rispettando Retry-After.
+
+    Le unità consumate e rimanenti vengono registrate in `units` (di default
+    configurato da SEOZOOM_LEDGER_PATH e dai budget SEOZOOM_SESSION_BUDGET /
+    SEOZOOM_TOOL_BUDGETS, vedi seozoom_mcp.units): le chiamate che supererebbero
+    un budget vengono rifiutate prima dell'invio.
+
+    Le risposte vengono salvate nella cache indicata (di default quella
+    configurata da SEOZOOM_CACHE, vedi seozoom_mcp.cache); cache=None la disattiva.
+    Le liste oltre il limite delle API vengono divise in blocchi eseguiti in
+    parallelo, al massimo SEOZOOM_MAX_CONCURRENCY alla volta (default: 5 per chiave).
+    Le chiamate concorrenti compatibili con pochi valori vengono invece unite
+    in un'unica richiesta entro SEOZOOM_BATCH_WINDOW_MS (default: 5, 0 = disattivo).
     """
 
-    def __init__(self) -> None:
-        api_key = os.environ.get("SEOZOOM_API_KEY")
-        if not api_key:
-            raise SEOZoomError("SEOZOOM_API_KEY environment variable is required")
-        self._api_key = api_key
+    def __init__(
+        self,
+        cache: ResponseCache | None = _FROM_ENV,
+        transport: httpx.AsyncBaseTransport | None = None,
+        units: UnitLedger | None = None,
+    ) -> None:
+        try:
+            self.keys = key_pool_from_env()
+        except (OSError, ValueError) as exc:
+            raise SEOZoomError(str(exc)) from exc
         self._default_db = os.environ.get("SEOZOOM_DEFAULT_DB", "it")
-        self._http = httpx.AsyncClient(timeout=30)
+        limits = httpx.Limits(
+            max_connections=int(os.environ.get("SEOZOOM_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.environ.get("SEOZOOM_HTTP_MAX_KEEPALIVE", "10")),
+        )
+        http2 = os.environ.get("SEOZOOM_HTTP2", "") in ("1", "true", "yes")
+        try:
+            self._http = httpx.AsyncClient(timeout=30, limits=limits, http2=http2, transport=transport)
+        except ImportError as exc:
+            raise SEOZoomError("SEOZOOM_HTTP2 richiede il pacchetto h2: installa seozoom-mcp[http2]") from exc
+        self._max_retries = int(os.environ.get("SEOZOOM_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+        self.units = units if units is not None else ledger_from_env()
+        self.metrics = metrics_from_env()
+        try:
+            self.cache: ResponseCache | None = cache_from_env() if cache is _FROM_ENV else cache
+        except (OSError, sqlite3.Error, ValueError) as exc:
+            raise SEOZoomError(f"Cache non configurabile: {exc}") from exc
+        # Con più chiavi i blocchi di una chiamata possono procedere su chiavi diverse
+        self._max_concurrency = int(os.environ.get("SEOZOOM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY * len(self.keys)))
+        self._fanout = asyncio.Semaphore(self._max_concurrency)
+        window_ms = float(os.environ.get("SEOZOOM_BATCH_WINDOW_MS", DEFAULT_BATCH_WINDOW_MS))
+        self.singleflight = SingleFlight()
+        self.coalescer = (
+            Coalescer(self._fetch, window_ms / 1000, MAX_ITEMS, discard=self._record_unsplit) if window_ms > 0 else None
+        )
+        # Endpoint → secondi oltre il TTL in cui una risposta scaduta è ancora servita (vedi _get)
+        self.stale_paths: dict[str, float] = {}
+        self._revalidating: dict[str, asyncio.Task[Any]] = {}
+        # Scritture in corso sull'indice keyword (vedi _index)
+        self._indexing: set[asyncio.Task[Any]] = set()
+        self._units_flush: asyncio.Task[Any] | None = None
+        self.prefetcher: ProjectPrefetcher | None = None
 
     async def aclose(self) -> None:
-        """Chiude il client HTTP. Da chiamare al termine dell'uso."""
+        """Chiude il client HTTP e la cache. Da chiamare al termine dell'uso."""
+        if self.prefetcher is not None:
+            await self.prefetcher.stop()
+        for task in list(self._revalidating.values()):
+            task.cancel()
+        await asyncio.gather(*self._revalidating.values(), return_exceptions=True)
+        await asyncio.gather(*self._indexing, return_exceptions=True)
+        if self._units_flush is not None:
+            await asyncio.gather(self._units_flush, return_exceptions=True)
+        await asyncio.to_thread(self.units.flush)
         await self._http.aclose()
+        close = getattr(self.cache, "close", None)
+        if close is not None:
+            close()
+        if "history" in self.__dict__:
+            self.history.close()
+        if self.__dict__.get("keywords") is not None:
+            self.keywords.close()
+        self.metrics.close()
+
+    @cached_property
+    def history(self) -> HistoryStore:
+        """Archivio locale delle serie storiche, aperto al primo utilizzo (SEOZOOM_HISTORY_PATH)."""
+        return history_from_env()
+
+    @cached_property
+    def keywords(self) -> KeywordIndex | None:
+        """Indice locale delle keyword scaricate, aperto al primo utilizzo (SEOZOOM_KEYWORD_INDEX_PATH)."""
+        return keyword_index_from_env()
 
     def _db(self, db: str | None) -> str:
         """Risolve il database: usa quello passato o il default, validandolo."""
@@ -50,23 +249,490 @@ class SEOZoomClient:
             raise SEOZoomError(f"Database '{val}' non valido. Usa: {', '.join(sorted(VALID_DBS))}")
         return val
 
-    async def _get(self, path: str, params: dict[str, Any]) -> Any:
-        """Esegue una richiesta GET autenticata alle API SEOZoom.
+    def _dbs(self, db: str | list[str] | None) -> list[str]:
+        """Risolve uno o più database: None o stringa, lista, oppure "all" (tutti i mercati)."""
+        if db == "all" or (isinstance(db, list) and "all" in db):
+            return list(ALL_DBS)
+        if isinstance(db, list):
+            return [self._db(d) for d in dict.fromkeys(db)] or [self._db(None)]
+        return [self._db(db)]
+
+    async def multi_db(self, db: str | list[str] | None, call: Callable[[str], Awaitable[Any]]) -> Any:
+        """Esegue `call(db)` su uno o più mercati in parallelo e ne unisce le risposte.
+
+        Con un solo database restituisce la risposta di `call` invariata. Con più
+        database ogni riga di "response" riceve il campo "db", unità e risultati
+        vengono sommati e "Markets" riporta per ogni mercato unità, righe o
+        l'errore; solo se falliscono tutti i mercati viene sollevato l'errore.
+        """
+        dbs = self._dbs(db)
+        if len(dbs) == 1:
+            return await call(dbs[0])
+        results = await asyncio.gather(*(call(d) for d in dbs), return_exceptions=True)
+        markets: dict[str, dict[str, Any]] = {}
+        parts: list[Any] = []
+        for d, result in zip(dbs, results):
+            if isinstance(result, SEOZoomError):
+                markets[d] = {"Error": str(result)}
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            if isinstance(result, dict):
+                body = result.get("response")
+                rows = body if isinstance(body, list) else [] if body is None else [body]
+                tagged = [{"db": d, **r} if isinstance(r, dict) else {"db": d, "value": r} for r in rows]
+                result = {**result, "response": tagged}
+                markets[d] = {"UnitsUsed": result.get("UnitsUsed") or 0, "ResultRows": result.get("ResultRows", len(rows))}
+            parts.append(result)
+        if not parts:
+            raise next(r for r in results if isinstance(r, BaseException))
+        merged = _merge_responses(parts)
+        if isinstance(merged, dict):
+            histories = [p["History"] for p in parts if isinstance(p, dict) and p.get("History")]
+            if histories:
+                merged["History"] = {
+                    "stored": sum(h["stored"] for h in histories),
+                    "fetched": sum(h["fetched"] for h in histories),
+                    "missing": sum(h.get("missing", 0) for h in histories),
+                }
+            merged["Markets"] = markets
+        return merged
+
+    def _dates(self, start: str, end: str, step: str) -> list[str]:
+        """Date di un intervallo (vedi history.date_range), validate come SEOZoomError."""
+        try:
+            return date_range(start, end, step)
+        except ValueError as exc:
+            raise SEOZoomError(str(exc)) from exc
+
+    @contextmanager
+    def bypass_cache(self, enabled: bool = True) -> Iterator[None]:
+        """Context manager: le richieste eseguite al suo interno non leggono dalla cache.
 
-        Aggiunge automaticamente la api_key, rimuove i parametri None
-        e solleva SEOZoomError in caso di errore HTTP.
+        Le risposte ottenute vengono comunque salvate, così da aggiornare la cache.
         """
-        params["api_key"] = self._api_key
+        token = _bypass_cache.set(enabled)
+        try:
+            yield
+        finally:
+            _bypass_cache.reset(token)
+
+    @contextmanager
+    def tool_scope(self, name: str) -> Iterator[None]:
+        """Context manager: attribuisce al tool `name` le unità delle richieste eseguite al suo interno."""
+        token = _tool_name.set(name)
+        try:
+            yield
+        finally:
+            _tool_name.reset(token)
+
+    def current_tool(self) -> str | None:
+        """Nome del tool impostato da tool_scope nel contesto corrente."""
+        return _tool_name.get()
+
+    async def _get(
+        self,
+        path: str,
+        params: dict[str, Any],
+        fetch: Callable[[str, dict[str, Any]], Awaitable[Any]] | None = None,
+        compact: bool = False,
+    ) -> Any:
+        """Esegue una richiesta GET alle API SEOZoom passando dalla cache.
+
+        Rimuove i parametri None; se la risposta è in cache e non scaduta la
+        restituisce senza chiamare le API, con UnitsUsed a 0 e la chiave "Cache"
+        (età e unità risparmiate). Altrimenti la ottiene tramite `fetch`
+        (default: _fetch), la salva in cache e ne indicizza le keyword
+        (KeywordIndex, in background); le chiamate identiche concorrenti condividono la
+        stessa richiesta (SingleFlight). Prima dell'invio il costo
+        stimato viene verificato e riservato sui budget del registro unità.
+
+        Per gli endpoint in `stale_paths` una risposta scaduta da meno di
+        `stale_paths[path]` secondi viene restituita subito (Cache "stale") e
+        ricaricata in background (stale-while-revalidate).
+
+        Con `compact` le righe sono decodificate in streaming e restituite come
+        Records (vedi seozoom_mcp.records), anche in cache; senza, una risposta
+        compatta già in cache viene restituita come lista.
+        """
+        if fetch is None:
+            fetch = partial(self._fetch, compact=True) if compact else self._fetch
         # Rimuove i parametri opzionali non forniti
         params = {k: v for k, v in params.items() if v is not None}
-        resp = await self._http.get(f"{BASE_URL}/{path}/", params=params)
-        if resp.status_code >= 400:
+        key = cache_key(path, params)
+        ttl = ttl_for(path, params)
+        max_stale = self.stale_paths.get(path)
+
+        async def load() -> Any:
+            tool = _tool_name.get()
+            estimate = self.units.estimate(path, params)
+            try:
+                self.units.reserve(tool, estimate)
+            except BudgetExceeded as exc:
+                raise SEOZoomError(str(exc)) from exc
+            try:
+                data = await fetch(path, params)
+            finally:
+                self.units.release(tool, estimate)
+            self.units.record(tool, path, params, data)
+            if self.units.flush_due():
+                self._flush_units()
+            if self.cache is not None:
+                # Con stale-while-revalidate la copia resta in cache anche oltre il TTL
+                self.cache.set(key, data, ttl + max_stale if ttl is not None and max_stale else ttl)
+            # Le pagine degli export (compact) restano fuori dall'indice: sono troppe righe per chiamata
+            if self.keywords is not None and not compact:
+                self._index(path, params, data)
+            return data
+
+        if self.cache is not None and not _bypass_cache.get():
+            cached = self.cache.get(key)
+            if cached is not None:
+                data, stored = cached
+                age = time.time() - stored
+                stale = max_stale is not None and ttl is not None and age >= ttl
+                if stale:
+                    self._revalidate(key, load)
+                if isinstance(data, dict):
+                    cache_info = {"hit": True, "age": int(age), "saved": data.get("UnitsUsed", 0)}
+                    if stale:
+                        cache_info["stale"] = True
+                    data = {**data, "UnitsUsed": 0, "Cache": cache_info}
+                self.metrics.inc("cache_stale_total" if stale else "cache_hits_total", f"{path}/{params.get('action', '')}")
+                return data if compact else _plain(data)
+
+        data = await self.singleflight.do(key, load)
+        return data if compact else _plain(data)
+
+    def _index(self, path: str, params: dict[str, Any], data: Any) -> None:
+        """Indicizza le keyword di una risposta in un thread, senza ritardare la risposta.
+
+        Le righe vengono estratte subito (la risposta può essere modificata dopo);
+        l'inserimento SQLite gira con asyncio.to_thread.
+        """
+        rows = self.keywords.rows(path, params, data)
+        if rows:
+            task = asyncio.create_task(asyncio.to_thread(self.keywords.write, rows))
+            self._indexing.add(task)
+            task.add_done_callback(self._indexed)
+
+    def _record_unsplit(self, path: str, params: dict[str, Any], data: Any) -> None:
+        """Registra le unità di un batch non divisibile tra i chiamanti (vedi Coalescer), una volta sola."""
+        self.units.record(_tool_name.get(), path, params, data)
+        self.metrics.inc("coalescer_unsplit_total", f"{path}/{params.get('action', '')}")
+
+    def _flush_units(self) -> None:
+        """Salva il registro unità in un thread, senza bloccare l'event loop (un salvataggio alla volta)."""
+        if self._units_flush is None or self._units_flush.done():
+            self._units_flush = asyncio.create_task(asyncio.to_thread(self.units.flush))
+            self._units_flush.add_done_callback(self._units_flushed)
+
+    def _units_flushed(self, task: asyncio.Task[Any]) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            # Il prossimo salvataggio riprova: le modifiche restano in sospeso
+            self.metrics.inc("ledger_save_errors_total", type(task.exception()).__name__)
+
+    def _indexed(self, task: asyncio.Task[Any]) -> None:
+        self._indexing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.metrics.inc("keyword_index_errors_total", type(task.exception()).__name__)
+
+    def _revalidate(self, key: str, load: Callable[[], Awaitable[Any]]) -> None:
+        """Ricarica in background una risposta scaduta, una sola volta per chiave."""
+        if key in self._revalidating:
+            return
+        task = asyncio.create_task(self.singleflight.do(key, load))
+        self._revalidating[key] = task
+        task.add_done_callback(partial(self._revalidated, key))
+
+    def _revalidated(self, key: str, task: asyncio.Task[Any]) -> None:
+        del self._revalidating[key]
+        if not task.cancelled() and task.exception() is not None:
+            # La copia scaduta resta in cache: il prossimo accesso riprova
+            self.metrics.inc("cache_revalidate_errors_total", key.split("?", 1)[0])
+
+    async def _report(
+        self,
+        calls: dict[str, tuple[str, Awaitable[Any]]],
+        top: int,
+        sort: dict[str, str] | None = None,
+    ) -> Any:
+        """Esegue in parallelo le chiamate di un report (fonte → (sezione, chiamata)) e le riassume.
+
+        Le fonti fallite vengono riportate in "Report" senza interrompere le
+        altre (vedi seozoom_mcp.report); solleva SEOZoomError solo se falliscono tutte.
+        """
+        results = await asyncio.gather(*(call for _, call in calls.values()), return_exceptions=True)
+        parts: dict[str, tuple[str, Any]] = {}
+        errors: dict[str, str] = {}
+        for (source, (section, _)), result in zip(calls.items(), results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                errors[source] = str(result)
+            else:
+                parts[source] = (section, result)
+        if not parts:
+            raise SEOZoomError("; ".join(f"{source}: {error}" for source, error in errors.items()))
+        report = build_report(parts, errors, top, sort)
+        if report["UnitsRemaining"] is None:
+            report["UnitsRemaining"] = self.units.remaining
+        return report
+
+    async def _fetch(self, path: str, params: dict[str, Any], compact: bool = False) -> Any:
+        """Esegue la richiesta HTTP autenticata.
+
+        Sceglie la API key dal pool (`keys`, vedi seozoom_mcp.keys) e ne occupa
+        un posto del limitatore. Le risposte 429/5xx e gli errori di rete (tutte
+        le chiamate sono GET, quindi ripetibili) vengono ritentate con backoff;
+        con più chiavi, una chiave non autorizzata o senza unità viene esclusa e
+        la richiesta ripetuta subito su un'altra (gli altri 403 non escludono la chiave). Esauriti i tentativi, o per gli
+        altri errori HTTP, solleva SEOZoomError.
+
+        Con `compact` il corpo viene letto a blocchi e le righe decodificate in
+        Records man mano che arrivano (vedi seozoom_mcp.records).
+        """
+        url = f"{BASE_URL}/{path}/"
+        label = f"{path}/{params.get('action', '')}"
+        attempt = 0
+        while True:
+            hint = None
             try:
-                msg = resp.json().get("message", f"HTTP {resp.status_code}")
-            except Exception:
-                msg = f"HTTP {resp.status_code}"
-            raise SEOZoomError(msg)
-        return resp.json()
+                async with self.keys.slot() as key:
+                    limiter = key.limiter
+                    start = time.monotonic()
+                    try:
+                        if compact:
+                            request = self._http.build_request("GET", url, params={**params, "api_key": key.key})
+                            resp = await self._http.send(request, stream=True)
+                            if resp.status_code >= 400:
+                                # I corpi d'errore sono brevi: letti subito, come senza streaming
+                                await resp.aread()
+                        else:
+                            resp = await self._http.get(url, params={**params, "api_key": key.key})
+                    except (httpx.TimeoutException, httpx.TransportError) as exc:
+                        self.metrics.inc("http_requests_total", type(exc).__name__)
+                        limiter.on_throttle()
+                        if attempt >= self._max_retries:
+                            raise SEOZoomError(f"Errore di rete: {exc!r}") from exc
+                    else:
+                        network = time.monotonic() - start
+                        self.metrics.observe("http_seconds", label, network)
+                        self.metrics.inc("http_requests_total", str(resp.status_code))
+                        if len(self.keys) > 1:
+                            self.metrics.inc("api_key_requests_total", key.name)
+                            if resp.status_code in (AUTH_STATUS, QUOTA_STATUS):
+                                message = _error_message(resp)
+                                # Un 403 per permessi o piano riguarda la richiesta: la chiave resta nel pool
+                                if resp.status_code == AUTH_STATUS or quota_exhausted(message):
+                                    self.keys.eject(key, resp.status_code, message)
+                                    self.metrics.inc("api_key_ejections_total", key.name)
+                                    continue
+                        if resp.status_code not in RETRY_STATUS:
+                            break
+                        limiter.on_throttle()
+                        if attempt >= self._max_retries:
+                            break
+                        hint = retry_after(resp.headers.get("Retry-After"))
+            except NoKeyAvailable as exc:
+                raise SEOZoomError(str(exc)) from exc
+            # L'attesa avviene fuori dal limiter, per non occupare un posto
+            await asyncio.sleep(backoff_delay(attempt, hint))
+            attempt += 1
+        if resp.status_code >= 400:
+            self.metrics.trace("http", tool=_tool_name.get(), action=label, status=resp.status_code,
+                               seconds=round(network, 4), retries=attempt)
+            raise SEOZoomError(_error_message(resp))
+        limiter.on_success(network)
+        with self.metrics.span("http_decode_seconds", label):
+            if compact:
+                # In streaming la decodifica comprende la ricezione del corpo
+                try:
+                    data, size = await decode_stream(resp.aiter_bytes())
+                except ValueError as exc:
+                    raise SEOZoomError(f"Risposta non valida: {exc}") from exc
+                finally:
+                    await resp.aclose()
+            else:
+                data = resp.json()
+                size = len(resp.content)
+        units = data.get("UnitsUsed") if isinstance(data, dict) else None
+        if len(self.keys) > 1 and isinstance(data, dict):
+            # Le unità rimanenti riportate sono quelle dell'intero pool
+            self.keys.update(key, data.get("UnitsRemaining"))
+            data["UnitsRemaining"] = self.keys.remaining
+        self.metrics.observe("http_response_bytes", label, size)
+        if isinstance(units, (int, float)):
+            self.metrics.inc("units_used_total", label, units)
+        self.metrics.trace("http", tool=_tool_name.get(), action=label, status=resp.status_code,
+                           seconds=round(network, 4), bytes=size, units=units, retries=attempt)
+        return data
+
+    async def _get_list(self, path: str, params: dict[str, Any], field: str, values: list[str]) -> Any:
+        """Come _get, per parametri che accettano più valori separati da "|".
+
+        Se i valori superano il limite dell'azione (MAX_ITEMS) li divide in blocchi
+        conformi, esegue le richieste in parallelo e ne unisce i risultati.
+        Le liste più corte passano dal Coalescer, che le unisce alle chiamate
+        concorrenti compatibili.
+        """
+        limit = MAX_ITEMS.get((path, params["action"]))
+        if limit is None or len(values) <= limit:
+            fetch = partial(self.coalescer.submit, field=field) if self.coalescer and limit else None
+            return await self._get(path, {**params, field: "|".join(values)}, fetch)
+
+        async def fetch(chunk: list[str]) -> Any:
+            async with self._fanout:
+                return await self._get(path, {**params, field: "|".join(chunk)})
+
+        chunks = [values[i:i + limit] for i in range(0, len(values), limit)]
+        # Verifica il budget sul costo complessivo prima di avviare i blocchi
+        try:
+            self.units.check(_tool_name.get(), self.units.estimate(path, {**params, field: "|".join(values)}))
+        except BudgetExceeded as exc:
+            raise SEOZoomError(str(exc)) from exc
+        return _merge_responses(await asyncio.gather(*(fetch(c) for c in chunks)))
+
+    async def _paginate(
+        self,
+        fetch_page: Callable[[int, int], Awaitable[Any]],
+        page_size: int,
+        prefetch: int,
+        max_rows: int | None,
+        max_units: int | None,
+        row_cost: float,
+    ) -> AsyncIterator[Any]:
+        """Scorre un endpoint con offset/limit restituendo una pagina alla volta.
+
+        Tiene fino a `prefetch` pagine successive già in richiesta mentre il
+        chiamante elabora quella corrente e si ferma alla prima pagina incompleta
+        o dopo `max_rows` righe. Con `max_units` ogni pagina è ridotta alle righe
+        che restano nel budget, stimate con `row_cost` (unità per riga
+        dell'azione) e poi con il costo osservato sulle pagine ricevute: anche
+        la prima pagina non supera il budget.
+        """
+        pending: deque[tuple[asyncio.Future[Any], int]] = deque()
+        offset = 0
+        # Righe richieste dalle pagine già ricevute
+        consumed = 0
+        units = 0
+        unit_per_row = row_cost
+
+        def schedule() -> bool:
+            nonlocal offset
+            limit = page_size if max_rows is None else min(page_size, max_rows - offset)
+            if max_units is not None and unit_per_row > 0:
+                # Unità ancora libere, tolte quelle previste per le pagine in corso
+                available = max_units - units - (offset - consumed) * unit_per_row
+                limit = min(limit, int(available // unit_per_row))
+            if limit <= 0:
+                return False
+            pending.append((asyncio.ensure_future(fetch_page(offset, limit)), limit))
+            offset += limit
+            return True
+
+        try:
+            # Con un budget la prima pagina da sola: il suo costo reale corregge la stima
+            for _ in range(1 if max_units is not None else prefetch + 1):
+                schedule()
+            while pending:
+                fut, requested = pending.popleft()
+                page = await fut
+                consumed += requested
+                body = page.get("response") if isinstance(page, dict) else page
+                count = len(body) if isinstance(body, (list, Records)) else 0
+                if isinstance(page, dict):
+                    units += page.get("UnitsUsed") or 0
+                    if count and page.get("UnitsUsed"):
+                        unit_per_row = page["UnitsUsed"] / count
+                yield page
+                if count < requested:
+                    break
+                while len(pending) <= prefetch and schedule():
+                    pass
+        finally:
+            for fut, _ in pending:
+                fut.cancel()
+
+    async def _history_range(
+        self,
+        kind: str,
+        db: str,
+        field: str,
+        keys: list[str],
+        dates: list[str],
+        fetch: Callable[[list[str], str], Awaitable[Any]],
+    ) -> Any:
+        """Serie storica di `keys` sulle `dates`, scaricando solo i punti mancanti.
+
+        I punti già presenti nell'archivio locale (salvo bypass_cache) vengono
+        riutilizzati; per ogni data con chiavi mancanti `fetch(chiavi, data)` viene
+        eseguita in parallelo (al massimo SEOZOOM_MAX_CONCURRENCY date alla volta).
+        I punti di date passate sono immutabili e vengono archiviati, ma solo per
+        le chiavi effettivamente presenti nella risposta: una chiave assente non
+        diventa un punto vuoto servito per sempre dall'archivio.
+        Se una data fallisce, i punti già scaricati vengono comunque archiviati
+        prima di rilanciare l'errore.
+        Restituisce una risposta nel formato delle API, con una riga per record
+        e la chiave "History" (punti dall'archivio, scaricati e mancanti).
+        """
+        known = {} if _bypass_cache.get() else await asyncio.to_thread(self.history.get_many, kind, db, keys, dates)
+        stored = len(known)
+        missing = {day: [k for k in keys if (k, day) not in known] for day in dates}
+        sem = asyncio.Semaphore(self._max_concurrency)
+
+        async def load(day: str, todo: list[str]) -> tuple[str, list[str], Any]:
+            async with sem:
+                return day, todo, await fetch(todo, day)
+
+        results = await asyncio.gather(*(load(day, todo) for day, todo in missing.items() if todo), return_exceptions=True)
+        today = _date.today().isoformat()
+        used = 0
+        remaining = None
+        fetched = absent = 0
+        failure: BaseException | None = None
+        archive: list[tuple[str, str, list[Any]]] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                failure = failure or result
+                continue
+            day, todo, data = result
+            records = data.get("response") if isinstance(data, dict) else data
+            records = records if isinstance(records, list) else [records]
+            if isinstance(data, dict):
+                used += data.get("UnitsUsed") or 0
+                remaining = data.get("UnitsRemaining", remaining)
+            by_key: dict[str, list[Any]] = {}
+            for rec in records:
+                owner = rec.get(field) if isinstance(rec, dict) else None
+                # Senza il campo chiave i record appartengono all'unica chiave richiesta
+                owner = str(owner).lower() if owner is not None else (todo[0].lower() if len(todo) == 1 else None)
+                by_key.setdefault(owner, []).append(rec)
+            for key in todo:
+                if key.lower() not in by_key:
+                    # Chiave non restituita: nessun dato per questa risposta, nulla da archiviare
+                    known[(key, day)] = []
+                    absent += 1
+                    continue
+                known[(key, day)] = by_key[key.lower()]
+                fetched += 1
+                if day < today:
+                    archive.append((key, day, known[(key, day)]))
+        await asyncio.to_thread(self.history.put_many, kind, db, archive)
+        if failure is not None:
+            raise failure
+
+        rows = [
+            {**rec, field: rec.get(field, key), "date": day} if isinstance(rec, dict) else {field: key, "date": day, "value": rec}
+            for key in keys for day in dates for rec in known[(key, day)]
+        ]
+        return {
+            "UnitsUsed": used,
+            "UnitsRemaining": remaining if remaining is not None else self.units.remaining,
+            "ResultRows": len(rows),
+            "History": {"stored": stored, "fetched": fetched, "missing": absent},
+            "response": rows,
+        }
 
     # ── Keywords ─────────────────────────────────────────────
     # Endpoint per analisi keyword: metriche, SERP, storico e correlate.
@@ -74,19 +740,17 @@ class SEOZoomClient:
 
     async def keyword_metrics(self, keywords: list[str], db: str | None = None) -> Any:
         """Metriche keyword: volume di ricerca, KD, CPC, intent e trend mensili."""
-        return await self._get("keywords", {
+        return await self._get_list("keywords", {
             "action": "metrics",
             "db": self._db(db),
-            "keyword": "|".join(keywords),
-        })
+        }, "keyword", keywords)
 
     async def keyword_serp(self, keywords: list[str], db: str | None = None) -> Any:
         """Risultati SERP attuali (fino a 50 risultati organici) per le keyword."""
-        return await self._get("keywords", {
+        return await self._get_list("keywords", {
             "action": "serp",
             "db": self._db(db),
-            "keyword": "|".join(keywords),
-        })
+        }, "keyword", keywords)
 
     async def keyword_serp_history(self, keyword: str, date: str, db: str | None = None) -> Any:
         """Snapshot storico della SERP per una keyword in una data specifica."""
@@ -97,6 +761,96 @@ class SEOZoomClient:
             "date": date,
         })
 
+    async def keyword_serp_history_range(
+        self, keyword: str, start: str, end: str, step: str = "month", db: str | None = None,
+    ) -> Any:
+        """Snapshot storici della SERP tra `start` e `end` (passo day/week/month), dall'archivio locale dove possibile."""
+        db = self._db(db)
+        return await self._history_range(
+            "keyword_serp", db, "keyword", [keyword], self._dates(start, end, step),
+            lambda keys, day: self.keyword_serp_history(keys[0], day, db),
+        )
+
+    async def keyword_serp_volatility(
+        self,
+        keywords: list[str],
+        start: str,
+        end: str,
+        step: str = "month",
+        db: str | None = None,
+        depth: int = 10,
+        top: int = 20,
+    ) -> Any:
+        """Volatilità della SERP e movimenti delle URL per `keywords` tra `start` e `end`.
+
+        Gli snapshot vengono scaricati in parallelo (vedi keyword_serp_history_range,
+        le date passate arrivano dall'archivio locale) e analizzati con SerpSeries
+        sulle prime `depth` posizioni. Restituisce le `top` URL con lo spostamento
+        più alto e, nella chiave "Volatility", il riepilogo per keyword.
+        """
+        db = self._db(db)
+        if not 1 <= depth <= 100:
+            raise SEOZoomError("depth deve essere tra 1 e 100")
+        dates = self._dates(start, end, step)
+        results = await asyncio.gather(*(self.keyword_serp_history_range(k, start, end, step, db) for k in keywords))
+        series = SerpSeries(dates, depth)
+        used = stored = fetched = 0
+        remaining = None
+        for keyword, data in zip(keywords, results):
+            used += data["UnitsUsed"]
+            remaining = data["UnitsRemaining"]
+            stored += data["History"]["stored"]
+            fetched += data["History"]["fetched"]
+            for record in data["response"]:
+                series.add(keyword, record["date"], serp_results(record))
+        summary, movers = series.analyze(top)
+        return {
+            "UnitsUsed": used,
+            "UnitsRemaining": remaining,
+            "ResultRows": len(movers),
+            "History": {"stored": stored, "fetched": fetched},
+            "Volatility": summary,
+            "response": movers,
+        }
+
+    async def keyword_search(
+        self,
+        query: str | None = None,
+        db: str | None = None,
+        where: list[str] | None = None,
+        sort: str | None = "-volume",
+        top: int = 50,
+        max_age_days: float | None = None,
+    ) -> Any:
+        """Cerca nell'indice locale le keyword già scaricate, senza chiamate API.
+
+        Vedi KeywordIndex.search; la chiave "Index" riporta le keyword indicizzate
+        per il database, quelle trovate e l'età (giorni) del download più vecchio
+        e più recente tra le trovate.
+        """
+        db = self._db(db)
+        if self.keywords is None:
+            raise SEOZoomError("Indice keyword disattivato (SEOZOOM_KEYWORD_INDEX_PATH=off)")
+        # Le risposte appena ricevute devono essere già nell'indice
+        await asyncio.gather(*self._indexing, return_exceptions=True)
+        try:
+            found = await asyncio.to_thread(self.keywords.search, db, query, where, sort, top, max_age_days)
+        except ValueError as exc:
+            raise SEOZoomError(str(exc)) from exc
+        now = time.time()
+        return {
+            "UnitsUsed": 0,
+            "UnitsRemaining": self.units.remaining,
+            "ResultRows": found["matched"],
+            "Index": {
+                "indexed": found["indexed"],
+                "matched": found["matched"],
+                "oldest": round((now - found["oldest"]) / 86400, 1) if found["oldest"] else None,
+                "newest": round((now - found["newest"]) / 86400, 1) if found["newest"] else None,
+            },
+            "response": found["rows"],
+        }
+
     async def keyword_related(self, keyword: str, db: str | None = None, limit: int | None = None) -> Any:
         """Keyword correlate con volume e affinità SERP (default: 50 risultati)."""
         return await self._get("keywords", {
@@ -112,37 +866,43 @@ class SEOZoomClient:
 
     async def domain_metrics(self, domains: list[str], db: str | None = None) -> Any:
         """Metriche dominio: traffico stimato, keyword posizionate, ZA."""
-        return await self._get("domains", {
+        return await self._get_list("domains", {
             "action": "metrics",
             "db": self._db(db),
-            "domain": "|".join(domains),
-        })
+        }, "domain", domains)
 
     async def domain_metrics_history(self, domains: list[str], date: str, db: str | None = None) -> Any:
         """Metriche storiche di uno o più domini in una data specifica."""
-        return await self._get("domains", {
+        return await self._get_list("domains", {
             "action": "metricshistory",
             "db": self._db(db),
-            "domain": "|".join(domains),
             "date": date,
-        })
+        }, "domain", domains)
+
+    async def domain_metrics_history_range(
+        self, domains: list[str], start: str, end: str, step: str = "month", db: str | None = None,
+    ) -> Any:
+        """Metriche storiche dei domini tra `start` e `end` (passo day/week/month), dall'archivio locale dove possibile."""
+        db = self._db(db)
+        return await self._history_range(
+            "domain_metrics", db, "domain", domains, self._dates(start, end, step),
+            lambda keys, day: self.domain_metrics_history(keys, day, db),
+        )
 
     async def domain_authority(self, domains: list[str], db: str | None = None) -> Any:
         """Zoom Authority, Trust, Stability e Opportunity per i domini."""
-        return await self._get("domains", {
+        return await self._get_list("domains", {
             "action": "authority",
             "db": self._db(db),
-            "domain": "|".join(domains),
-        })
+        }, "domain", domains)
 
     async def domain_niches(self, domains: list[str], db: str | None = None, limit: int | None = None) -> Any:
         """Nicchie tematiche con topical authority e % keyword (default: 10)."""
-        return await self._get("domains", {
+        return await self._get_list("domains", {
             "action": "niches",
             "db": self._db(db),
-            "domain": "|".join(domains),
             "limit": limit if limit is not None else 10,
-        })
+        }, "domain", domains)
 
     async def domain_best_pages(self, domain: str, db: str | None = None, limit: int | None = None) -> Any:
         """Pagine migliori di un dominio con PZA e keyword totali."""
@@ -153,18 +913,23 @@ class SEOZoomClient:
             "limit": limit,
         })
 
-    async def domain_ai_keywords(self, domain: str, db: str | None = None, offset: int | None = None, limit: int | None = None) -> Any:
-        """Keyword per cui il dominio appare nelle AI Overview di Google."""
+    async def domain_ai_keywords(
+        self, domain: str, db: str | None = None, offset: int | None = None, limit: int | None = None, *, compact: bool = False,
+    ) -> Any:
+        """Keyword per cui il dominio appare nelle AI Overview di Google (`compact`: righe come Records)."""
         return await self._get("domains", {
             "action": "aikeywords",
             "db": self._db(db),
             "domain": domain,
             "offset": offset,
             "limit": limit,
-        })
+        }, compact=compact)
 
-    async def domain_keywords(self, domain: str, type: str, db: str | None = None, offset: int | None = None, limit: int | None = None) -> Any:
-        """Keyword posizionate filtrate per tipo (best, up, down, stable, entered, exited, ecc.)."""
+    async def domain_keywords(
+        self, domain: str, type: str, db: str | None = None, offset: int | None = None, limit: int | None = None,
+        *, compact: bool = False,
+    ) -> Any:
+        """Keyword posizionate filtrate per tipo (best, up, down, stable, entered, exited, ecc.; `compact`: righe come Records)."""
         return await self._get("domains", {
             "action": "keywords",
             "db": self._db(db),
@@ -172,16 +937,129 @@ class SEOZoomClient:
             "type": type,
             "offset": offset,
             "limit": limit,
-        })
+        }, compact=compact)
+
+    def domain_keywords_pages(
+        self,
+        domain: str,
+        type: str,
+        db: str | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: int = DEFAULT_PREFETCH,
+        max_rows: int | None = None,
+        max_units: int | None = None,
+    ) -> AsyncIterator[Any]:
+        """Iteratore asincrono su tutte le pagine di domain_keywords (vedi _paginate), con le righe come Records."""
+        return self._paginate(
+            lambda offset, limit: self.domain_keywords(domain, type, db, offset, limit, compact=True),
+            page_size, prefetch, max_rows, max_units, self.units.row_cost("domains", "keywords"),
+        )
+
+    def domain_ai_keywords_pages(
+        self,
+        domain: str,
+        db: str | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: int = DEFAULT_PREFETCH,
+        max_rows: int | None = None,
+        max_units: int | None = None,
+    ) -> AsyncIterator[Any]:
+        """Iteratore asincrono su tutte le pagine di domain_ai_keywords (vedi _paginate), con le righe come Records."""
+        return self._paginate(
+            lambda offset, limit: self.domain_ai_keywords(domain, db, offset, limit, compact=True),
+            page_size, prefetch, max_rows, max_units, self.units.row_cost("domains", "aikeywords"),
+        )
 
     async def domain_competitors(self, domains: list[str], db: str | None = None, limit: int | None = None) -> Any:
         """Principali competitor organici di uno o più domini."""
-        return await self._get("domains", {
+        return await self._get_list("domains", {
             "action": "competitor",
             "db": self._db(db),
-            "domain": "|".join(domains),
             "limit": limit,
-        })
+        }, "domain", domains)
+
+    async def keyword_gap(
+        self,
+        domain: str,
+        competitors: list[str] | None = None,
+        db: str | None = None,
+        type: str = "best",
+        max_competitors: int = 5,
+        max_rows: int | None = 10_000,
+        max_units: int | None = None,
+        top: int = 50,
+        min_volume: int = 0,
+        gap: str | None = None,
+    ) -> Any:
+        """Keyword gap tra `domain` e i competitor (dati o scoperti con domain_competitors).
+
+        Le keyword di tutti i domini vengono scaricate in parallelo con paginazione
+        automatica (al massimo `max_rows` per dominio; `max_units` è diviso tra i
+        domini) e indicizzate pagina per pagina in un GapIndex. Restituisce le
+        `top` opportunità per punteggio e, nella chiave "Gap", i conteggi.
+        """
+        db = self._db(db)
+        if gap not in (None, "missing", "weaker"):
+            raise SEOZoomError(f"Gap '{gap}' non valido. Usa: missing, weaker")
+        used = 0
+        remaining = None
+        if not competitors:
+            found = await self.domain_competitors([domain], db, max_competitors)
+            used += found.get("UnitsUsed") or 0
+            remaining = found.get("UnitsRemaining")
+            names = (r.get("competitor") or r.get("domain") for r in found.get("response") or [] if isinstance(r, dict))
+            competitors = [n for n in dict.fromkeys(names) if n and n != domain][:max_competitors]
+        if not competitors:
+            raise SEOZoomError(f"Nessun competitor trovato per {domain}")
+        try:
+            index = GapIndex(domain, competitors)
+        except ValueError as exc:
+            raise SEOZoomError(str(exc)) from exc
+        share = max_units // (len(competitors) + 1) if max_units is not None else None
+
+        async def load(name: str, add: Callable[[list[Any]], None]) -> tuple[int, Any]:
+            units, left = 0, None
+            pages = self.domain_keywords_pages(name, type, db, max_rows=max_rows, max_units=share)
+            async with aclosing(pages):
+                async for page in pages:
+                    units += page.get("UnitsUsed") or 0
+                    left = page.get("UnitsRemaining", left)
+                    add(page.get("response") or [])
+            return units, left
+
+        results = await asyncio.gather(
+            load(domain, index.add_target),
+            *(load(name, partial(index.add_competitor, i)) for i, name in enumerate(competitors)),
+        )
+        for units, left in results:
+            used += units
+            remaining = left if left is not None else remaining
+        rows = index.opportunities(top, min_volume, gap)
+        return {
+            "UnitsUsed": used,
+            "UnitsRemaining": remaining if remaining is not None else self.units.remaining,
+            "ResultRows": len(rows),
+            "Gap": index.summary(),
+            "response": rows,
+        }
+
+    async def domain_report(self, domain: str, db: str | None = None, top: int = 20) -> Any:
+        """Report completo di un dominio in una sola chiamata.
+
+        Metriche e authority (in "summary"), nicchie, migliori keyword e keyword
+        nelle AI Overview (unite per keyword), migliori pagine e competitor,
+        scaricati in parallelo; al massimo `top` righe per fonte.
+        """
+        db = self._db(db)
+        return await self._report({
+            "metrics": ("summary", self.domain_metrics([domain], db)),
+            "authority": ("summary", self.domain_authority([domain], db)),
+            "niches": ("niches", self.domain_niches([domain], db, top)),
+            "keywords": ("keywords", self.domain_keywords(domain, "best", db, limit=top)),
+            "ai_keywords": ("keywords", self.domain_ai_keywords(domain, db, limit=top)),
+            "best_pages": ("pages", self.domain_best_pages(domain, db, top)),
+            "competitors": ("competitors", self.domain_competitors([domain], db, top)),
+        }, top)
 
     # ── URLs ─────────────────────────────────────────────────
     # Endpoint per analisi URL: authority, metriche, keyword posizionate e intent gap.
@@ -197,11 +1075,10 @@ class SEOZoomClient:
 
     async def url_metrics(self, urls: list[str], db: str | None = None) -> Any:
         """Metriche dettagliate per URL: keyword totali, traffico, PZA."""
-        return await self._get("urls", {
+        return await self._get_list("urls", {
             "action": "metrics",
             "db": self._db(db),
-            "url": "|".join(urls),
-        })
+        }, "url", urls)
 
     async def url_keywords(self, url: str, db: str | None = None, limit: int | None = None) -> Any:
         """Keyword per cui una URL è posizionata con volumi, posizioni e CPC."""
@@ -221,6 +1098,20 @@ class SEOZoomClient:
             "limit": limit,
         })
 
+    async def url_report(self, url: str, db: str | None = None, top: int = 20) -> Any:
+        """Report completo di una URL in una sola chiamata.
+
+        PZA e metriche (in "summary"), keyword posizionate e keyword di intent
+        gap unite per keyword, scaricate in parallelo; al massimo `top` righe per fonte.
+        """
+        db = self._db(db)
+        return await self._report({
+            "authority": ("summary", self.url_page_authority(url, db)),
+            "metrics": ("summary", self.url_metrics([url], db)),
+            "keywords": ("keywords", self.url_keywords(url, db, top)),
+            "intent_gap": ("keywords", self.url_intent_gap(url, db, top)),
+        }, top)
+
     # ── Projects ─────────────────────────────────────────────
     # Endpoint per gestione progetti SEOZoom: lista, overview, keyword e pagine.
     # Ogni progetto è identificato dal suo ID univoco.
@@ -292,3 +1183,21 @@ class SEOZoomClient:
             "id": id,
             "limit": limit,
         })
+
+    async def project_report(self, id: str, db: str | None = None, top: int = DEFAULT_REPORT_TOP) -> Any:
+        """Report completo di un progetto in una sola chiamata.
+
+        Overview (in "summary"), keyword con più traffico e pagine (migliori,
+        con più keyword, con potenziale, in crescita, in calo) unite per URL,
+        scaricate in parallelo; al massimo `top` righe per fonte.
+        """
+        db = self._db(db)
+        return await self._report({
+            "overview": ("summary", self.project_overview(id, db)),
+            "keywords": ("keywords", self.project_keywords(id, db)),
+            "best_pages": ("pages", self.project_best_pages(id, db, top)),
+            "pages_with_more_keywords": ("pages", self.project_pages_with_more_keywords(id, db, top)),
+            "pages_with_potential": ("pages", self.project_pages_with_potential(id, db, top)),
+            "winner_pages": ("pages", self.project_winner_pages(id, db, top)),
+            "loser_pages": ("pages", self.project_loser_pages(id, db, top)),
+        }, top, sort={"keywords": "-traffic"})
@@ -0,0 +1,179 @@
+"""Formati di output compatti per le risposte dei tool.
+
+Il JSON indentato è leggibile ma pesante: per risposte con molte righe
+(keyword_serp, project_keywords, ...) conviene ridurre i byte inviati al
+modello. Qui si trovano la serializzazione nei vari formati e le operazioni
+lato server sulle liste di record: filtro, ordinamento, top-N, proiezione e
+confronto tra mercati.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+from typing import Any
+
+# Formati supportati da render()
+FORMATS = ("json", "compact", "table", "csv")
+
+# Condizione di filtro: campo, operatore, valore (es. "volume>=1000", "intent=commercial", "keyword~scarpe")
+_CONDITION = re.compile(r"^\s*([\w.]+)\s*(>=|<=|!=|>|<|=|~)\s*(.*?)\s*$")
+
+
+def _number(value: Any) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value))
+    except ValueError:
+        return None
+
+
+def _matches(record: dict[str, Any], field: str, op: str, expected: str) -> bool:
+    value = record.get(field)
+    if value is None:
+        return False
+    if op == "~":
+        return expected.lower() in str(value).lower()
+    left, right = _number(value), _number(expected)
+    if left is None or right is None:
+        # Confronto testuale (case-insensitive) se uno dei due non è numerico
+        left_s, right_s = str(value).lower(), expected.lower()
+        return {"=": left_s == right_s, "!=": left_s != right_s}.get(op, False)
+    return {
+        "=": left == right, "!=": left != right,
+        ">": left > right, "<": left < right,
+        ">=": left >= right, "<=": left <= right,
+    }[op]
+
+
+def parse_where(conditions: list[str]) -> list[tuple[str, str, str]]:
+    """Interpreta le condizioni di filtro; solleva ValueError se non valide."""
+    parsed = []
+    for cond in conditions:
+        m = _CONDITION.match(cond)
+        if m is None:
+            raise ValueError(f"Condizione '{cond}' non valida. Usa campo OP valore con OP tra = != > < >= <= ~")
+        parsed.append((m.group(1), m.group(2), m.group(3)))
+    return parsed
+
+
+def select(
+    records: list[Any],
+    fields: list[str] | None = None,
+    sort: str | None = None,
+    top: int | None = None,
+    where: list[str] | None = None,
+) -> list[Any]:
+    """Filtra, ordina, tronca e proietta una lista di record.
+
+    `sort` è il nome di un campo, con "-" davanti per l'ordine decrescente;
+    i record senza il campo finiscono in fondo. Gli elementi che non sono
+    dizionari vengono lasciati invariati (e ignorati da filtro e ordinamento).
+    Solleva ValueError per condizioni, ordinamento o top non validi.
+    """
+    if top is not None and top < 0:
+        raise ValueError(f"top deve essere >= 0, ricevuto {top}")
+    if sort is not None and not sort.lstrip("-").strip():
+        raise ValueError(f"Ordinamento '{sort}' non valido: indica un campo, con - davanti per l'ordine decrescente")
+    if where:
+        conditions = parse_where(where)
+        records = [r for r in records if isinstance(r, dict) and all(_matches(r, *c) for c in conditions)]
+    if sort:
+        sort = sort.strip()
+        field, reverse = (sort[1:].strip(), True) if sort.startswith("-") else (sort, False)
+        present = [r for r in records if isinstance(r, dict) and r.get(field) is not None]
+        missing = [r for r in records if not (isinstance(r, dict) and r.get(field) is not None)]
+
+        def key(r: dict[str, Any]) -> tuple[int, Any]:
+            n = _number(r[field])
+            return (0, n) if n is not None else (1, str(r[field]).lower())
+
+        records = sorted(present, key=key, reverse=reverse) + missing
+    if top is not None:
+        records = records[:top]
+    if fields:
+        records = [{f: r.get(f) for f in fields} if isinstance(r, dict) else r for r in records]
+    return records
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return str(value)
+
+
+def _columns(records: list[dict[str, Any]]) -> list[str]:
+    # Unione delle chiavi nell'ordine in cui compaiono
+    columns: dict[str, None] = {}
+    for r in records:
+        columns.update(dict.fromkeys(r))
+    return list(columns)
+
+
+# Campi che identificano un record nel confronto tra mercati
+_ENTITY_FIELDS = ("keyword", "domain", "url", "competitor", "niche", "date")
+
+
+def compare(records: list[Any], markets: list[str], field: str = "db") -> list[dict[str, Any]]:
+    """Tabella di confronto tra mercati: una riga per (entità, campo numerico), una colonna per mercato.
+
+    L'entità è data dai campi identificativi presenti nei record (keyword,
+    domain, url, date, ...); il mercato di ogni record è nel campo `field`. Vengono
+    confrontate solo le entità presenti in almeno due mercati; se non ce ne
+    sono, o i record non hanno campi identificativi, restituisce [].
+    """
+    rows = [r for r in records if isinstance(r, dict)]
+    keys = [k for k in _ENTITY_FIELDS if any(k in r for r in rows)]
+    if not keys:
+        return []
+    by_entity: dict[tuple[Any, ...], dict[Any, dict[str, Any]]] = {}
+    for r in rows:
+        entity = tuple(_cell(r.get(k)) for k in keys)
+        by_entity.setdefault(entity, {}).setdefault(r.get(field), r)
+    numeric = [
+        c for c in _columns(rows)
+        if c not in keys and c != field
+        and any(isinstance(r.get(c), (int, float)) and not isinstance(r.get(c), bool) for r in rows)
+    ]
+    table = []
+    for entity, values in by_entity.items():
+        if len(values) < 2:
+            continue
+        for c in numeric:
+            table.append({**dict(zip(keys, entity)), "campo": c, **{m: values.get(m, {}).get(c) for m in markets}})
+    return table
+
+
+def render(body: Any, format: str = "json") -> str:
+    """Serializza il corpo di una risposta nel formato richiesto.
+
+    json: JSON indentato (default); compact: JSON senza spazi;
+    table: righe separate da tab con intestazione; csv: CSV con intestazione.
+    table e csv valgono per le liste di record: per le altre risposte si usa compact.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Formato '{format}' non valido. Usa: {', '.join(FORMATS)}")
+    if format == "json":
+        return json.dumps(body, ensure_ascii=False, indent=2)
+    is_table = isinstance(body, list) and body and all(isinstance(r, dict) for r in body)
+    if format == "compact" or not is_table:
+        return json.dumps(body, ensure_ascii=False, separators=(",", ":"))
+    columns = _columns(body)
+    if format == "table":
+        lines = ["\t".join(columns)]
+        for r in body:
+            lines.append("\t".join(_cell(r.get(c)).replace("\t", " ").replace("\n", " ") for c in columns))
+        return "\n".join(lines)
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    for r in body:
+        writer.writerow([_cell(r.get(c)) for c in columns])
+    return buf.getvalue().rstrip("\n")
@@ -0,0 +1,169 @@
+"""Analisi del gap di keyword tra un dominio e i suoi competitor.
+
+GapIndex riceve in streaming le keyword posizionate del dominio target e dei
+competitor, una pagina alla volta, e conserva solo colonne compatte (array
+di interi) indicizzate da un dizionario keyword → id: la memoria cresce con
+il numero di keyword distinte, non con le righe scaricate, e le pagine
+possono essere scartate appena lette.
+
+Le opportunità sono pesate per volume e per il CTR stimato della posizione:
+- missing: keyword su cui almeno un competitor è posizionato e il target no;
+- weaker: keyword su cui il target è posizionato peggio del miglior competitor.
+"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections.abc import Iterable
+from typing import Any
+
+# CTR organico stimato per le posizioni 1-10; oltre la decima si usano i valori di coda
+CTR_BY_POSITION = (0.28, 0.15, 0.11, 0.08, 0.07, 0.05, 0.04, 0.03, 0.025, 0.02)
+CTR_PAGE_TWO = 0.01
+CTR_BEYOND = 0.002
+
+# Competitor massimi per analisi (uno per bit della maschera di presenza)
+MAX_COMPETITORS = 30
+
+
+def ctr(position: int) -> float:
+    """CTR stimato di una posizione organica (0 = non posizionato)."""
+    if position <= 0:
+        return 0.0
+    if position <= len(CTR_BY_POSITION):
+        return CTR_BY_POSITION[position - 1]
+    return CTR_PAGE_TWO if position <= 20 else CTR_BEYOND
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class GapIndex:
+    """Indice keyword → posizioni del target e dei competitor.
+
+    Per ogni keyword distinta: volume, posizione del target, miglior posizione
+    tra i competitor, competitor che la detiene e maschera dei competitor
+    posizionati. Le righe ripetute (più URL per la stessa keyword) tengono la
+    posizione migliore.
+    """
+
+    def __init__(self, target: str, competitors: list[str]) -> None:
+        if len(competitors) > MAX_COMPETITORS:
+            raise ValueError(f"Troppi competitor: massimo {MAX_COMPETITORS}")
+        self.target = target
+        self.competitors = competitors
+        self.rows = dict.fromkeys([target, *competitors], 0)
+        self._ids: dict[str, int] = {}
+        self._keywords: list[str] = []
+        self._volume = array("q")
+        self._target_pos = array("H")
+        self._best_pos = array("H")
+        self._best_by = array("B")
+        self._mask = array("L")
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def _id(self, keyword: str) -> int:
+        i = self._ids.get(keyword)
+        if i is None:
+            i = self._ids[keyword] = len(self._keywords)
+            self._keywords.append(keyword)
+            self._volume.append(0)
+            self._target_pos.append(0)
+            self._best_pos.append(0)
+            self._best_by.append(0)
+            self._mask.append(0)
+        return i
+
+    def _rows(self, domain: str, rows: Iterable[Any]) -> Iterable[tuple[int, int]]:
+        """(id, posizione) delle righe valide, aggiornando volume e conteggi."""
+        for row in rows:
+            if not isinstance(row, dict) or not row.get("keyword"):
+                continue
+            position = _int(row.get("position"))
+            if position <= 0:
+                continue
+            self.rows[domain] += 1
+            i = self._id(str(row["keyword"]).strip().lower())
+            volume = _int(row.get("volume"))
+            if volume > self._volume[i]:
+                self._volume[i] = volume
+            yield i, min(position, 65535)
+
+    def add_target(self, rows: Iterable[Any]) -> None:
+        """Aggiunge una pagina di keyword del dominio target."""
+        for i, position in self._rows(self.target, rows):
+            if not self._target_pos[i] or position < self._target_pos[i]:
+                self._target_pos[i] = position
+
+    def add_competitor(self, index: int, rows: Iterable[Any]) -> None:
+        """Aggiunge una pagina di keyword del competitor `index`."""
+        bit = 1 << index
+        for i, position in self._rows(self.competitors[index], rows):
+            self._mask[i] |= bit
+            if not self._best_pos[i] or position < self._best_pos[i]:
+                self._best_pos[i] = position
+                self._best_by[i] = index
+
+    def summary(self) -> dict[str, Any]:
+        """Conteggi: keyword distinte, condivise, mancanti, più deboli, esclusive del target."""
+        shared = missing = weaker = unique = 0
+        for target, best in zip(self._target_pos, self._best_pos):
+            if target and best:
+                shared += 1
+                weaker += target > best
+            elif best:
+                missing += 1
+            elif target:
+                unique += 1
+        return {
+            "keywords": len(self),
+            "rows": dict(self.rows),
+            "shared": shared,
+            "missing": missing,
+            "weaker": weaker,
+            "unique": unique,
+        }
+
+    def score(self, i: int) -> float:
+        """Punteggio di opportunità della keyword `i` (0 = nessuna opportunità).
+
+        missing: volume × CTR della miglior posizione competitor, maggiorato fino
+        al doppio in base alla quota di competitor posizionati; weaker: volume ×
+        CTR guadagnabile raggiungendo la miglior posizione competitor.
+        """
+        best, target = self._best_pos[i], self._target_pos[i]
+        if not best or (target and target <= best):
+            return 0.0
+        if not target:
+            share = self._mask[i].bit_count() / len(self.competitors)
+            return self._volume[i] * ctr(best) * (1 + share)
+        return self._volume[i] * (ctr(best) - ctr(target))
+
+    def opportunities(self, top: int = 50, min_volume: int = 0, gap: str | None = None) -> list[dict[str, Any]]:
+        """Le `top` opportunità con punteggio più alto (gap: "missing", "weaker" o entrambe)."""
+        candidates = (
+            i for i in range(len(self))
+            if self._best_pos[i] and self._volume[i] >= min_volume
+            and (gap is None or (gap == "missing") == (not self._target_pos[i]))
+        )
+        best = heapq.nlargest(top, ((self.score(i), i) for i in candidates))
+        return [
+            {
+                "keyword": self._keywords[i],
+                "gap": "weaker" if self._target_pos[i] else "missing",
+                "volume": self._volume[i],
+                "position": self._target_pos[i] or None,
+                "best_position": self._best_pos[i],
+                "best_competitor": self.competitors[self._best_by[i]],
+                "competitors": self._mask[i].bit_count(),
+                "score": round(score, 1),
+            }
+            for score, i in best if score > 0
+        ]
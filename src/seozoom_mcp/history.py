@@ -0,0 +1,119 @@
+"""Archivio locale delle serie storiche.
+
+I dati storici di SEOZoom (metricshistory, serphistory) per date passate non
+cambiano mai: HistoryStore li conserva in un file SQLite, un punto per
+(tipo, db, dominio/keyword, data), così le richieste su intervalli di date
+scaricano solo i punti mancanti. Letture e scritture sono pensate per girare
+in un thread separato (asyncio.to_thread); un lock serializza l'uso della
+connessione e ogni scrittura è un'unica transazione.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from calendar import monthrange
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+DEFAULT_HISTORY_PATH = Path.home() / ".cache" / "seozoom-mcp" / "history.sqlite3"
+
+# Passi ammessi per date_range
+STEPS = ("day", "week", "month")
+
+# Numero massimo di parametri per query SQLite (limite prudente)
+_SQL_BATCH = 500
+
+
+def date_range(start: str, end: str, step: str = "month") -> list[str]:
+    """Date (yyyy-MM-dd) da `start` a `end` inclusi, con passo day, week o month.
+
+    Con passo mensile si mantiene il giorno di `start`, limitato all'ultimo giorno del mese.
+    """
+    if step not in STEPS:
+        raise ValueError(f"Passo '{step}' non valido. Usa: {', '.join(STEPS)}")
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    if first > last:
+        raise ValueError(f"Intervallo non valido: {start} è successiva a {end}")
+    dates = []
+    current = first
+    months = 0
+    while current <= last:
+        dates.append(current.isoformat())
+        if step == "day":
+            current += timedelta(days=1)
+        elif step == "week":
+            current += timedelta(weeks=1)
+        else:
+            months += 1
+            year, month = first.year + (first.month - 1 + months) // 12, (first.month - 1 + months) % 12 + 1
+            current = date(year, month, min(first.day, monthrange(year, month)[1]))
+    return dates
+
+
+class HistoryStore:
+    """Punti storici su SQLite, chiave (kind, db, key, date).
+
+    `kind` distingue le serie ("domain_metrics", "keyword_serp"); `data` è la
+    lista di record restituita dalle API per quella chiave e data, in JSON compatto.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_HISTORY_PATH) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            " kind TEXT NOT NULL, db TEXT NOT NULL, key TEXT NOT NULL, date TEXT NOT NULL, data TEXT NOT NULL,"
+            " PRIMARY KEY (kind, db, key, date)) WITHOUT ROWID"
+        )
+
+    def get_many(self, kind: str, db: str, keys: list[str], dates: list[str]) -> dict[tuple[str, str], list[Any]]:
+        """Punti già archiviati per le chiavi e le date indicate."""
+        if not keys or not dates:
+            return {}
+        wanted = set(dates)
+        found: dict[tuple[str, str], list[Any]] = {}
+        for i in range(0, len(keys), _SQL_BATCH):
+            batch = keys[i:i + _SQL_BATCH]
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT key, date, data FROM points WHERE kind = ? AND db = ? AND date BETWEEN ? AND ?"
+                    f" AND key IN ({','.join('?' * len(batch))})",
+                    (kind, db, min(dates), max(dates), *batch),
+                ).fetchall()
+            for key, day, data in rows:
+                if day in wanted:
+                    found[(key, day)] = json.loads(data)
+        return found
+
+    def put_many(self, kind: str, db: str, points: list[tuple[str, str, list[Any]]]) -> None:
+        """Archivia (key, date, records) in un'unica transazione; sovrascrive i punti esistenti."""
+        if not points:
+            return
+        rows = [
+            (kind, db, key, day, json.dumps(data, ensure_ascii=False, separators=(",", ":"))) for key, day, data in points
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO points (kind, db, key, date, data) VALUES (?, ?, ?, ?, ?)", rows)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def history_from_env() -> HistoryStore:
+    """Archivio su SEOZOOM_HISTORY_PATH (default ~/.cache/seozoom-mcp/history.sqlite3, "off" = solo in memoria)."""
+    path = os.environ.get("SEOZOOM_HISTORY_PATH") or DEFAULT_HISTORY_PATH
+    return HistoryStore(":memory:" if path == "off" else path)
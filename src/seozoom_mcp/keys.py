@@ -0,0 +1,197 @@
+"""Pool di API key SEOZoom con instradamento in base alle unità residue.
+
+Con più abbonamenti ogni richiesta HTTP viene assegnata alla chiave con più
+unità rimanenti e, a parità, con meno richieste in corso rispetto al proprio
+limite. Ogni chiave ha un AdaptiveLimiter: i 429 e i 5xx ricevuti su una
+chiave ne riducono solo la concorrenza, e una chiave satura cede le
+richieste alle altre invece di farle attendere.
+
+Le chiavi che rispondono con errori di autenticazione (401) escono dal pool;
+quelle con unità esaurite (403 con un messaggio sulle unità, vedi
+quota_exhausted) vengono riprovate dopo QUOTA_COOLDOWN secondi. Gli altri 403
+(permessi o piano che non include l'endpoint) riguardano la richiesta, non la
+chiave, che resta nel pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import re
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+from seozoom_mcp.limiter import AdaptiveLimiter
+
+# Codici HTTP che indicano un problema della chiave, non della richiesta
+AUTH_STATUS = 401
+QUOTA_STATUS = 403
+
+# Secondi dopo cui una chiave con unità esaurite torna nel pool
+QUOTA_COOLDOWN = 3600.0
+
+# Parole che, nel messaggio di un 403, indicano unità esaurite
+_QUOTA_MESSAGE = re.compile(r"\b(units?|credits?|quota|exhausted|esaurit[aeio])\b", re.IGNORECASE)
+
+
+def quota_exhausted(message: str) -> bool:
+    """True se il messaggio di un 403 riguarda le unità esaurite e non i permessi."""
+    return _QUOTA_MESSAGE.search(message) is not None
+
+
+class NoKeyAvailable(Exception):
+    """Sollevata quando tutte le chiavi del pool sono escluse."""
+
+
+class ApiKey:
+    """Una chiave del pool con il suo stato: unità residue, limitatore ed esclusione."""
+
+    def __init__(self, key: str, name: str, initial: int = 4, maximum: int = 32) -> None:
+        self.key = key
+        # Etichetta per metriche e diagnostica: la chiave non compare mai nei log
+        self.name = name
+        self.limiter = AdaptiveLimiter(initial=initial, maximum=maximum)
+        self.remaining: int | None = None
+        self.requests = 0
+        # Esclusione: fino a quando (inf = definitiva) e perché
+        self.disabled_until = 0.0
+        self.error: str | None = None
+
+    def active(self, now: float) -> bool:
+        return now >= self.disabled_until
+
+    def free(self) -> bool:
+        return self.limiter.free()
+
+
+class KeyPool:
+    """Chiavi API tra cui distribuire le richieste (vedi modulo)."""
+
+    def __init__(self, keys: list[ApiKey]) -> None:
+        if not keys:
+            raise ValueError("Nessuna API key configurata")
+        self.keys = keys
+        self._cond = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def remaining(self) -> int | None:
+        """Unità rimanenti sommate sulle chiavi attive di cui sono note."""
+        now = time.time()
+        known = [k.remaining for k in self.keys if k.remaining is not None and k.active(now)]
+        return sum(known) if known else None
+
+    def _pick(self) -> ApiKey | None:
+        now = time.time()
+        active = [k for k in self.keys if k.active(now)]
+        if not active:
+            names = ", ".join(f"{k.name} ({k.error})" for k in self.keys)
+            raise NoKeyAvailable(f"Nessuna API key disponibile: {names}")
+        free = [k for k in active if k.free()]
+        if not free:
+            return None
+        # Le chiavi mai usate (residuo ignoto) vengono provate per prime
+        return max(
+            free,
+            key=lambda k: (math.inf if k.remaining is None else k.remaining, -k.limiter.inflight / k.limiter.limit),
+        )
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[ApiKey]:
+        """Sceglie una chiave e ne occupa un posto per la durata di una richiesta.
+
+        Se tutte le chiavi attive sono sature attende che se ne liberi una;
+        solleva NoKeyAvailable se non resta nessuna chiave attiva.
+        """
+        async with self._cond:
+            key = self._pick()
+            while key is None:
+                # Ricontrolla almeno ogni secondo: una chiave esclusa può tornare disponibile
+                try:
+                    await asyncio.wait_for(self._cond.wait(), 1.0)
+                except TimeoutError:
+                    pass
+                key = self._pick()
+            key.limiter.acquire()
+            key.requests += 1
+        try:
+            yield key
+        finally:
+            async with self._cond:
+                key.limiter.release()
+                self._cond.notify_all()
+
+    def update(self, key: ApiKey, remaining: Any) -> None:
+        """Registra le unità rimanenti riportate da una risposta della chiave."""
+        if isinstance(remaining, (int, float)):
+            key.remaining = int(remaining)
+
+    def eject(self, key: ApiKey, status: int, message: str) -> None:
+        """Esclude la chiave: per sempre se non autorizzata, per QUOTA_COOLDOWN se senza unità (403).
+
+        Per un 403 va chiamata solo se quota_exhausted(message).
+        """
+        key.error = f"{status} {message}"
+        if status == QUOTA_STATUS:
+            key.remaining = 0
+            key.disabled_until = time.time() + QUOTA_COOLDOWN
+        else:
+            key.disabled_until = math.inf
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Stato di ogni chiave (senza il segreto), per check_units."""
+        now = time.time()
+        return [
+            {
+                "name": k.name,
+                "remaining": k.remaining,
+                "inflight": k.limiter.inflight,
+                "limit": int(k.limiter.limit),
+                "requests": k.requests,
+                "active": k.active(now),
+                "error": k.error,
+            }
+            for k in self.keys
+        ]
+
+
+def _read_keys_file(path: str) -> list[tuple[str | None, str]]:
+    """Righe "chiave" o "nome=chiave"; le righe vuote e i commenti (#) vengono ignorati."""
+    entries = []
+    for line in Path(path).expanduser().read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            name, sep, key = line.partition("=")
+            entries.append((name.strip(), key.strip()) if sep else (None, line))
+    return entries
+
+
+def key_pool_from_env() -> KeyPool:
+    """Pool dalle variabili d'ambiente.
+
+    SEOZOOM_API_KEY: una chiave; SEOZOOM_API_KEYS: più chiavi separate da
+    virgola; SEOZOOM_API_KEYS_FILE: file con una chiave per riga (vedi
+    _read_keys_file). Le fonti si sommano, senza duplicati.
+    SEOZOOM_LIMITER_INITIAL / SEOZOOM_LIMITER_MAX valgono per ogni chiave.
+    Solleva ValueError se non c'è nessuna chiave.
+    """
+    entries: list[tuple[str | None, str]] = []
+    if os.environ.get("SEOZOOM_API_KEYS_FILE"):
+        entries += _read_keys_file(os.environ["SEOZOOM_API_KEYS_FILE"])
+    entries += [(None, k.strip()) for k in os.environ.get("SEOZOOM_API_KEYS", "").split(",")]
+    entries.append((None, os.environ.get("SEOZOOM_API_KEY", "").strip()))
+    initial = int(os.environ.get("SEOZOOM_LIMITER_INITIAL", "4"))
+    maximum = int(os.environ.get("SEOZOOM_LIMITER_MAX", "32"))
+    keys: dict[str, ApiKey] = {}
+    for name, key in entries:
+        if key and key not in keys:
+            keys[key] = ApiKey(key, name or f"key{len(keys) + 1}", initial, maximum)
+    if not keys:
+        raise ValueError("SEOZOOM_API_KEY environment variable is required")
+    return KeyPool(list(keys.values()))
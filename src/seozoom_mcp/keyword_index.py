@@ -0,0 +1,265 @@
+"""Indice locale delle keyword già scaricate.
+
+Ogni riga di keyword ricevuta dalle API (keyword_metrics, keyword_related,
+url_keywords, project_keywords, domain_keywords, ...) viene salvata in un
+file SQLite con volume, KD, CPC, intent, trend, database, azione di origine e
+istante di download. keyword_search interroga l'indice con filtri e
+ordinamenti in pochi millisecondi, senza chiamate API né unità spese.
+
+La ricerca testuale usa FTS5 quando disponibile nella build di SQLite,
+altrimenti LIKE.
+
+La scrittura è divisa in due passi: rows() estrae le righe dalla risposta
+(veloce, sul thread del chiamante) e write() le inserisce in un'unica
+transazione, pensata per girare in un thread separato (asyncio.to_thread)
+senza bloccare l'event loop. Un lock serializza l'uso della connessione.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from seozoom_mcp.formatting import parse_where
+from seozoom_mcp.records import Records
+
+DEFAULT_INDEX_PATH = Path.home() / ".cache" / "seozoom-mcp" / "keywords.sqlite3"
+
+# Azioni (endpoint, action) le cui righe contengono keyword da indicizzare
+INDEXED_ACTIONS = {
+    ("keywords", "metrics"),
+    ("keywords", "related"),
+    ("urls", "keywords"),
+    ("urls", "intentgap"),
+    ("domains", "keywords"),
+    ("domains", "aikeywords"),
+    ("projects", "keywords"),
+}
+
+# Colonna dell'indice → campi equivalenti nelle risposte API
+_ALIASES = {
+    "volume": ("volume", "search_volume"),
+    "kd": ("kd", "difficulty", "keyword_difficulty"),
+    "cpc": ("cpc",),
+    "intent": ("intent",),
+    "trend": ("trend", "trends"),
+}
+
+# Colonne interrogabili da keyword_search (where e sort)
+_NUMERIC = {"volume", "kd", "cpc"}
+_TEXT = {"keyword", "intent", "source"}
+
+
+def _first(row: dict[str, Any], names: tuple[str, ...]) -> Any:
+    for name in names:
+        if row.get(name) is not None:
+            return row[name]
+    return None
+
+
+def _like(value: str) -> str:
+    """Pattern LIKE "contiene" per `value`, con % e _ trattati come caratteri normali (ESCAPE '\\')."""
+    return "%" + value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _number(value: Any, kind: type) -> Any:
+    try:
+        return kind(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class KeywordIndex:
+    """Keyword indicizzate su SQLite, una riga per (db, keyword).
+
+    Un nuovo download aggiorna `fetched` e i campi presenti nella risposta,
+    mantenendo quelli già noti che la nuova fonte non riporta.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_INDEX_PATH) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS keywords ("
+            " id INTEGER PRIMARY KEY, db TEXT NOT NULL, keyword TEXT NOT NULL,"
+            " volume INTEGER, kd REAL, cpc REAL, intent TEXT, trend TEXT,"
+            " source TEXT NOT NULL, fetched REAL NOT NULL, UNIQUE (db, keyword));"
+            "CREATE INDEX IF NOT EXISTS keywords_volume ON keywords (db, volume);"
+            "CREATE INDEX IF NOT EXISTS keywords_kd ON keywords (db, kd);"
+            "CREATE INDEX IF NOT EXISTS keywords_intent ON keywords (db, intent);"
+        )
+        try:
+            self._db.executescript(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS keywords_fts USING fts5("
+                " keyword, content='keywords', content_rowid='id');"
+                "CREATE TRIGGER IF NOT EXISTS keywords_ai AFTER INSERT ON keywords BEGIN"
+                " INSERT INTO keywords_fts (rowid, keyword) VALUES (new.id, new.keyword); END;"
+                "CREATE TRIGGER IF NOT EXISTS keywords_ad AFTER DELETE ON keywords BEGIN"
+                " INSERT INTO keywords_fts (keywords_fts, rowid, keyword) VALUES ('delete', old.id, old.keyword); END;"
+            )
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite compilato senza FTS5
+            self.fts = False
+
+    def add(self, path: str, params: dict[str, Any], data: Any) -> int:
+        """Indicizza le righe con keyword di una risposta API; restituisce quante."""
+        return self.write(self.rows(path, params, data))
+
+    def rows(self, path: str, params: dict[str, Any], data: Any) -> list[tuple[Any, ...]]:
+        """Righe da indicizzare di una risposta API (vuota se l'azione non contiene keyword)."""
+        if (path, params.get("action")) not in INDEXED_ACTIONS or not isinstance(data, dict):
+            return []
+        body = data.get("response")
+        if not isinstance(body, (list, Records)):
+            return []
+        db = str(params.get("db") or "")
+        source = f"{path}/{params['action']}"
+        now = time.time()
+        rows = []
+        for row in body:
+            if not isinstance(row, dict) or not row.get("keyword"):
+                continue
+            trend = _first(row, _ALIASES["trend"])
+            rows.append((
+                db,
+                str(row["keyword"]).strip().lower(),
+                _number(_first(row, _ALIASES["volume"]), int),
+                _number(_first(row, _ALIASES["kd"]), float),
+                _number(_first(row, _ALIASES["cpc"]), float),
+                _first(row, _ALIASES["intent"]),
+                json.dumps(trend, separators=(",", ":")) if trend is not None else None,
+                source,
+                now,
+            ))
+        return rows
+
+    def write(self, rows: list[tuple[Any, ...]]) -> int:
+        """Inserisce o aggiorna le righe preparate da rows() in un'unica transazione."""
+        if not rows:
+            return 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                # UPDATE al posto di REPLACE: l'id (e quindi la riga FTS) resta invariato
+                self._db.executemany(
+                    "INSERT INTO keywords (db, keyword, volume, kd, cpc, intent, trend, source, fetched)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (db, keyword) DO UPDATE SET"
+                    " volume = coalesce(excluded.volume, volume), kd = coalesce(excluded.kd, kd),"
+                    " cpc = coalesce(excluded.cpc, cpc), intent = coalesce(excluded.intent, intent),"
+                    " trend = coalesce(excluded.trend, trend), source = excluded.source, fetched = excluded.fetched",
+                    rows,
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return len(rows)
+
+    def search(
+        self,
+        db: str,
+        text: str | None = None,
+        where: list[str] | None = None,
+        sort: str | None = "-volume",
+        limit: int = 50,
+        max_age_days: float | None = None,
+    ) -> dict[str, Any]:
+        """Keyword dell'indice per `db` che soddisfano i filtri.
+
+        `text`: parole contenute nella keyword (FTS5, a prefisso); `where`:
+        condizioni come in formatting.select su keyword, volume, kd, cpc, intent,
+        source (nomi senza distinzione tra maiuscole e minuscole); `sort`: uno di quei campi o age_days, con "-" davanti per
+        l'ordine decrescente; `max_age_days`: solo le keyword scaricate negli
+        ultimi N giorni.
+        Restituisce {"rows": [...], "matched": n, "indexed": totale per db,
+        "oldest"/"newest": istanti di download (epoch) delle righe trovate}.
+        Solleva ValueError per campi od operatori non supportati.
+        """
+        clauses = ["k.db = ?"]
+        args: list[Any] = [db]
+        join = ""
+        if text:
+            words = [w for w in text.lower().split() if w]
+            if self.fts:
+                join = " JOIN keywords_fts f ON f.rowid = k.id"
+                clauses.append("keywords_fts MATCH ?")
+                args.append(" ".join('"' + w.replace('"', '""') + '"*' for w in words))
+            else:
+                for w in words:
+                    clauses.append("k.keyword LIKE ? ESCAPE '\\'")
+                    args.append(_like(w))
+        if max_age_days is not None:
+            clauses.append("k.fetched >= ?")
+            args.append(time.time() - max_age_days * 86400)
+        for field, op, value in parse_where(where or []):
+            # I nomi dei campi non distinguono maiuscole e minuscole (es. "KD<30")
+            field = field.lower()
+            if field not in _NUMERIC | _TEXT:
+                raise ValueError(f"Campo '{field}' non filtrabile. Usa: {', '.join(sorted(_NUMERIC | _TEXT))}")
+            if op == "~":
+                clauses.append(f"k.{field} LIKE ? ESCAPE '\\'")
+                args.append(_like(value))
+            elif field in _NUMERIC:
+                try:
+                    args.append(float(value))
+                except ValueError:
+                    raise ValueError(f"Valore non numerico per {field}: '{value}'") from None
+                clauses.append(f"k.{field} {'<>' if op == '!=' else op} ?")
+            elif op in ("=", "!="):
+                clauses.append(f"lower(k.{field}) {'=' if op == '=' else '<>'} lower(?)")
+                args.append(value)
+            else:
+                raise ValueError(f"Operatore '{op}' non valido per il campo testuale {field}")
+        order = ""
+        if sort:
+            sort = sort.strip()
+            field, desc = (sort[1:], True) if sort.startswith("-") else (sort, False)
+            field = field.strip().lower()
+            if field == "age_days":
+                # età crescente = download più recente
+                field, desc = "fetched", not desc
+            elif field not in _NUMERIC | _TEXT:
+                raise ValueError(f"Campo di ordinamento '{field}' non valido")
+            order = f" ORDER BY k.{field} IS NULL, k.{field} {'DESC' if desc else 'ASC'}"
+        where_sql = " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            matched, oldest, newest = self._db.execute(
+                f"SELECT count(*), min(k.fetched), max(k.fetched) FROM keywords k{join}{where_sql}", args
+            ).fetchone()
+            found = self._db.execute(
+                f"SELECT k.keyword, k.volume, k.kd, k.cpc, k.intent, k.trend, k.source, k.fetched"
+                f" FROM keywords k{join}{where_sql}{order} LIMIT ?",
+                [*args, limit],
+            ).fetchall()
+            indexed = self._db.execute("SELECT count(*) FROM keywords WHERE db = ?", (db,)).fetchone()[0]
+        now = time.time()
+        rows = [
+            {
+                "keyword": keyword, "volume": volume, "kd": kd, "cpc": cpc, "intent": intent,
+                "trend": json.loads(trend) if trend else None, "source": source,
+                "age_days": round((now - fetched) / 86400, 1),
+            }
+            for keyword, volume, kd, cpc, intent, trend, source, fetched in found
+        ]
+        return {"rows": rows, "matched": matched, "indexed": indexed, "oldest": oldest, "newest": newest}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def keyword_index_from_env() -> KeywordIndex | None:
+    """Indice su SEOZOOM_KEYWORD_INDEX_PATH (default ~/.cache/seozoom-mcp/keywords.sqlite3, "off" = disattivato)."""
+    path = os.environ.get("SEOZOOM_KEYWORD_INDEX_PATH") or DEFAULT_INDEX_PATH
+    if path == "off":
+        return None
+    return KeywordIndex(path)
@@ -0,0 +1,102 @@
+"""Controllo adattivo della concorrenza e backoff per le API SEOZoom.
+
+AdaptiveLimiter applica un algoritmo AIMD (additive increase, multiplicative
+decrease): finché la latenza resta stabile il numero di richieste contemporanee
+cresce di circa una unità per ciclo, mentre a ogni 429, 5xx o timeout viene
+dimezzato. Il limitatore non fa attendere: KeyPool (vedi seozoom_mcp.keys)
+sceglie una chiave con un posto libero, o attende che se ne liberi uno, e
+occupa il posto con acquire/release. backoff_delay calcola l'attesa tra un
+tentativo e il successivo.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Una risposta è "stabile" se la sua latenza non supera la media mobile di questo fattore
+LATENCY_TOLERANCE = 2.0
+
+# Attesa base e massima (secondi) del backoff esponenziale
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+
+class AdaptiveLimiter:
+    """Limite di richieste contemporanee variabile secondo l'algoritmo AIMD.
+
+    Il limite parte da `initial` e resta compreso tra `minimum` e `maximum`.
+    Dopo un dimezzamento, altri segnali di sovraccarico ricevuti entro una
+    latenza media non lo riducono ulteriormente (sono effetto dello stesso picco).
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.inflight = 0
+        self.latency: float | None = None
+        self._last_decrease = 0.0
+        # Statistiche
+        self.throttled = 0
+
+    def free(self) -> bool:
+        """True se c'è un posto libero entro il limite corrente."""
+        return self.inflight < int(self.limit)
+
+    def acquire(self) -> None:
+        """Occupa un posto per una richiesta (il chiamante ha verificato free())."""
+        self.inflight += 1
+
+    def release(self) -> None:
+        """Libera il posto di una richiesta conclusa."""
+        self.inflight -= 1
+
+    def on_success(self, latency: float) -> None:
+        """Registra una risposta riuscita: se la latenza è stabile aumenta il limite."""
+        if self.latency is None:
+            self.latency = latency
+        stable = latency <= self.latency * LATENCY_TOLERANCE
+        self.latency = 0.8 * self.latency + 0.2 * latency
+        if stable and self.limit < self.maximum:
+            # I task in attesa su KeyPool vengono svegliati al rilascio del posto di questa richiesta
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttle(self) -> None:
+        """Registra un segnale di sovraccarico (429, 5xx, timeout): dimezza il limite."""
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self._last_decrease < (self.latency or 0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit / 2)
+
+
+def retry_after(value: str | None) -> float | None:
+    """Interpreta l'header Retry-After (secondi o data HTTP) in secondi di attesa."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, hint: float | None = None) -> float:
+    """Attesa prima del tentativo `attempt` (0 = primo retry).
+
+    Usa il valore di Retry-After se presente, altrimenti un backoff esponenziale
+    con jitter completo, limitato a BACKOFF_MAX.
+    """
+    if hint is not None:
+        return min(hint, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
@@ -0,0 +1,203 @@
+"""Metriche e strumentazione del server.
+
+Metrics raccoglie istogrammi di latenza e contatori per tool MCP e per
+azione API (rete, decodifica JSON, serializzazione _fmt, byte, codici HTTP,
+unità). Gli aggregati sono disponibili come dizionario (snapshot), in formato
+testo Prometheus (prometheus) e, se SEOZOOM_TRACE_FILE è impostata, come
+traccia JSONL con un evento per richiesta e per chiamata di tool.
+
+profiled() attiva su richiesta cProfile o tracemalloc per una singola
+chiamata di tool (SEOZOOM_PROFILE), salvando il risultato su file.
+"""
+
+from __future__ import annotations
+
+import bisect
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+# Limiti superiori dei bucket degli istogrammi di durata (secondi) e dimensione (byte)
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+DEFAULT_PROFILE_DIR = Path.home() / ".cache" / "seozoom-mcp" / "profiles"
+
+
+class Histogram:
+    """Istogramma a bucket fissi con conteggio, somma e massimo."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Stima del quantile q: limite superiore del bucket che lo contiene."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+
+class Metrics:
+    """Registro di istogrammi e contatori etichettati.
+
+    Nomi usati dal client: http_seconds, http_decode_seconds, http_response_bytes
+    (etichetta: endpoint/action), http_requests_total (etichetta: codice HTTP),
+    units_used_total e cache_hits_total (etichetta: endpoint/action). Dal server: tool_seconds,
+    tool_fmt_seconds, tool_response_bytes, tool_calls_total, tool_errors_total
+    (etichetta: nome del tool).
+    """
+
+    def __init__(self, trace_path: str | Path | None = None) -> None:
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.counters: dict[tuple[str, str], float] = {}
+        self._trace = Path(trace_path).expanduser().open("a", encoding="utf-8") if trace_path else None
+        self.started = time.time()
+
+    def observe(self, name: str, label: str, value: float) -> None:
+        hist = self.histograms.get((name, label))
+        if hist is None:
+            hist = Histogram(BYTES_BUCKETS if name.endswith("_bytes") else SECONDS_BUCKETS)
+            self.histograms[(name, label)] = hist
+        hist.observe(value)
+
+    def inc(self, name: str, label: str, value: float = 1) -> None:
+        self.counters[(name, label)] = self.counters.get((name, label), 0) + value
+
+    @contextmanager
+    def span(self, name: str, label: str) -> Iterator[None]:
+        """Misura la durata del blocco nell'istogramma `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, label, time.perf_counter() - start)
+
+    def trace(self, event: str, **fields: Any) -> None:
+        """Aggiunge un evento alla traccia JSONL, se attiva."""
+        if self._trace is not None:
+            self._trace.write(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, ensure_ascii=False) + "\n")
+            self._trace.flush()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Aggregati correnti: {"histograms": {nome: {etichetta: stats}}, "counters": {...}}."""
+        histograms: dict[str, dict[str, Any]] = {}
+        for (name, label), hist in sorted(self.histograms.items()):
+            histograms.setdefault(name, {})[label] = hist.snapshot()
+        counters: dict[str, dict[str, float]] = {}
+        for (name, label), value in sorted(self.counters.items()):
+            counters.setdefault(name, {})[label] = value
+        return {"uptime_seconds": round(time.time() - self.started), "histograms": histograms, "counters": counters}
+
+    def prometheus(self) -> str:
+        """Aggregati nel formato testo di Prometheus (metriche con prefisso seozoom_)."""
+        lines: list[str] = []
+        for name in sorted({n for n, _ in self.histograms}):
+            lines.append(f"# TYPE seozoom_{name} histogram")
+            for (n, label), hist in sorted(self.histograms.items()):
+                if n != name:
+                    continue
+                key = "tool" if name.startswith("tool_") else "action"
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f'seozoom_{name}_bucket{{{key}="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'seozoom_{name}_bucket{{{key}="{label}",le="+Inf"}} {hist.count}')
+                lines.append(f'seozoom_{name}_sum{{{key}="{label}"}} {hist.sum}')
+                lines.append(f'seozoom_{name}_count{{{key}="{label}"}} {hist.count}')
+        for name in sorted({n for n, _ in self.counters}):
+            lines.append(f"# TYPE seozoom_{name} counter")
+            key = {"http_requests_total": "status"}.get(name, "tool" if name.startswith("tool_") else "action")
+            for (n, label), value in sorted(self.counters.items()):
+                if n == name:
+                    lines.append(f'seozoom_{name}{{{key}="{label}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+
+def metrics_from_env() -> Metrics:
+    """Metrics con traccia JSONL su SEOZOOM_TRACE_FILE, se impostata."""
+    return Metrics(os.environ.get("SEOZOOM_TRACE_FILE") or None)
+
+
+# Evita profilazioni sovrapposte: cProfile e tracemalloc sono globali al processo
+_profiling = False
+
+
+@contextmanager
+def profiled(tool: str) -> Iterator[None]:
+    """Profila una chiamata di tool se richiesto da SEOZOOM_PROFILE.
+
+    SEOZOOM_PROFILE: "cprofile" (file .prof, da aprire con pstats o snakeviz)
+    oppure "tracemalloc" (file .txt con picco di memoria e prime 25 allocazioni).
+    SEOZOOM_PROFILE_TOOLS: tool da profilare, separati da virgola (default: tutti).
+    SEOZOOM_PROFILE_DIR: cartella di destinazione (default ~/.cache/seozoom-mcp/profiles).
+    Nel loop asincrono cProfile registra anche le coroutine concorrenti; le
+    chiamate che partono mentre un'altra è già profilata non vengono profilate.
+    """
+    global _profiling
+    mode = os.environ.get("SEOZOOM_PROFILE", "").lower()
+    tools = {t.strip() for t in os.environ.get("SEOZOOM_PROFILE_TOOLS", "").split(",") if t.strip()}
+    if mode not in ("cprofile", "tracemalloc") or (tools and tool not in tools) or _profiling:
+        yield
+        return
+    out_dir = Path(os.environ.get("SEOZOOM_PROFILE_DIR") or DEFAULT_PROFILE_DIR).expanduser()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = out_dir / f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}-{time.monotonic_ns() % 1_000_000}"
+    _profiling = True
+    try:
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(f"{stem}.prof")
+        else:
+            tracemalloc.start()
+            try:
+                yield
+            finally:
+                _, peak = tracemalloc.get_traced_memory()
+                top = tracemalloc.take_snapshot().statistics("lineno")[:25]
+                tracemalloc.stop()
+                report = [f"{tool}: picco {peak / 1024:.1f} KiB"] + [str(stat) for stat in top]
+                Path(f"{stem}.txt").write_text("\n".join(report) + "\n", encoding="utf-8")
+    finally:
+        _profiling = False
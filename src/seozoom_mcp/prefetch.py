@@ -0,0 +1,242 @@
+"""Aggiornamento in background dei dati dei progetti.
+
+I tool project_* sono i più usati ogni giorno e ognuno attende una chiamata
+API. ProjectPrefetcher scarica periodicamente project_list e, per ogni
+progetto, le sette azioni di dettaglio, così le chiamate dei tool trovano la
+cache già calda. Le pagine vengono scaricate anche nella variante con
+`limit=top` richiesta da project_report, che altrimenti non troverebbe mai
+le risposte aggiornate. Ogni ciclo resta entro un budget di unità: il costo
+di ogni chiamata è previsto da quello del ciclo precedente e le azioni più
+costose (project_keywords) vengono aggiornate per ultime.
+
+Mentre il prefetch è attivo le risposte di progetto scadute restano servibili
+per SEOZOOM_PREFETCH_MAX_STALE secondi: il tool le restituisce subito e il
+client le ricarica in background (stale-while-revalidate, vedi
+SEOZoomClient._get).
+
+Con più worker HTTP solo il processo che ottiene il lock su prefetch.lock
+esegue il ciclo; gli altri servono la cache condivisa.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import time
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from seozoom_mcp.cache import DAY
+from seozoom_mcp.client import DEFAULT_REPORT_TOP
+
+try:
+    import fcntl
+except ImportError:  # Windows: niente lock tra processi
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from seozoom_mcp.client import SEOZoomClient
+
+# Azione API → metodo del client, dalla più economica alla più costosa
+PROJECT_ACTIONS = {
+    "overview": "project_overview",
+    "bestpages": "project_best_pages",
+    "winnerpages": "project_winner_pages",
+    "loserpages": "project_loser_pages",
+    "pageswithpotential": "project_pages_with_potential",
+    "pageswithmorekeywords": "project_pages_with_more_keywords",
+    "keywords": "project_keywords",
+}
+
+# Azioni di pagina che project_report richiede con limit=top
+REPORT_PAGE_ACTIONS = ("bestpages", "pageswithmorekeywords", "pageswithpotential", "winnerpages", "loserpages")
+
+# Richieste contemporanee di un ciclo
+DEFAULT_PREFETCH_CONCURRENCY = 4
+
+DEFAULT_LOCK_PATH = Path.home() / ".cache" / "seozoom-mcp" / "prefetch.lock"
+
+
+def project_ids(data: Any) -> list[str]:
+    """ID dei progetti in una risposta di project_list."""
+    body = data.get("response") if isinstance(data, dict) else None
+    ids = []
+    for row in body if isinstance(body, list) else []:
+        if isinstance(row, dict):
+            pid = row.get("id", row.get("id_project", row.get("project_id")))
+            if pid is not None:
+                ids.append(str(pid))
+    return ids
+
+
+class ProjectPrefetcher:
+    """Aggiorna ogni `interval` secondi i dati dei progetti nei database `dbs`.
+
+    `budget`: unità massime spese in un ciclo (None = nessun limite oltre ai
+    budget del registro unità, dove le chiamate sono attribuite al tool
+    "prefetch"); `max_stale`: secondi oltre il TTL per cui una risposta di
+    progetto scaduta viene ancora servita mentre si aggiorna; `report_top`:
+    righe per fonte di project_report, per aggiornarne le varianti delle pagine.
+    """
+
+    def __init__(
+        self,
+        client: SEOZoomClient,
+        interval: float,
+        budget: int | None = None,
+        dbs: list[str] | None = None,
+        max_stale: float = DAY,
+        concurrency: int = DEFAULT_PREFETCH_CONCURRENCY,
+        lock_path: str | Path | None = DEFAULT_LOCK_PATH,
+        report_top: int = DEFAULT_REPORT_TOP,
+    ) -> None:
+        self.client = client
+        self.interval = interval
+        self.budget = budget
+        self.dbs = [client._db(d) for d in dbs] if dbs else [client._db(None)]
+        self.max_stale = max_stale
+        self.concurrency = concurrency
+        self.lock_path = Path(lock_path) if lock_path else None
+        # (azione, limit) in ordine di costo: prima le varianti ridotte di project_report
+        self.actions = [
+            ("overview", None),
+            *((action, report_top) for action in REPORT_PAGE_ACTIONS),
+            *((action, None) for action in PROJECT_ACTIONS if action != "overview"),
+        ]
+        # Statistiche dell'ultimo ciclo completato
+        self.last: dict[str, Any] | None = None
+        # Unità spese dall'ultimo aggiornamento di (db, azione, limit, id progetto)
+        self._costs: dict[tuple[str, str, int | None, str], int] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._lock: IO[str] | None = None
+
+    def start(self) -> None:
+        """Attiva stale-while-revalidate sui progetti e avvia il ciclo periodico.
+
+        Il ciclo parte solo se questo processo ottiene il lock (vedi modulo) e
+        c'è un event loop in esecuzione.
+        """
+        self.client.prefetcher = self
+        self.client.stale_paths["projects"] = self.max_stale
+        if self._task is not None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._acquire():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Interrompe il ciclo e rilascia il lock."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def _acquire(self) -> bool:
+        if self.lock_path is None or fcntl is None:
+            return True
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock = self.lock_path.open("a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return False
+        self._lock = lock
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                # Il ciclo successivo riprova; intanto la cache resta com'è
+                self.client.metrics.inc("prefetch_errors_total", type(exc).__name__)
+            await asyncio.sleep(self.interval)
+
+    def _expected(self, db: str, action: str, limit: int | None, pid: str) -> int:
+        """Costo previsto: quello dell'ultimo aggiornamento o il più alto visto per l'azione."""
+        cost = self._costs.get((db, action, limit, pid))
+        if cost is not None:
+            return cost
+        seen = [c for (d, a, n, _), c in self._costs.items() if (d, a, n) == (db, action, limit)]
+        params = {"action": action, "id": pid, "limit": limit}
+        return max(seen) if seen else self.client.units.estimate("projects", {k: v for k, v in params.items() if v is not None})
+
+    async def refresh(self) -> dict[str, Any]:
+        """Esegue un ciclo di aggiornamento e ne restituisce le statistiche (anche in `last`)."""
+        client = self.client
+        stats = {"started": time.time(), "projects": 0, "calls": 0, "units": 0, "errors": 0, "skipped": 0}
+        sem = asyncio.Semaphore(self.concurrency)
+        reserved = 0
+
+        async def call(db: str, action: str, pid: str, limit: int | None = None) -> Any:
+            nonlocal reserved
+            async with sem:
+                expected = self._expected(db, action, limit, pid)
+                if self.budget is not None and stats["units"] + reserved + expected > self.budget:
+                    stats["skipped"] += 1
+                    return None
+                reserved += expected
+                try:
+                    if action == "list":
+                        data = await client.project_list(db)
+                    elif limit is None:
+                        data = await getattr(client, PROJECT_ACTIONS[action])(pid, db)
+                    else:
+                        data = await getattr(client, PROJECT_ACTIONS[action])(pid, db, limit)
+                except Exception as exc:
+                    stats["errors"] += 1
+                    client.metrics.inc("prefetch_errors_total", type(exc).__name__)
+                    return None
+                finally:
+                    reserved -= expected
+            used = data.get("UnitsUsed", 0) if isinstance(data, dict) else 0
+            self._costs[(db, action, limit, pid)] = used
+            stats["calls"] += 1
+            stats["units"] += used
+            client.metrics.inc("prefetch_calls_total", f"projects/{action}")
+            return data
+
+        with client.tool_scope("prefetch"), client.bypass_cache():
+            for db in self.dbs:
+                ids = project_ids(await call(db, "list", ""))
+                stats["projects"] += len(ids)
+                for action, limit in self.actions:
+                    if ids:
+                        # Il primo progetto da solo: il suo costo fa da previsione per gli altri
+                        await call(db, action, ids[0], limit)
+                        await asyncio.gather(*(call(db, action, pid, limit) for pid in ids[1:]))
+        stats["seconds"] = round(time.time() - stats["started"], 3)
+        client.metrics.trace("prefetch", **stats)
+        self.last = stats
+        return stats
+
+
+def prefetcher_from_env(client: SEOZoomClient) -> ProjectPrefetcher | None:
+    """Prefetcher configurato dalle variabili d'ambiente, o None se disattivato.
+
+    SEOZOOM_PREFETCH_INTERVAL: secondi tra due cicli (assente o 0 = disattivato).
+    SEOZOOM_PREFETCH_BUDGET: unità massime per ciclo.
+    SEOZOOM_PREFETCH_DBS: database separati da virgola (default: SEOZOOM_DEFAULT_DB).
+    SEOZOOM_PREFETCH_MAX_STALE: secondi oltre il TTL in cui una risposta scaduta è servita (default 1 giorno).
+    """
+    interval = float(os.environ.get("SEOZOOM_PREFETCH_INTERVAL") or 0)
+    if interval <= 0:
+        return None
+    budget = os.environ.get("SEOZOOM_PREFETCH_BUDGET")
+    dbs = [d.strip() for d in os.environ.get("SEOZOOM_PREFETCH_DBS", "").split(",") if d.strip()]
+    return ProjectPrefetcher(
+        client,
+        interval,
+        budget=int(budget) if budget else None,
+        dbs=dbs or None,
+        max_stale=float(os.environ.get("SEOZOOM_PREFETCH_MAX_STALE") or DAY),
+    )
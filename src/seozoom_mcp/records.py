@@ -0,0 +1,235 @@
+"""Decodifica in streaming delle risposte voluminose in righe compatte.
+
+resp.json() attende l'intero corpo, lo decodifica in una stringa e poi in un
+dizionario per riga: su un export di domain_keywords il picco di memoria è
+più volte la dimensione della risposta, e le pagine restano in cache in
+quella forma. StreamDecoder legge il corpo a blocchi man mano che arriva e
+aggiunge ogni riga di "response" a Records appena è completa, senza tenere
+in memoria né il testo intero né i dizionari.
+
+Records conserva le righe per colonna: i campi sempre interi o sempre
+decimali (volume, position, traffic, kd, cpc, ...) in array da 8 byte per
+valore, gli altri in liste con le stringhe ripetute condivise (intent, url).
+Le righe vengono ricostruite come dizionari solo quando lette.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+import sys
+from array import array
+from collections.abc import AsyncIterable, Iterator, Sequence
+from typing import Any
+
+# Segnaposto per un campo assente in una riga (colonne a lista)
+_MISSING: Any = object()
+
+# Tipo dell'array per i valori numerici; bool resta fuori (sottoclasse di int)
+_TYPECODES = {int: "q", float: "d"}
+
+_WS = re.compile(r"[ \t\n\r]*")
+# Caratteri che possono seguire un valore completo
+_DELIMITERS = frozenset(",:]} \t\n\r")
+_DECODER = json.JSONDecoder()
+
+
+class Records(Sequence[dict[str, Any]]):
+    """Righe (dizionari) conservate per colonna; si legge come una lista di dizionari."""
+
+    __slots__ = ("_columns", "_len", "_strings")
+
+    def __init__(self, rows: Iterator[dict[str, Any]] | Sequence[dict[str, Any]] = ()) -> None:
+        self._columns: dict[str, array[Any] | list[Any]] = {}
+        self._len = 0
+        self._strings: dict[str, str] = {}
+        for row in rows:
+            self.append(row)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("indice di riga fuori intervallo")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for i in range(self._len):
+            yield self._row(i)
+
+    def __repr__(self) -> str:
+        return f"Records({self._len} righe, campi: {', '.join(self._columns)})"
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria occupata (approssimata): colonne e stringhe condivise."""
+        size = sys.getsizeof(self._columns)
+        for column in self._columns.values():
+            size += column.itemsize * len(column) if isinstance(column, array) else sys.getsizeof(column)
+        return size + sum(sys.getsizeof(s) for s in self._strings)
+
+    def _row(self, i: int) -> dict[str, Any]:
+        return {field: column[i] for field, column in self._columns.items() if column[i] is not _MISSING}
+
+    def append(self, row: dict[str, Any]) -> None:
+        """Aggiunge una riga; i campi nuovi diventano colonne, quelli assenti restano vuoti."""
+        n = self._len
+        for field, value in row.items():
+            kind = type(value)
+            if kind is str:
+                value = self._strings.setdefault(value, value)
+            column = self._columns.get(field)
+            if column is None:
+                code = _TYPECODES.get(kind)
+                column = self._columns[field] = array(code) if code and not n else [_MISSING] * n
+            elif isinstance(column, array) and _TYPECODES.get(kind) != column.typecode:
+                column = self._columns[field] = list(column)
+            try:
+                column.append(value)
+            except OverflowError:
+                # Intero oltre 64 bit: la colonna diventa una lista
+                column = self._columns[field] = list(column)
+                column.append(value)
+        self._len = n + 1
+        if len(row) != len(self._columns):
+            for field, column in self._columns.items():
+                if len(column) == n:
+                    if isinstance(column, array):
+                        column = self._columns[field] = list(column)
+                    column.append(_MISSING)
+
+
+class StreamDecoder:
+    """Decodifica incrementale di un oggetto JSON con le righe in `field`.
+
+    feed() accetta i byte nell'ordine di arrivo; close() restituisce l'oggetto
+    con `field` come Records (o lista, se contiene valori che non sono
+    oggetti). Un corpo che non è un oggetto JSON viene decodificato per intero
+    alla chiusura. Solleva ValueError se il JSON non è valido o è troncato.
+    """
+
+    def __init__(self, field: str = "response") -> None:
+        self.field = field
+        self.bytes = 0
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._state = "start"
+        self._key: str | None = None
+        self._data: dict[str, Any] = {}
+        self._rows: Records | list[Any] = Records()
+
+    def feed(self, chunk: bytes) -> None:
+        self.bytes += len(chunk)
+        self._buf += self._text.decode(chunk)
+        if self._state != "raw":
+            self._parse(final=False)
+
+    def close(self) -> Any:
+        self._buf += self._text.decode(b"", final=True)
+        if self._state == "raw":
+            return json.loads(self._buf)
+        self._parse(final=True)
+        if self._state != "end":
+            raise ValueError("risposta JSON troncata")
+        return self._data
+
+    def _value(self, pos: int, final: bool) -> tuple[Any, int] | None:
+        """Valore JSON completo in `pos`, o None se servono altri byte."""
+        try:
+            value, end = _DECODER.raw_decode(self._buf, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        # Un numero troncato dal blocco ("1." di "1.5") è già un valore valido:
+        # è completo solo se seguito da un delimitatore
+        if not final and (end == len(self._buf) or self._buf[end] not in _DELIMITERS):
+            return None
+        return value, end
+
+    def _parse(self, final: bool) -> None:
+        buf = self._buf
+        pos = 0
+        while True:
+            pos = _WS.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            char = buf[pos]
+            state = self._state
+            if state == "start":
+                if char != "{":
+                    # Non è un oggetto: nessuna riga da estrarre
+                    self._state = "raw"
+                    break
+                self._state = "key"
+                pos += 1
+            elif state == "key":
+                if char == "}":
+                    self._state = "end"
+                    pos += 1
+                    continue
+                decoded = self._value(pos, final)
+                if decoded is None:
+                    break
+                self._key, pos = decoded
+                self._state = "colon"
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"atteso ':' invece di {char!r}")
+                self._state = "value"
+                pos += 1
+            elif state == "value":
+                if self._key == self.field and char == "[":
+                    self._data[self._key] = self._rows
+                    self._state = "rows"
+                    pos += 1
+                    continue
+                decoded = self._value(pos, final)
+                if decoded is None:
+                    break
+                self._data[self._key], pos = decoded  # type: ignore[index]
+                self._state = "next"
+            elif state == "next":
+                if char not in ",}":
+                    raise ValueError(f"atteso ',' o '}}' invece di {char!r}")
+                self._state = "key" if char == "," else "end"
+                pos += 1
+            elif state in ("rows", "rows_next"):
+                if char == "]":
+                    self._state = "next"
+                    pos += 1
+                elif state == "rows_next":
+                    if char != ",":
+                        raise ValueError(f"atteso ',' o ']' invece di {char!r}")
+                    self._state = "rows"
+                    pos += 1
+                else:
+                    decoded = self._value(pos, final)
+                    if decoded is None:
+                        break
+                    row, pos = decoded
+                    self._add(row)
+                    self._state = "rows_next"
+            else:
+                raise ValueError(f"dati dopo la fine del JSON: {char!r}")
+        # Resta nel buffer solo la parte non ancora decodificata
+        self._buf = buf[pos:]
+
+    def _add(self, row: Any) -> None:
+        if isinstance(self._rows, Records) and not isinstance(row, dict):
+            self._rows = self._data[self.field] = list(self._rows)
+        self._rows.append(row)
+
+
+async def decode_stream(chunks: AsyncIterable[bytes], field: str = "response") -> tuple[Any, int]:
+    """Decodifica una risposta ricevuta a blocchi (vedi StreamDecoder); restituisce (dati, byte letti)."""
+    decoder = StreamDecoder(field)
+    async for chunk in chunks:
+        decoder.feed(chunk)
+    return decoder.close(), decoder.bytes
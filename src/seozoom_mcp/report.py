@@ -0,0 +1,117 @@
+"""Report compositi: più endpoint riassunti in un'unica risposta compatta.
+
+Le risposte delle singole chiamate (eseguite in parallelo dal client) vengono
+raggruppate per sezione:
+
+- "summary": le risposte a record singolo (overview, metriche, authority)
+  fuse in un solo dizionario;
+- le altre sezioni (keywords, pages, ...): le prime `top` righe di ogni fonte,
+  con una sola riga per keyword/URL; le righe presenti in più fonti uniscono
+  i campi e le elencano in "sources".
+
+Le chiamate fallite non interrompono il report: compaiono in "Report" con il
+messaggio d'errore e le altre sezioni vengono restituite comunque.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from seozoom_mcp.formatting import select
+
+# Campo che identifica una riga, per sezione
+SECTION_KEYS = {
+    "keywords": "keyword",
+    "pages": "url",
+    "niches": "niche",
+    "competitors": "competitor",
+}
+
+
+def _rows(data: Any) -> list[Any]:
+    body = data.get("response") if isinstance(data, dict) and "response" in data else data
+    if body is None:
+        return []
+    return body if isinstance(body, list) else [body]
+
+
+def merge_rows(sources: dict[str, list[Any]], key: str | None) -> list[Any]:
+    """Una riga per valore di `key`, nell'ordine di prima apparizione tra le fonti.
+
+    Le righe ripetute si completano a vicenda (vince il primo valore non nullo);
+    con più fonti ogni riga riporta in "sources" quelle in cui compare.
+    """
+    merged: dict[Any, dict[str, Any]] = {}
+    out: list[Any] = []
+    for source, rows in sources.items():
+        for row in rows:
+            if not isinstance(row, dict) or key is None or row.get(key) is None:
+                out.append(row)
+                continue
+            ident = str(row[key]).strip().lower()
+            seen = merged.get(ident)
+            if seen is None:
+                seen = merged[ident] = dict(row)
+                if len(sources) > 1:
+                    seen["sources"] = []
+                out.append(seen)
+            else:
+                for field, value in row.items():
+                    if seen.get(field) is None:
+                        seen[field] = value
+            if len(sources) > 1 and source not in seen["sources"]:
+                seen["sources"].append(source)
+    return out
+
+
+def build_report(
+    parts: dict[str, tuple[str, Any]],
+    errors: dict[str, str],
+    top: int = 20,
+    sort: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Risposta unica da `parts` (fonte → (sezione, risposta API)) ed `errors` (fonte → messaggio).
+
+    `sort`: ordinamento (come formatting.select) da applicare alle righe di una
+    fonte prima di tenerne le prime `top`. Restituisce UnitsUsed sommate,
+    UnitsRemaining più basse, "Report" con righe o errore per fonte e in
+    "response" le sezioni.
+    """
+    sort = sort or {}
+    sections: dict[str, dict[str, list[Any]]] = {}
+    status: dict[str, dict[str, Any]] = {}
+    used = 0
+    remaining = []
+    for source, (section, data) in parts.items():
+        if isinstance(data, dict):
+            used += data.get("UnitsUsed") or 0
+            if isinstance(data.get("UnitsRemaining"), (int, float)) and not data.get("Cache"):
+                remaining.append(data["UnitsRemaining"])
+        rows = _rows(data)
+        status[source] = {"rows": len(rows)}
+        if source in sort:
+            rows = select(rows, sort=sort[source])
+        sections.setdefault(section, {})[source] = rows if section == "summary" else rows[:top]
+    for source, message in errors.items():
+        status[source] = {"error": message}
+
+    response: dict[str, Any] = {}
+    for section, sources in sections.items():
+        if section == "summary":
+            summary: dict[str, Any] = {}
+            for rows in sources.values():
+                for row in rows[:1]:
+                    if isinstance(row, dict):
+                        for field, value in row.items():
+                            if summary.get(field) is None:
+                                summary[field] = value
+            response[section] = summary
+        else:
+            response[section] = merge_rows(sources, SECTION_KEYS.get(section))
+    return {
+        "UnitsUsed": used,
+        "UnitsRemaining": min(remaining) if remaining else None,
+        "ResultRows": sum(len(v) if isinstance(v, list) else 1 for v in response.values()),
+        "Report": status,
+        "response": response,
+    }
@@ -0,0 +1,123 @@
+"""Risultati voluminosi conservati lato server e serviti a pagine.
+
+Le risposte con migliaia di righe (project_keywords, url_keywords,
+keyword_serp, ...) occupano megabyte di JSON: inviate in un solo messaggio
+rallentano la prima risposta utile e riempiono il contesto del modello.
+Oltre SEOZOOM_RESULT_MAX_BYTES il tool restituisce solo la prima pagina e un
+handle opaco; fetch_page serve le pagine successive da ResultStore, senza
+nuove chiamate API.
+
+ResultStore conserva le righe già serializzate (JSON compatto, una stringa
+per riga): la memoria occupata è nota con buona approssimazione e limitata a
+`max_bytes`, con espulsione LRU e scadenza dopo `ttl` secondi dall'ultimo
+accesso. Un risultato più grande dell'intero archivio viene troncato alle
+prime righe che ci stanno, con un avviso nella risposta del tool.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from typing import Any
+
+DEFAULT_STORE_MB = 64
+DEFAULT_RESULT_TTL = 1800.0
+
+# Oltre questa dimensione stimata (byte) un risultato viene paginato
+DEFAULT_RESULT_MAX_BYTES = 50_000
+
+# Righe della prima pagina e di default per fetch_page
+DEFAULT_PAGE_SIZE = 50
+
+
+class _Entry:
+    def __init__(self, rows: list[str], size: int, ttl: float) -> None:
+        self.rows = rows
+        self.size = size
+        self.ttl = ttl
+        self.expires = time.time() + ttl
+
+
+class ResultStore:
+    """Risultati per handle, entro `max_bytes` complessivi (LRU) e `ttl` secondi di inattività."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_STORE_MB * 1024 * 1024,
+        ttl: float = DEFAULT_RESULT_TTL,
+        threshold: int = DEFAULT_RESULT_MAX_BYTES,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Dimensione oltre cui un risultato va paginato (0 = mai)
+        self.threshold = threshold
+        self.bytes = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, rows: list[Any]) -> tuple[str | None, int]:
+        """Conserva `rows` e restituisce l'handle con il numero di righe conservate.
+
+        Un risultato che da solo supera max_bytes viene troncato: si
+        conservano le prime righe che ci stanno. Handle None se non ne
+        entra nessuna.
+        """
+        encoded: list[str] = []
+        size = sys.getsizeof(encoded)
+        for row in rows:
+            line = json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+            # Stringa più il puntatore nella lista
+            cost = sys.getsizeof(line) + 8
+            if size + cost > self.max_bytes:
+                break
+            encoded.append(line)
+            size += cost
+        if not encoded:
+            return None, 0
+        self._expire()
+        while self._entries and self.bytes + size > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.bytes -= old.size
+        handle = "r_" + secrets.token_urlsafe(9)
+        self._entries[handle] = _Entry(encoded, size, self.ttl)
+        self.bytes += size
+        return handle, len(encoded)
+
+    def page(self, handle: str, cursor: int = 0, size: int = DEFAULT_PAGE_SIZE) -> tuple[list[Any], int]:
+        """Righe [cursor, cursor+size) del risultato e numero totale di righe.
+
+        Solleva ValueError se l'handle è sconosciuto o scaduto.
+        """
+        self._expire()
+        entry = self._entries.get(handle)
+        if entry is None:
+            raise ValueError(f"Risultato '{handle}' non trovato o scaduto: ripeti la chiamata del tool")
+        if cursor < 0 or size < 1:
+            raise ValueError("cursor deve essere >= 0 e size >= 1")
+        entry.expires = time.time() + entry.ttl
+        self._entries.move_to_end(handle)
+        return [json.loads(r) for r in entry.rows[cursor:cursor + size]], len(entry.rows)
+
+    def _expire(self) -> None:
+        now = time.time()
+        for handle in [h for h, e in self._entries.items() if e.expires <= now]:
+            self.bytes -= self._entries.pop(handle).size
+
+
+def result_store_from_env() -> ResultStore:
+    """ResultStore dalle variabili d'ambiente.
+
+    SEOZOOM_RESULT_STORE_MB: memoria massima (default 64).
+    SEOZOOM_RESULT_TTL: secondi di inattività prima della scadenza (default 1800).
+    SEOZOOM_RESULT_MAX_BYTES: dimensione oltre cui paginare (default 50000, 0 = mai).
+    """
+    megabytes = float(os.environ.get("SEOZOOM_RESULT_STORE_MB") or DEFAULT_STORE_MB)
+    ttl = float(os.environ.get("SEOZOOM_RESULT_TTL") or DEFAULT_RESULT_TTL)
+    threshold = int(os.environ.get("SEOZOOM_RESULT_MAX_BYTES", DEFAULT_RESULT_MAX_BYTES))
+    return ResultStore(int(megabytes * 1024 * 1024), ttl, threshold)
@@ -1,302 +1,1115 @@
 """Server MCP per SEOZoom.
 
-Espone 24 tool + 1 utility per analisi SEO tramite il protocollo MCP (Model Context Protocol).
-Ogni tool corrisponde a un endpoint delle API SEOZoom v2 e restituisce i risultati
+Espone 33 tool + 3 utility per analisi SEO tramite il protocollo MCP (Model Context Protocol).
+Ogni tool corrisponde a un endpoint delle API SEOZoom v2 (o ne combina più chiamate) e restituisce i risultati
 formattati in JSON leggibile, con intestazione sul consumo di unità API.
 
-Trasporto: stdio (pensato per integrazione con Claude Desktop / Claude Code).
+Trasporto: stdio (pensato per integrazione con Claude Desktop / Claude Code) oppure
+streamable HTTP con `seozoom-mcp http`, per servire più client da un solo processo.
+Il client API viene creato al primo utilizzo (get_client), non all'import:
+l'elenco dei tool risponde subito anche senza SEOZOOM_API_KEY.
 """
 
 from __future__ import annotations
 
+import functools
+import hmac
 import json
-from typing import Annotated
-
+import logging
+import os
+import sys
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing, asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated
+
+import anyio
 from mcp.server.fastmcp import FastMCP
 
-from seozoom_mcp.client import SEOZoomClient
+from seozoom_mcp.formatting import compare, render, select
+from seozoom_mcp.metrics import profiled
+
+if TYPE_CHECKING:
+    from mcp.server.transport_security import TransportSecuritySettings
+    from starlette.applications import Starlette
+    from starlette.types import ASGIApp, Receive, Scope, Send
+
+    from seozoom_mcp.client import SEOZoomClient
+    from seozoom_mcp.results import ResultStore
 
-# Inizializzazione server MCP e client API
+# Cartella in cui domain_keywords_export scrive i file (SEOZOOM_EXPORT_DIR)
+DEFAULT_EXPORT_DIR = Path.home() / ".cache" / "seozoom-mcp" / "exports"
+
+# Inizializzazione server MCP; il client API è creato da get_client()
 mcp = FastMCP("seozoom")
-client = SEOZoomClient()
+_client: SEOZoomClient | None = None
+_results: ResultStore | None = None
+# False nel server HTTP: i client remoti non possono scrivere file sull'host (output_file)
+_local_files = True
+
+
+def get_client() -> SEOZoomClient:
+    """Restituisce il client API condiviso, creandolo alla prima chiamata.
+
+    Lettura delle variabili d'ambiente, pool HTTP, cache e registro unità
+    vengono inizializzati solo quando un tool li usa davvero. Se
+    SEOZOOM_PREFETCH_INTERVAL è impostata avvia anche l'aggiornamento in
+    background dei progetti (vedi seozoom_mcp.prefetch).
+    """
+    global _client
+    if _client is None:
+        from seozoom_mcp.client import SEOZoomClient
+        from seozoom_mcp.prefetch import prefetcher_from_env
+
+        _client = SEOZoomClient()
+        prefetcher = prefetcher_from_env(_client)
+        if prefetcher is not None:
+            prefetcher.start()
+    return _client
+
+
+def get_results() -> ResultStore:
+    """Archivio dei risultati paginati (vedi seozoom_mcp.results), creato al primo utilizzo."""
+    global _results
+    if _results is None:
+        from seozoom_mcp.results import result_store_from_env
+
+        _results = result_store_from_env()
+    return _results
 
 
-def _fmt(data: object) -> str:
+def _tool(fn: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """Registra `fn` come tool MCP, attribuendogli le unità delle chiamate che esegue.
+
+    Ogni chiamata viene misurata (durata, byte restituiti, errori) nelle metriche
+    del client e, se richiesto da SEOZOOM_PROFILE, profilata.
+    La firma (e quindi lo schema esposto all'LLM) resta quella di `fn`.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args: object, **kwargs: object) -> str:
+        client = get_client()
+        metrics = client.metrics
+        metrics.inc("tool_calls_total", name)
+        start = time.perf_counter()
+        error = None
+        try:
+            with client.tool_scope(name), profiled(name):
+                result = await fn(*args, **kwargs)
+        except Exception as exc:
+            error = type(exc).__name__
+            metrics.inc("tool_errors_total", name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe("tool_seconds", name, elapsed)
+            if error:
+                metrics.trace("tool", tool=name, seconds=round(elapsed, 4), error=error)
+        size = len(result.encode("utf-8"))
+        metrics.observe("tool_response_bytes", name, size)
+        metrics.trace("tool", tool=name, seconds=round(elapsed, 4), bytes=size)
+        return result
+
+    return mcp.tool()(wrapper)
+
+
+def _fmt(
+    data: object,
+    format: str = "json",
+    fields: list[str] | None = None,
+    sort: str | None = None,
+    top: int | None = None,
+    where: list[str] | None = None,
+) -> str:
     """Formatta la risposta API in testo leggibile.
 
     Se la risposta contiene info sulle unità consumate (UnitsUsed),
     aggiunge un'intestazione con costo, unità rimanenti e numero risultati.
-    Il corpo viene serializzato in JSON indentato con supporto caratteri unicode.
+    Le risposte servite dalla cache riportano le unità risparmiate.
+    Se il corpo è una lista di record vi applica filtro, ordinamento, top-N e
+    proiezione dei campi, poi lo serializza nel formato richiesto
+    (vedi seozoom_mcp.formatting; default: JSON indentato con caratteri unicode).
     """
+    client = get_client()
+    with client.metrics.span("tool_fmt_seconds", client.current_tool() or "-"):
+        return _render(data, format, fields, sort, top, where)
+
+
+def _render(
+    data: object,
+    format: str,
+    fields: list[str] | None,
+    sort: str | None,
+    top: int | None,
+    where: list[str] | None,
+) -> str:
+    """Corpo di _fmt: intestazione, selezione delle righe e serializzazione."""
+    body = data.get("response", data) if isinstance(data, dict) and "UnitsUsed" in data else data
+    markets = data.get("Markets") if isinstance(data, dict) else None
+    if markets and fields and "db" not in fields:
+        fields = ["db", *fields]
+    shown = ""
+    if isinstance(body, list) and (fields or sort or top is not None or where):
+        total = len(body)
+        body = select(body, fields, sort, top, where)
+        shown = f" | Mostrati: {len(body)} di {total}"
     if isinstance(data, dict) and "UnitsUsed" in data:
         used = data.get("UnitsUsed", "?")
         remaining = data.get("UnitsRemaining", "?")
         rows = data.get("ResultRows", "?")
-        header = f"[Costo: {used} unit | Rimanenti: {remaining} | Risultati: {rows}]\n\n"
-        return header + json.dumps(data.get("response", data), ensure_ascii=False, indent=2)
-    return json.dumps(data, ensure_ascii=False, indent=2)
+        cache = data.get("Cache")
+        history = data.get("History")
+        if history:
+            shown += f" | Storico: {history['stored']} punti dall'archivio, {history['fetched']} scaricati"
+            if history.get("missing"):
+                shown += f", {history['missing']} senza dati"
+        volatility = data.get("Volatility")
+        index = data.get("Index")
+        report = data.get("Report")
+        if report:
+            shown += " | Fonti: " + ", ".join(
+                f"{source} errore ({r['error']})" if "error" in r else f"{source} {r['rows']}" for source, r in report.items()
+            )
+        if index:
+            age = f", scaricate da {index['newest']} a {index['oldest']} giorni fa" if index["matched"] else ""
+            shown += f" | Indice: {index['matched']} di {index['indexed']} keyword{age}"
+        gap = data.get("Gap")
+        if gap:
+            shown += (
+                f" | Gap su {gap['keywords']} keyword: {gap['missing']} mancanti, {gap['weaker']} più deboli,"
+                f" {gap['shared']} condivise, {gap['unique']} esclusive"
+            )
+        if markets:
+            shown += " | Mercati: " + ", ".join(
+                f"{db} errore ({m['Error']})" if "Error" in m else f"{db} {m['UnitsUsed']} unit" for db, m in markets.items()
+            )
+        if cache:
+            hit = "parziale" if cache.get("partial") else "scaduta, aggiornamento in corso" if cache.get("stale") else "hit"
+            header = (
+                f"[Costo: {used} unit | Cache: {hit}, risparmiate {cache['saved']} unit, età {cache['age']}s"
+                f" | Rimanenti: {remaining} | Risultati: {rows}{shown}]\n\n"
+            )
+        else:
+            header = f"[Costo: {used} unit | Rimanenti: {remaining} | Risultati: {rows}{shown}]\n\n"
+        if markets and isinstance(body, list):
+            table = compare(body, [db for db, m in markets.items() if "Error" not in m])
+            if table:
+                header += f"Confronto tra mercati:\n{render(table, 'csv' if format == 'csv' else 'table')}\n\n"
+        if volatility:
+            header += f"Volatilità per keyword:\n{render(volatility, 'csv' if format == 'csv' else 'table')}\n\n"
+        if report and format in ("table", "csv") and isinstance(body, dict):
+            # Una tabella per sezione
+            return header + "\n\n".join(
+                f"{section}:\n{render([rows] if isinstance(rows, dict) else rows, format)}" for section, rows in body.items()
+            )
+        return header + _paged(body, format)
+    return _paged(body, format)
+
+
+def _paged(body: object, format: str) -> str:
+    """Serializza `body`; una lista oltre la soglia dell'archivio viene conservata sul server.
+
+    La dimensione è stimata dalla prima pagina: se la supera, il tool
+    restituisce solo quella con l'handle da passare a fetch_page. Le righe
+    che non entrano nell'archivio non vengono mai riversate nella risposta:
+    un avviso indica quante ne mancano.
+    """
+    from seozoom_mcp.results import DEFAULT_PAGE_SIZE
+
+    store = get_results()
+    if not isinstance(body, list) or store.threshold <= 0 or len(body) <= DEFAULT_PAGE_SIZE:
+        return render(body, format)
+    first = render(body[:DEFAULT_PAGE_SIZE], format)
+    estimate = len(first.encode("utf-8")) * len(body) // DEFAULT_PAGE_SIZE
+    if estimate <= store.threshold:
+        return render(body, format)
+    handle, kept = store.put(body)
+    notice = f"Risultato di {len(body)} righe (circa {estimate // 1024} KB): mostrate le prime {DEFAULT_PAGE_SIZE}."
+    if kept <= DEFAULT_PAGE_SIZE:
+        return f"{notice} Le altre superano la memoria per i risultati (SEOZOOM_RESULT_STORE_MB) e non sono disponibili: restringi la richiesta con fields, where o top\n\n{first}"
+    if kept < len(body):
+        notice += (
+            f" Conservate solo le prime {kept} righe, le altre {len(body) - kept} superano la memoria per i risultati"
+            " (SEOZOOM_RESULT_STORE_MB): per averle restringi la richiesta con fields, where o top."
+        )
+    return (
+        f"{notice} Per le successive: fetch_page(handle=\"{handle}\", cursor={DEFAULT_PAGE_SIZE})"
+        f" (nessuna unità consumata, disponibile per {int(store.ttl // 60)} minuti dall'ultimo accesso)\n\n{first}"
+    )
 
 
 # ── Keywords ─────────────────────────────────────────────────────────────────
 # Tool per ricerca e analisi keyword: metriche, SERP, storico e correlate.
 
-@mcp.tool()
+@_tool
 async def keyword_metrics(
-    keywords: Annotated[list[str], "Lista di keyword (max 100)"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    keywords: Annotated[list[str], "Lista di keyword (max 100 per richiesta, le liste più lunghe vengono suddivise in automatico)"],
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni metriche per una o più keyword: volume di ricerca, KD, CPC, intent e trend mensili."""
-    return _fmt(await client.keyword_metrics(keywords, db))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().keyword_metrics(keywords, d))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def keyword_serp(
-    keywords: Annotated[list[str], "Lista di keyword (max 100)"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    keywords: Annotated[list[str], "Lista di keyword (max 100 per richiesta, le liste più lunghe vengono suddivise in automatico)"],
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni i risultati SERP attuali (fino a 50 risultati organici) per una o più keyword."""
-    return _fmt(await client.keyword_serp(keywords, db))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().keyword_serp(keywords, d))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def keyword_serp_history(
     keyword: Annotated[str, "Singola keyword"],
     date: Annotated[str, "Data nel formato yyyy-MM-dd"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni lo snapshot storico della SERP per una keyword in una data specifica."""
-    return _fmt(await client.keyword_serp_history(keyword, date, db))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().keyword_serp_history(keyword, date, d))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
-async def keyword_related(
+@_tool
+async def keyword_serp_history_range(
     keyword: Annotated[str, "Singola keyword"],
+    start: Annotated[str, "Data iniziale nel formato yyyy-MM-dd"],
+    end: Annotated[str, "Data finale nel formato yyyy-MM-dd"],
+    step: Annotated[str, "Passo tra le date: day, week, month"] = "month",
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora l'archivio locale e riscarica tutte le date"] = False,
+) -> str:
+    """Ottieni gli snapshot storici della SERP di una keyword su un intervallo di date, in parallelo e riusando quelli già scaricati."""
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().keyword_serp_history_range(keyword, start, end, step, d))
+        return _fmt(data, format, fields, sort, top, where)
+
+
+@_tool
+async def keyword_serp_volatility(
+    keywords: Annotated[list[str], "Lista di keyword"],
+    start: Annotated[str, "Data iniziale nel formato yyyy-MM-dd"],
+    end: Annotated[str, "Data finale nel formato yyyy-MM-dd"],
+    step: Annotated[str, "Passo tra le date: day, week, month"] = "month",
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    depth: Annotated[int, "Posizioni della SERP considerate (es. 10 = prima pagina)"] = 10,
+    top: Annotated[int, "Numero di URL restituite, per spostamento decrescente"] = 20,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora l'archivio locale e riscarica tutte le date"] = False,
+) -> str:
+    """Volatilità della SERP su un intervallo di date: punteggio 0-100 per keyword e URL con i maggiori movimenti (delta, ingressi, uscite), senza restituire gli snapshot completi."""
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().keyword_serp_volatility(keywords, start, end, step, db, depth, top)
+        return _fmt(data, format, fields, sort, None, where)
+
+
+@_tool
+async def keyword_related(
+    keyword: Annotated[str, "Singola keyword"],
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
     limit: Annotated[int | None, "Numero massimo di keyword correlate"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni keyword correlate con volume di ricerca e affinità SERP (0-100)."""
-    return _fmt(await client.keyword_related(keyword, db, limit))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().keyword_related(keyword, d, limit))
+        return _fmt(data, format, fields, sort, top, where)
+
+
+@_tool
+async def keyword_search(
+    query: Annotated[str | None, "Parole contenute nella keyword (es. scarpe running)"] = None,
+    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    where: Annotated[list[str] | None, "Filtri: campo OP valore su volume, kd, cpc, intent, source, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = "-volume",
+    top: Annotated[int, "Numero massimo di righe restituite"] = 50,
+    max_age_days: Annotated[float | None, "Solo keyword scaricate negli ultimi N giorni"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+) -> str:
+    """Cerca tra le keyword già scaricate da qualsiasi tool (indice locale): filtri per volume, KD, CPC, intent e testo, senza chiamate API né unità consumate. Ogni riga riporta l'età del dato."""
+    data = await get_client().keyword_search(query, db, where, sort, top, max_age_days)
+    return _fmt(data, format, fields)
 
 
 # ── Domains ──────────────────────────────────────────────────────────────────
 # Tool per analisi domini: metriche, authority, nicchie, pagine migliori e competitor.
 
-@mcp.tool()
+@_tool
 async def domain_metrics(
-    domains: Annotated[list[str], "Lista di domini (max 50)"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    domains: Annotated[list[str], "Lista di domini (max 50 per richiesta, le liste più lunghe vengono suddivise in automatico)"],
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni metriche dettagliate per uno o più domini: traffico stimato, keyword posizionate, ZA."""
-    return _fmt(await client.domain_metrics(domains, db))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_metrics(domains, d))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def domain_metrics_history(
-    domains: Annotated[list[str], "Lista di domini (max 50)"],
+    domains: Annotated[list[str], "Lista di domini (max 50 per richiesta, le liste più lunghe vengono suddivise in automatico)"],
     date: Annotated[str, "Data nel formato yyyy-MM-dd"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni metriche storiche per uno o più domini in una data specifica."""
-    return _fmt(await client.domain_metrics_history(domains, date, db))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_metrics_history(domains, date, d))
+        return _fmt(data, format, fields, sort, top, where)
+
+
+@_tool
+async def domain_metrics_history_range(
+    domains: Annotated[list[str], "Lista di domini"],
+    start: Annotated[str, "Data iniziale nel formato yyyy-MM-dd"],
+    end: Annotated[str, "Data finale nel formato yyyy-MM-dd"],
+    step: Annotated[str, "Passo tra le date: day, week, month"] = "month",
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora l'archivio locale e riscarica tutte le date"] = False,
+) -> str:
+    """Ottieni la serie storica delle metriche di uno o più domini su un intervallo di date, in parallelo e riusando i punti già scaricati."""
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_metrics_history_range(domains, start, end, step, d))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def domain_authority(
-    domains: Annotated[list[str], "Lista di domini (max 100)"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    domains: Annotated[list[str], "Lista di domini (max 100 per richiesta, le liste più lunghe vengono suddivise in automatico)"],
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni Zoom Authority, Trust, Stability e Opportunity per uno o più domini."""
-    return _fmt(await client.domain_authority(domains, db))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_authority(domains, d))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def domain_niches(
-    domains: Annotated[list[str], "Lista di domini (max 10)"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    domains: Annotated[list[str], "Lista di domini (max 10 per richiesta, le liste più lunghe vengono suddivise in automatico)"],
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
     limit: Annotated[int | None, "Numero massimo di nicchie per dominio"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le nicchie tematiche di uno o più domini con topical authority e percentuale keyword."""
-    return _fmt(await client.domain_niches(domains, db, limit))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_niches(domains, d, limit))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def domain_best_pages(
     domain: Annotated[str, "Singolo dominio"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
     limit: Annotated[int | None, "Numero massimo di pagine"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le pagine migliori di un dominio con PZA e keyword totali posizionate."""
-    return _fmt(await client.domain_best_pages(domain, db, limit))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_best_pages(domain, d, limit))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def domain_ai_keywords(
     domain: Annotated[str, "Singolo dominio"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
     offset: Annotated[int | None, "Posizione di partenza dei risultati"] = None,
     limit: Annotated[int | None, "Numero massimo di keyword"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le keyword per cui il dominio appare nelle AI Overview di Google."""
-    return _fmt(await client.domain_ai_keywords(domain, db, offset, limit))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_ai_keywords(domain, d, offset, limit))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def domain_keywords(
     domain: Annotated[str, "Singolo dominio"],
     type: Annotated[str, "Tipo filtro: best, withtraffic, up, down, stable, entered, exited, bypage, byposition, newentry"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
     offset: Annotated[int | None, "Posizione di partenza dei risultati"] = None,
     limit: Annotated[int | None, "Numero massimo di keyword"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le keyword posizionate di un dominio filtrate per tipo (best, up, down, etc.)."""
-    return _fmt(await client.domain_keywords(domain, type, db, offset, limit))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_keywords(domain, type, d, offset, limit))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
-async def domain_competitors(
-    domains: Annotated[list[str], "Lista di domini (max 10)"],
+def _export_path(output_file: str, overwrite: bool) -> Path:
+    """Percorso di `output_file` dentro SEOZOOM_EXPORT_DIR (default ~/.cache/seozoom-mcp/exports).
+
+    Sono ammessi solo percorsi relativi che restano nella cartella; un file
+    esistente viene sovrascritto solo con `overwrite`. Solleva ValueError.
+    """
+    root = Path(os.environ.get("SEOZOOM_EXPORT_DIR") or DEFAULT_EXPORT_DIR).expanduser().resolve()
+    name = Path(output_file)
+    if name.is_absolute() or ".." in name.parts or output_file.startswith("~"):
+        raise ValueError(f"output_file deve essere un percorso relativo alla cartella degli export ({root})")
+    target = (root / name).resolve()
+    if not target.is_relative_to(root) or target == root:
+        raise ValueError(f"output_file deve restare nella cartella degli export ({root})")
+    if target.exists() and not overwrite:
+        raise ValueError(f"Il file {target} esiste già: usa overwrite=true per sostituirlo")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    return target
+
+
+@_tool
+async def domain_keywords_export(
+    domain: Annotated[str, "Singolo dominio"],
+    type: Annotated[str, "Tipo filtro: best, withtraffic, up, down, stable, entered, exited, bypage, byposition, newentry, oppure ai per le keyword nelle AI Overview"],
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    output_file: Annotated[str | None, "Nome del file (relativo alla cartella degli export) in cui scrivere tutte le righe, una per riga (NDJSON); se assente restituisce solo un riepilogo"] = None,
+    max_rows: Annotated[int | None, "Numero massimo di keyword da scaricare"] = None,
+    max_units: Annotated[int | None, "Unità API massime da spendere"] = None,
+    overwrite: Annotated[bool, "Sostituisce output_file se esiste già"] = False,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
+) -> str:
+    """Scarica tutte le keyword di un dominio paginando in automatico, salvandole su file o restituendo un riepilogo."""
+    client = get_client()
+    if output_file and not _local_files:
+        raise ValueError("output_file non è disponibile con il server HTTP: ometti il parametro per ricevere il riepilogo")
+    # Il percorso viene verificato prima di spendere unità
+    target = _export_path(output_file, overwrite) if output_file else None
+    if type == "ai":
+        pages = client.domain_ai_keywords_pages(domain, db, max_rows=max_rows, max_units=max_units)
+    else:
+        pages = client.domain_keywords_pages(domain, type, db, max_rows=max_rows, max_units=max_units)
+    # "x" rifiuta un file creato nel frattempo, se non è richiesta la sovrascrittura
+    out = target.open("w" if overwrite else "x", encoding="utf-8") if target is not None else None
+    used = rows = count = 0
+    remaining: object = "?"
+    sample: list[object] = []
+    try:
+        with client.bypass_cache(no_cache):
+            async with aclosing(pages):
+                async for page in pages:
+                    count += 1
+                    used += page.get("UnitsUsed") or 0
+                    remaining = page.get("UnitsRemaining", remaining)
+                    for row in page.get("response") or []:
+                        rows += 1
+                        if len(sample) < 20:
+                            sample.append(row)
+                        if out is not None:
+                            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+    summary = {"domain": domain, "type": type, "pages": count, "rows": rows,
+               "output_file": str(target) if target is not None else None, "sample": sample}
+    return _fmt({"UnitsUsed": used, "UnitsRemaining": remaining, "ResultRows": rows, "response": summary})
+
+
+@_tool
+async def domain_competitors(
+    domains: Annotated[list[str], "Lista di domini (max 10 per richiesta, le liste più lunghe vengono suddivise in automatico)"],
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
     limit: Annotated[int | None, "Numero massimo di competitor per dominio"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni i principali competitor organici di uno o più domini."""
-    return _fmt(await client.domain_competitors(domains, db, limit))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().domain_competitors(domains, d, limit))
+        return _fmt(data, format, fields, sort, top, where)
+
+
+@_tool
+async def keyword_gap(
+    domain: Annotated[str, "Dominio da analizzare"],
+    competitors: Annotated[list[str] | None, "Domini competitor (max 30); se assente vengono usati i principali competitor organici"] = None,
+    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    type: Annotated[str, "Tipo di keyword confrontate: best, withtraffic, up, down, stable, entered, exited, bypage, byposition, newentry"] = "best",
+    max_competitors: Annotated[int, "Competitor da usare quando non sono indicati"] = 5,
+    max_rows: Annotated[int | None, "Keyword massime scaricate per dominio"] = 10_000,
+    max_units: Annotated[int | None, "Unità API massime da spendere in totale"] = None,
+    gap: Annotated[str | None, "Solo un tipo di opportunità: missing (il dominio non è posizionato) o weaker (posizionato peggio)"] = None,
+    min_volume: Annotated[int, "Volume di ricerca minimo"] = 0,
+    top: Annotated[int, "Numero di opportunità restituite, per punteggio decrescente"] = 50,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
+) -> str:
+    """Keyword gap rispetto ai competitor: keyword su cui i competitor sono posizionati e il dominio no o è più in basso, ordinate per volume e CTR recuperabile."""
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().keyword_gap(
+            domain, competitors, db, type, max_competitors, max_rows, max_units, top, min_volume, gap,
+        )
+        return _fmt(data, format, fields, sort, None, where)
+
+
+@_tool
+async def domain_report(
+    domain: Annotated[str, "Dominio (es. example.com)"],
+    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    top: Annotated[int, "Righe massime per ogni fonte (keyword, pagine, ...)"] = 20,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV, una tabella per sezione), csv"] = "json",
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
+) -> str:
+    """Report completo di un dominio in una sola chiamata: metriche, authority, nicchie, migliori keyword e keyword AI Overview, migliori pagine e competitor, scaricati in parallelo. Le fonti in errore sono segnalate senza bloccare le altre."""
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().domain_report(domain, db, top), format)
 
 
 # ── URLs ─────────────────────────────────────────────────────────────────────
 # Tool per analisi singole URL: authority, metriche, keyword e intent gap.
 
-@mcp.tool()
+@_tool
 async def url_page_authority(
     url: Annotated[str, "Singola URL completa"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni il Page Zoom Authority (PZA) di una singola URL."""
-    return _fmt(await client.url_page_authority(url, db))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().url_page_authority(url, d))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def url_metrics(
-    urls: Annotated[list[str], "Lista di URL (max 30)"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    urls: Annotated[list[str], "Lista di URL (max 30 per richiesta, le liste più lunghe vengono suddivise in automatico)"],
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni metriche dettagliate per una o più URL: keyword totali, traffico, PZA."""
-    return _fmt(await client.url_metrics(urls, db))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().url_metrics(urls, d))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def url_keywords(
     url: Annotated[str, "Singola URL completa"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
     limit: Annotated[int | None, "Numero massimo di keyword"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le keyword per cui una URL è posizionata con volumi, posizioni e CPC."""
-    return _fmt(await client.url_keywords(url, db, limit))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().url_keywords(url, d, limit))
+        return _fmt(data, format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def url_intent_gap(
     url: Annotated[str, "Singola URL completa"],
-    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    db: Annotated[str | list[str] | None, "Database paese (it, es, fr, de, uk); una lista o \"all\" confronta più mercati in parallelo"] = None,
     limit: Annotated[int | None, "Numero massimo di risultati"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni il gap di intent: keyword con potenziale non sfruttato per una URL."""
-    return _fmt(await client.url_intent_gap(url, db, limit))
+    with get_client().bypass_cache(no_cache):
+        data = await get_client().multi_db(db, lambda d: get_client().url_intent_gap(url, d, limit))
+        return _fmt(data, format, fields, sort, top, where)
+
+
+@_tool
+async def url_report(
+    url: Annotated[str, "Singola URL completa"],
+    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    top: Annotated[int, "Righe massime per ogni fonte (keyword, pagine, ...)"] = 20,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV, una tabella per sezione), csv"] = "json",
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
+) -> str:
+    """Report completo di una URL in una sola chiamata: PZA, metriche, keyword posizionate e intent gap (unite per keyword), scaricati in parallelo. Le fonti in errore sono segnalate senza bloccare le altre."""
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().url_report(url, db, top), format)
 
 
 # ── Projects ─────────────────────────────────────────────────────────────────
 # Tool per gestione e monitoraggio progetti SEOZoom: lista, overview, keyword e pagine.
 
-@mcp.tool()
+@_tool
 async def project_list(
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni la lista di tutti i progetti SEOZoom con metriche principali."""
-    return _fmt(await client.project_list(db))
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_list(db), format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def project_overview(
     id: Annotated[str, "ID del progetto"],
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni la panoramica completa di un progetto: keyword monitorate, traffico, ZA, trust."""
-    return _fmt(await client.project_overview(id, db))
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_overview(id, db), format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def project_keywords(
     id: Annotated[str, "ID del progetto"],
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le keyword monitorate di un progetto con volumi, posizioni e traffico stimato."""
-    return _fmt(await client.project_keywords(id, db))
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_keywords(id, db), format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def project_best_pages(
     id: Annotated[str, "ID del progetto"],
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
     limit: Annotated[int | None, "Numero massimo di pagine"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le migliori pagine di un progetto con PZA e keyword totali."""
-    return _fmt(await client.project_best_pages(id, db, limit))
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_best_pages(id, db, limit), format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def project_pages_with_more_keywords(
     id: Annotated[str, "ID del progetto"],
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
     limit: Annotated[int | None, "Numero massimo di pagine"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le pagine del progetto con il maggior numero di keyword posizionate."""
-    return _fmt(await client.project_pages_with_more_keywords(id, db, limit))
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_pages_with_more_keywords(id, db, limit), format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def project_pages_with_potential(
     id: Annotated[str, "ID del progetto"],
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
     limit: Annotated[int | None, "Numero massimo di pagine"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le pagine del progetto con maggiore potenziale di crescita traffico."""
-    return _fmt(await client.project_pages_with_potential(id, db, limit))
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_pages_with_potential(id, db, limit), format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def project_winner_pages(
     id: Annotated[str, "ID del progetto"],
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
     limit: Annotated[int | None, "Numero massimo di pagine"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le pagine del progetto in crescita (variazione traffico positiva)."""
-    return _fmt(await client.project_winner_pages(id, db, limit))
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_winner_pages(id, db, limit), format, fields, sort, top, where)
 
 
-@mcp.tool()
+@_tool
 async def project_loser_pages(
     id: Annotated[str, "ID del progetto"],
     db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
     limit: Annotated[int | None, "Numero massimo di pagine"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    sort: Annotated[str | None, "Campo per l'ordinamento, con - davanti per l'ordine decrescente (es. -volume)"] = None,
+    top: Annotated[int | None, "Numero massimo di righe restituite"] = None,
+    where: Annotated[list[str] | None, "Filtri sulle righe: campo OP valore, OP tra = != > < >= <= ~ (contiene), es. volume>1000"] = None,
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
 ) -> str:
     """Ottieni le pagine del progetto in calo (variazione traffico negativa)."""
-    return _fmt(await client.project_loser_pages(id, db, limit))
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_loser_pages(id, db, limit), format, fields, sort, top, where)
+
+
+@_tool
+async def project_report(
+    id: Annotated[str, "ID del progetto"],
+    db: Annotated[str | None, "Database paese (it, es, fr, de, uk)"] = None,
+    top: Annotated[int, "Righe massime per ogni fonte (keyword, pagine, ...)"] = 20,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV, una tabella per sezione), csv"] = "json",
+    no_cache: Annotated[bool, "Ignora la cache e interroga sempre le API"] = False,
+) -> str:
+    """Report completo di un progetto in una sola chiamata: overview, keyword con più traffico e pagine (migliori, con più keyword, con potenziale, in crescita, in calo; unite per URL), scaricati in parallelo. Le fonti in errore sono segnalate senza bloccare le altre."""
+    with get_client().bypass_cache(no_cache):
+        return _fmt(await get_client().project_report(id, db, top), format)
 
 
 # ── Utility ──────────────────────────────────────────────────────────────────
 # Tool di servizio per verificare lo stato dell'account API.
 
-@mcp.tool()
-async def check_units() -> str:
-    """Controlla le unità API rimanenti (costa 10 unit)."""
-    # Esegue una chiamata minimale (keyword "test") per leggere le unità residue
-    data = await client.keyword_metrics(["test"])
-    remaining = data.get("UnitsRemaining", "?")
-    return f"Unità API rimanenti: {remaining}"
+@_tool
+async def check_units(
+    refresh: Annotated[bool, "Interroga le API per un valore aggiornato (costa 10 unit)"] = False,
+) -> str:
+    """Controlla le unità API rimanenti e quelle consumate in questa sessione (gratis, dall'ultima risposta ricevuta)."""
+    client = get_client()
+    if refresh or client.units.remaining is None:
+        # Nessun valore noto: chiamata minimale (keyword "test") fuori dalla cache
+        with client.bypass_cache():
+            await client.keyword_metrics(["test"])
+    state = client.units.snapshot()
+    age = int(time.time() - state["updated"]) if state["updated"] else 0
+    lines = [
+        f"Unità API rimanenti: {state['remaining']} (aggiornato {age}s fa)",
+        f"Unità usate in questa sessione: {state['session_used']}"
+        + (f" su un budget di {state['session_budget']}" if state["session_budget"] is not None else ""),
+    ]
+    for tool, used in sorted(state["session_by_tool"].items(), key=lambda kv: -kv[1]):
+        budget = state["tool_budgets"].get(tool)
+        lines.append(f"  {tool}: {used}" + (f" / {budget}" if budget is not None else ""))
+    if len(client.keys) > 1:
+        lines.append("API key:")
+        for key in client.keys.snapshot():
+            status = f"esclusa ({key['error']})" if not key["active"] else f"{key['inflight']}/{key['limit']} in corso"
+            lines.append(f"  {key['name']}: {key['remaining'] if key['remaining'] is not None else '?'} rimanenti, {key['requests']} richieste, {status}")
+    return "\n".join(lines)
+
+
+@_tool
+async def fetch_page(
+    handle: Annotated[str, "Handle del risultato restituito da un altro tool (es. r_AbC123)"],
+    cursor: Annotated[int, "Indice della prima riga da restituire (indicato nella risposta precedente)"] = 0,
+    size: Annotated[int, "Numero di righe da restituire"] = 50,
+    fields: Annotated[list[str] | None, "Campi da restituire per ogni riga (es. keyword, volume)"] = None,
+    format: Annotated[str, "Formato: json (indentato), compact (JSON senza spazi), table (TSV), csv"] = "json",
+) -> str:
+    """Pagina di un risultato voluminoso conservato sul server, a partire da cursor (gratis, nessuna chiamata API)."""
+    rows, total = get_results().page(handle, cursor, size)
+    if fields:
+        rows = select(rows, fields)
+    end = cursor + len(rows)
+    more = f"Prossimo cursore: {end}" if end < total else "Fine del risultato"
+    return f"[Risultato {handle} | Righe {cursor + 1}-{end} di {total} | {more}]\n\n{render(rows, format)}"
+
+
+@_tool
+async def server_metrics(
+    format: Annotated[str, "Formato: json (aggregati leggibili) o prometheus (testo per lo scraping)"] = "json",
+) -> str:
+    """Metriche del server: latenza per tool e per azione API (p50/p99), byte, codici HTTP, unità e cache hit (gratis)."""
+    metrics = get_client().metrics
+    if format == "prometheus":
+        return metrics.prometheus()
+    return json.dumps(metrics.snapshot(), ensure_ascii=False, indent=2)
+
+
+@mcp.resource("seozoom://metrics", mime_type="application/json")
+def metrics_resource() -> str:
+    """Metriche aggregate del server in JSON (vedi il tool server_metrics)."""
+    return json.dumps(get_client().metrics.snapshot(), ensure_ascii=False)
+
+
+# Host locali: per questi FastMCP configura da sé la protezione dal DNS rebinding
+_LOOPBACK = ("127.0.0.1", "localhost", "::1")
+
+# Indirizzi di ascolto su tutte le interfacce: il nome con cui il server è raggiunto va indicato
+_WILDCARD = ("0.0.0.0", "::", "")
+
+
+def _split_env(name: str) -> list[str]:
+    return [v.strip() for v in os.environ.get(name, "").split(",") if v.strip()]
+
+
+def _transport_security(host: str) -> TransportSecuritySettings:
+    """Protezione dal DNS rebinding per un host non locale.
+
+    Host ammessi da SEOZOOM_HTTP_ALLOWED_HOSTS (default: l'host di ascolto,
+    con qualsiasi porta), origin da SEOZOOM_HTTP_ALLOWED_ORIGINS (default:
+    nessuna; i client MCP non browser non inviano Origin). Solleva ValueError
+    se l'host è un indirizzo jolly e gli host ammessi non sono indicati.
+    """
+    from mcp.server.transport_security import TransportSecuritySettings
+
+    hosts = _split_env("SEOZOOM_HTTP_ALLOWED_HOSTS")
+    if not hosts:
+        if host in _WILDCARD:
+            raise ValueError(f"Con --host {host} indica i nomi con cui il server è raggiunto (--allowed-hosts o SEOZOOM_HTTP_ALLOWED_HOSTS)")
+        hosts = [host, f"{host}:*"]
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=hosts,
+        allowed_origins=_split_env("SEOZOOM_HTTP_ALLOWED_ORIGINS"),
+    )
+
+
+class _BearerAuth:
+    """Middleware ASGI: ogni richiesta HTTP deve avere "Authorization: Bearer <token>"."""
+
+    def __init__(self, app: ASGIApp, token: str) -> None:
+        self.app = app
+        self.expected = f"Bearer {token}".encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            header = dict(scope["headers"]).get(b"authorization", b"")
+            if not hmac.compare_digest(header, self.expected):
+                from starlette.responses import JSONResponse
+
+                response = JSONResponse({"error": "unauthorized"}, status_code=401, headers={"WWW-Authenticate": "Bearer"})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def http_app() -> Starlette:
+    """App ASGI streamable HTTP (endpoint /mcp); usata come factory dai worker uvicorn.
+
+    Tutte le sessioni del processo condividono lo stesso SEOZoomClient: pool di
+    connessioni, limitatore, cache, deduplica e registro unità.
+
+    Con SEOZOOM_HTTP_TOKEN ogni richiesta deve presentarlo come bearer token;
+    su un host non locale il token è obbligatorio e la protezione dal DNS
+    rebinding usa gli host ammessi (vedi _transport_security). output_file
+    di domain_keywords_export è disattivato.
+    """
+    global _local_files
+    # I log di httpx riportano le URL delle richieste, con l'api_key
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    mcp.settings.stateless_http = os.environ.get("SEOZOOM_HTTP_STATELESS") == "1"
+    _local_files = False
+    host = os.environ.get("SEOZOOM_HTTP_HOST", "127.0.0.1")
+    token = os.environ.get("SEOZOOM_HTTP_TOKEN", "")
+    if host not in _LOOPBACK:
+        if not token:
+            raise ValueError(f"Con --host {host} è obbligatorio un token: imposta SEOZOOM_HTTP_TOKEN")
+        mcp.settings.transport_security = _transport_security(host)
+    app = mcp.streamable_http_app()
+    if token:
+        app.add_middleware(_BearerAuth, token=token)
+    if os.environ.get("SEOZOOM_PREFETCH_INTERVAL"):
+        sessions = app.router.lifespan_context
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            async with sessions(app):
+                # Il prefetch dei progetti parte all'avvio, non alla prima chiamata
+                get_client()
+                yield
+
+        app.router.lifespan_context = lifespan
+    return app
+
+
+def serve_http(argv: list[str]) -> None:
+    """Entry point di `seozoom-mcp http`: server streamable HTTP per più client MCP."""
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(
+        prog="seozoom-mcp http", description="Serve i tool SEOZoom in streamable HTTP (endpoint /mcp)."
+    )
+    parser.add_argument(
+        "--host", default=os.environ.get("SEOZOOM_HTTP_HOST", "127.0.0.1"), help="indirizzo di ascolto (default: 127.0.0.1)"
+    )
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SEOZOOM_HTTP_PORT", "8000")), help="porta (default: 8000)")
+    parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("SEOZOOM_HTTP_WORKERS", "1")), help="processi worker (default: 1)"
+    )
+    parser.add_argument("--stateless", action="store_true", help="nessuno stato di sessione tra le richieste")
+    parser.add_argument(
+        "--token", default=os.environ.get("SEOZOOM_HTTP_TOKEN", ""),
+        help="bearer token richiesto ai client (obbligatorio se l'host non è locale)",
+    )
+    parser.add_argument(
+        "--allowed-hosts", default=os.environ.get("SEOZOOM_HTTP_ALLOWED_HOSTS", ""),
+        help="valori ammessi dell'header Host, separati da virgola (es. mcp.example.com,10.0.0.5:*)",
+    )
+    parser.add_argument(
+        "--allowed-origins", default=os.environ.get("SEOZOOM_HTTP_ALLOWED_ORIGINS", ""),
+        help="valori ammessi dell'header Origin, separati da virgola",
+    )
+    args = parser.parse_args(argv)
+
+    # I worker rileggono la configurazione dall'ambiente
+    os.environ["SEOZOOM_HTTP_HOST"] = args.host
+    os.environ["SEOZOOM_HTTP_TOKEN"] = args.token
+    os.environ["SEOZOOM_HTTP_ALLOWED_HOSTS"] = args.allowed_hosts
+    os.environ["SEOZOOM_HTTP_ALLOWED_ORIGINS"] = args.allowed_origins
+    if args.host not in _LOOPBACK:
+        if not args.token:
+            parser.error(f"con --host {args.host} serve un token (--token o SEOZOOM_HTTP_TOKEN)")
+        try:
+            _transport_security(args.host)
+        except ValueError as exc:
+            parser.error(str(exc))
+    if args.stateless or args.workers > 1:
+        # Le sessioni stateful vivono in un solo processo: con più worker ogni richiesta
+        # può arrivare a un processo diverso
+        os.environ["SEOZOOM_HTTP_STATELESS"] = "1"
+    if args.workers > 1:
+        # Cache condivisa tra i worker (il registro unità è già condiviso su file)
+        os.environ.setdefault("SEOZOOM_CACHE", "sqlite")
+        uvicorn.run("seozoom_mcp.server:http_app", factory=True, host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(http_app(), host=args.host, port=args.port)
 
 
 def main() -> None:
-    """Entry point: avvia il server MCP con trasporto stdio."""
-    mcp.run(transport="stdio")
+    """Entry point: avvia il server MCP con trasporto stdio.
+
+    `seozoom-mcp http` lo serve invece in streamable HTTP a più client
+    (vedi serve_http), `seozoom-mcp batch ...` esegue un file di job (vedi seozoom_mcp.batch).
+    """
+    if sys.argv[1:2] == ["batch"]:
+        from seozoom_mcp.batch import main as batch_main
+
+        batch_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["http"]:
+        serve_http(sys.argv[2:])
+        return
+    anyio.run(_serve_stdio)
+
+
+async def _serve_stdio() -> None:
+    if os.environ.get("SEOZOOM_PREFETCH_INTERVAL"):
+        # Il prefetch dei progetti parte all'avvio, non alla prima chiamata
+        get_client()
+    await mcp.run_stdio_async()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,301 @@
+"""Contabilità delle unità API e budget di spesa.
+
+Ogni risposta SEOZoom riporta UnitsUsed e UnitsRemaining: UnitLedger li
+registra centralmente, così le unità residue sono note senza chiamate di
+prova. Il salvataggio su disco è differito: al più ogni SAVE_INTERVAL secondi,
+in un thread separato (vedi SEOZoomClient), e all'uscita del processo. I budget per sessione e per tool bloccano le chiamate
+prima dell'invio quando il costo stimato li supererebbe.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: niente lock tra processi
+    fcntl = None  # type: ignore[assignment]
+
+# Costo iniziale stimato (unità per riga) per (endpoint, action), usato finché
+# non si osserva il costo reale. Le API costano da 10 a 120 unità per riga.
+UNIT_COST: dict[tuple[str, str], float] = {
+    ("keywords", "serp"): 50,
+    ("keywords", "serphistory"): 50,
+    ("domains", "competitor"): 20,
+    ("urls", "intentgap"): 20,
+}
+DEFAULT_UNIT_COST = 10.0
+
+# Righe restituite per ogni valore dalle azioni chiamate senza `limit`: il default
+# delle API o, per project_keywords (senza limit), lo stesso delle altre pagine di
+# progetto, così il budget non la rifiuta a priori. Le altre azioni restituiscono
+# una riga per valore.
+DEFAULT_ROWS: dict[tuple[str, str], int] = {
+    ("domains", "bestpages"): 20,
+    ("domains", "keywords"): 100,
+    ("domains", "aikeywords"): 100,
+    ("domains", "competitor"): 10,
+    ("urls", "keywords"): 100,
+    ("urls", "intentgap"): 50,
+    ("projects", "list"): 100,
+    ("projects", "keywords"): 20,
+    ("projects", "bestpages"): 20,
+    ("projects", "pageswithmorekeywords"): 20,
+    ("projects", "pageswithpotential"): 20,
+    ("projects", "winnerpages"): 20,
+    ("projects", "loserpages"): 20,
+}
+
+# Parametri che contengono i valori "|"-separati di una richiesta
+ITEM_FIELDS = ("keyword", "domain", "url")
+
+# Secondi minimi tra due salvataggi del registro su disco
+SAVE_INTERVAL = 5.0
+
+DEFAULT_LEDGER_PATH = Path.home() / ".cache" / "seozoom-mcp" / "units.json"
+
+
+class BudgetExceeded(Exception):
+    """Sollevata quando una chiamata supererebbe un budget di unità."""
+
+
+def estimate_rows(path: str, params: dict[str, Any]) -> int:
+    """Righe attese da una richiesta: valori "|"-separati × limit (o DEFAULT_ROWS dell'azione)."""
+    items = 1
+    for field in ITEM_FIELDS:
+        if params.get(field):
+            items = len(str(params[field]).split("|"))
+            break
+    limit = params.get("limit")
+    return items * (int(limit) if limit else DEFAULT_ROWS.get((path, params.get("action", "")), 1))
+
+
+class UnitLedger:
+    """Registro delle unità consumate e rimanenti.
+
+    `session_budget` limita le unità spendibili dal processo corrente,
+    `tool_budgets` quelle di ciascun tool (per nome). Le unità già stimate per
+    le chiamate in corso vengono riservate, così le chiamate concorrenti non
+    possono superare insieme il budget. Se `path` è indicato, unità rimanenti,
+    totali per tool e costi osservati sopravvivono ai riavvii; più processi
+    (es. i worker del server HTTP) possono condividere lo stesso file, perché
+    ogni salvataggio somma i propri consumi a quelli già registrati dagli altri.
+    record() non scrive su disco: flush() salva le modifiche, ed è sicura da
+    chiamare da un altro thread; flush_due() indica quando è passato
+    `save_interval` dall'ultimo salvataggio. All'uscita del processo le
+    modifiche ancora in sospeso vengono salvate.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        session_budget: int | None = None,
+        tool_budgets: dict[str, int] | None = None,
+        save_interval: float = SAVE_INTERVAL,
+    ) -> None:
+        self._path = Path(path) if path else None
+        self.save_interval = save_interval
+        self.session_budget = session_budget
+        self.tool_budgets = tool_budgets or {}
+        self.remaining: int | None = None
+        self.updated: float | None = None
+        self.total_used = 0
+        self.total_by_tool: dict[str, int] = {}
+        # Costo osservato per riga, per "endpoint/action"
+        self.unit_cost: dict[str, float] = {}
+        self.session_used = 0
+        self.session_by_tool: dict[str, int] = {}
+        self._reserved = 0
+        self._reserved_by_tool: dict[str, int] = {}
+        # Totali già presenti sul file: a ogni salvataggio si scrive solo la differenza
+        self._saved_total = 0
+        self._saved_by_tool: dict[str, int] = {}
+        # Protegge i totali tra record() (event loop) e flush() (thread)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._load()
+        if self._path is not None:
+            atexit.register(self.flush)
+
+    def estimate(self, path: str, params: dict[str, Any]) -> int:
+        """Costo stimato di una richiesta: righe attese × costo per riga dell'azione."""
+        return round(estimate_rows(path, params) * self.row_cost(path, params.get("action", "")))
+
+    def row_cost(self, path: str, action: str) -> float:
+        """Unità per riga di un'azione: quelle osservate o, prima della prima risposta, UNIT_COST."""
+        return self.unit_cost.get(f"{path}/{action}", UNIT_COST.get((path, action), DEFAULT_UNIT_COST))
+
+    def check(self, tool: str | None, units: int) -> None:
+        """Solleva BudgetExceeded se `units` supererebbero il budget di sessione o del tool."""
+        if self.session_budget is not None and self.session_used + self._reserved + units > self.session_budget:
+            raise BudgetExceeded(
+                f"Budget di sessione superato: stimate {units} unit, "
+                f"già usate {self.session_used + self._reserved} su {self.session_budget}"
+            )
+        budget = self.tool_budgets.get(tool) if tool else None
+        if budget is not None:
+            used = self.session_by_tool.get(tool, 0) + self._reserved_by_tool.get(tool, 0)
+            if used + units > budget:
+                raise BudgetExceeded(
+                    f"Budget del tool {tool} superato: stimate {units} unit, già usate {used} su {budget}"
+                )
+
+    def reserve(self, tool: str | None, units: int) -> None:
+        """Verifica i budget e riserva `units` per una chiamata in corso."""
+        self.check(tool, units)
+        self._reserved += units
+        if tool:
+            self._reserved_by_tool[tool] = self._reserved_by_tool.get(tool, 0) + units
+
+    def release(self, tool: str | None, units: int) -> None:
+        """Libera una riserva (a chiamata conclusa o fallita)."""
+        self._reserved -= units
+        if tool:
+            self._reserved_by_tool[tool] = self._reserved_by_tool.get(tool, 0) - units
+
+    def record(self, tool: str | None, path: str, params: dict[str, Any], data: Any) -> None:
+        """Registra UnitsUsed/UnitsRemaining di una risposta API e aggiorna il costo per riga."""
+        if not isinstance(data, dict):
+            return
+        with self._lock:
+            used = data.get("UnitsUsed")
+            if isinstance(used, (int, float)):
+                used = int(used)
+                self.session_used += used
+                self.total_used += used
+                key = tool or "-"
+                self.session_by_tool[key] = self.session_by_tool.get(key, 0) + used
+                self.total_by_tool[key] = self.total_by_tool.get(key, 0) + used
+                rows = data.get("ResultRows")
+                if isinstance(rows, int) and rows > 0 and used > 0:
+                    self.unit_cost[f"{path}/{params.get('action', '')}"] = used / rows
+            remaining = data.get("UnitsRemaining")
+            if isinstance(remaining, (int, float)):
+                self.remaining = int(remaining)
+                self.updated = time.time()
+            self._dirty = True
+
+    def flush_due(self) -> bool:
+        """True se ci sono modifiche da salvare ed è passato `save_interval` dall'ultimo salvataggio."""
+        return self._path is not None and self._dirty and time.monotonic() - self._saved_at >= self.save_interval
+
+    def flush(self) -> None:
+        """Salva su disco le modifiche in sospeso (I/O bloccante: da eseguire fuori dall'event loop)."""
+        if self._path is None or not self._dirty:
+            return
+        self._saved_at = time.monotonic()
+        self._save()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Stato corrente del registro (per check_units e la diagnostica)."""
+        return {
+            "remaining": self.remaining,
+            "updated": self.updated,
+            "session_used": self.session_used,
+            "session_by_tool": dict(self.session_by_tool),
+            "session_budget": self.session_budget,
+            "tool_budgets": dict(self.tool_budgets),
+            "total_used": self.total_used,
+            "total_by_tool": dict(self.total_by_tool),
+        }
+
+    def _read(self) -> dict[str, Any]:
+        if self._path is None or not self._path.exists():
+            return {}
+        try:
+            return json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Lock esclusivo sul file del registro, tra processi (dove supportato)."""
+        assert self._path is not None
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with self._path.with_suffix(".lock").open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        state = self._read()
+        if not state:
+            return
+        self.remaining = state.get("remaining")
+        self.updated = state.get("updated")
+        self.total_used = self._saved_total = state.get("total_used", 0)
+        self.total_by_tool = state.get("total_by_tool", {})
+        self._saved_by_tool = dict(self.total_by_tool)
+        self.unit_cost = state.get("unit_cost", {})
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+        with self._locked():
+            state = self._read()
+            with self._lock:
+                # Somma i consumi non ancora salvati a quelli scritti (anche da altri processi)
+                total_used = state.get("total_used", 0) + self.total_used - self._saved_total
+                total_by_tool = dict(state.get("total_by_tool", {}))
+                for tool, used in self.total_by_tool.items():
+                    total_by_tool[tool] = total_by_tool.get(tool, 0) + used - self._saved_by_tool.get(tool, 0)
+                if (state.get("updated") or 0) > (self.updated or 0):
+                    self.remaining, self.updated = state.get("remaining"), state.get("updated")
+                self.unit_cost = {**state.get("unit_cost", {}), **self.unit_cost}
+                self.total_used = self._saved_total = total_used
+                self.total_by_tool = total_by_tool
+                self._saved_by_tool = dict(total_by_tool)
+                self._dirty = False
+                state = {
+                    "remaining": self.remaining,
+                    "updated": self.updated,
+                    "total_used": self.total_used,
+                    "total_by_tool": dict(self.total_by_tool),
+                    "unit_cost": dict(self.unit_cost),
+                }
+            # Scrittura atomica: un crash a metà non corrompe il file
+            tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            tmp.replace(self._path)
+
+
+def _parse_budgets(value: str) -> dict[str, int]:
+    """Interpreta "tool=unità,tool=unità" (es. "keyword_serp=5000,domain_keywords_export=20000")."""
+    budgets = {}
+    for item in value.split(","):
+        if item.strip():
+            name, _, units = item.partition("=")
+            budgets[name.strip()] = int(units)
+    return budgets
+
+
+def ledger_from_env() -> UnitLedger:
+    """Costruisce il registro dalle variabili d'ambiente.
+
+    SEOZOOM_LEDGER_PATH: file JSON dello stato (default ~/.cache/seozoom-mcp/units.json, "off" = solo in memoria).
+    SEOZOOM_SESSION_BUDGET: unità massime spendibili dal processo.
+    SEOZOOM_TOOL_BUDGETS: budget per tool, "tool=unità,tool=unità".
+    """
+    path: str | Path | None = os.environ.get("SEOZOOM_LEDGER_PATH") or DEFAULT_LEDGER_PATH
+    if path == "off":
+        path = None
+    session = os.environ.get("SEOZOOM_SESSION_BUDGET")
+    return UnitLedger(
+        path,
+        session_budget=int(session) if session else None,
+        tool_budgets=_parse_budgets(os.environ.get("SEOZOOM_TOOL_BUDGETS", "")),
+    )
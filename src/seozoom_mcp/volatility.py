@@ -0,0 +1,154 @@
+"""Volatilità della SERP e movimenti di posizione su una serie di snapshot.
+
+SerpSeries normalizza gli snapshot storici (keyword_serp_history) in colonne
+compatte di interi (keyword, data, URL, posizione), conservando solo le prime
+`depth` posizioni. analyze() calcola in un solo passaggio sulle colonne
+ordinate per (keyword, URL, data):
+
+- per URL: posizione iniziale e finale, delta, migliore/peggiore, ingressi e
+  uscite dalle prime `depth` posizioni, spostamento totale;
+- per keyword: punteggio di volatilità 0-100, cioè la somma degli spostamenti
+  tra snapshot consecutivi (un'URL assente conta come posizione depth+1)
+  rispetto al massimo possibile (SERP completamente rinnovata).
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+
+def serp_results(record: Any) -> list[tuple[str, int]]:
+    """(url, posizione) di uno snapshot: dal campo "results" o dal record stesso."""
+    if not isinstance(record, dict):
+        return []
+    rows = record.get("results")
+    rows = rows if isinstance(rows, list) else [record]
+    out = []
+    for row in rows:
+        if not isinstance(row, dict) or not row.get("url"):
+            continue
+        try:
+            out.append((str(row["url"]), int(row.get("position"))))
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+class SerpSeries:
+    """Snapshot SERP di più keyword su date comuni, in colonne di interi."""
+
+    def __init__(self, dates: list[str], depth: int = 10) -> None:
+        self.dates = sorted(dates)
+        self.depth = depth
+        self._date_ids = {d: i for i, d in enumerate(self.dates)}
+        self.keywords: list[str] = []
+        self._keyword_ids: dict[str, int] = {}
+        self.urls: list[str] = []
+        self._url_ids: dict[str, int] = {}
+        # Date con snapshot per keyword (anche se vuoto)
+        self._snapshots: list[set[int]] = []
+        self.kw = array("I")
+        self.day = array("I")
+        self.url = array("I")
+        self.pos = array("H")
+
+    def __len__(self) -> int:
+        return len(self.pos)
+
+    def add(self, keyword: str, date: str, results: list[tuple[str, int]]) -> None:
+        """Aggiunge lo snapshot di `keyword` alla data `date` (le date sconosciute vengono ignorate)."""
+        day = self._date_ids.get(date)
+        if day is None:
+            return
+        k = self._keyword_ids.get(keyword)
+        if k is None:
+            k = self._keyword_ids[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+            self._snapshots.append(set())
+        self._snapshots[k].add(day)
+        seen: set[int] = set()
+        for url, position in results:
+            if not 1 <= position <= self.depth:
+                continue
+            u = self._url_ids.get(url)
+            if u is None:
+                u = self._url_ids[url] = len(self.urls)
+                self.urls.append(url)
+            if u in seen:
+                continue
+            seen.add(u)
+            self.kw.append(k)
+            self.day.append(day)
+            self.url.append(u)
+            self.pos.append(position)
+
+    def analyze(self, top: int = 20) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Riepilogo per keyword e le `top` URL con lo spostamento totale più alto."""
+        absent = self.depth + 1
+        # Snapshot consecutivi per keyword, e indice di ogni data nella sequenza
+        sequence = [sorted(days) for days in self._snapshots]
+        step_of = [{d: i for i, d in enumerate(days)} for days in sequence]
+        shifts = [[0] * max(len(days) - 1, 0) for days in sequence]
+        entries = [0] * len(self.keywords)
+        exits = [0] * len(self.keywords)
+        stable = [0] * len(self.keywords)
+        movers: list[dict[str, Any]] = []
+
+        order = sorted(range(len(self)), key=lambda i: (self.kw[i], self.url[i], self.day[i]))
+        start = 0
+        while start < len(order):
+            first = order[start]
+            k, u = self.kw[first], self.url[first]
+            end = start
+            positions: dict[int, int] = {}
+            while end < len(order) and self.kw[order[end]] == k and self.url[order[end]] == u:
+                i = order[end]
+                positions[step_of[k][self.day[i]]] = self.pos[i]
+                end += 1
+            start = end
+
+            steps = len(sequence[k])
+            track = [positions.get(s, absent) for s in range(steps)]
+            url_entries = url_exits = moved = 0
+            for s in range(1, steps):
+                before, after = track[s - 1], track[s]
+                shift = abs(after - before)
+                shifts[k][s - 1] += shift
+                moved += shift
+                url_entries += before == absent and after != absent
+                url_exits += before != absent and after == absent
+            entries[k] += url_entries
+            exits[k] += url_exits
+            stable[k] += len(positions) == steps
+            present = list(positions.values())
+            movers.append({
+                "keyword": self.keywords[k],
+                "url": self.urls[u],
+                "start": track[0] if track[0] != absent else None,
+                "end": track[-1] if track[-1] != absent else None,
+                "delta": track[0] - track[-1],
+                "best": min(present),
+                "worst": max(present),
+                "snapshots": len(present),
+                "entries": url_entries,
+                "exits": url_exits,
+                "movement": moved,
+            })
+
+        # Spostamento massimo tra due snapshot: tutte le URL escono e vengono sostituite
+        worst = self.depth * (self.depth + 1)
+        summary = [
+            {
+                "keyword": keyword,
+                "snapshots": len(sequence[k]),
+                "volatility": round(100 * sum(shifts[k]) / (worst * len(shifts[k])), 1) if shifts[k] else 0.0,
+                "max_step_volatility": round(100 * max(shifts[k]) / worst, 1) if shifts[k] else 0.0,
+                "entries": entries[k],
+                "exits": exits[k],
+                "stable_urls": stable[k],
+            }
+            for k, keyword in enumerate(self.keywords)
+        ]
+        movers.sort(key=lambda m: (-m["movement"], -abs(m["delta"])))
+        return summary, movers[:top]
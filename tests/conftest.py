@@ -0,0 +1,15 @@
+"""Configurazione comune dei test: nessuno stato locale su disco, nessuna chiave reale."""
+
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEOZOOM_API_KEY", "test")
+    for name in ("SEOZOOM_API_KEYS", "SEOZOOM_API_KEYS_FILE", "SEOZOOM_TRACE_FILE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("SEOZOOM_CACHE", "off")
+    for name in ("SEOZOOM_LEDGER_PATH", "SEOZOOM_HISTORY_PATH", "SEOZOOM_KEYWORD_INDEX_PATH"):
+        monkeypatch.setenv(name, "off")
@@ -0,0 +1,58 @@
+"""Job runner `seozoom-mcp batch` contro il simulatore: errori per job, scope e ripresa."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+from pathlib import Path
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp.batch import completed_ids, run_batch
+from seozoom_mcp.client import SEOZoomClient
+from seozoom_mcp.units import UnitLedger
+
+
+def _jobs(tmp_path: Path, jobs: list) -> Path:
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("".join(json.dumps(j) + "\n" for j in jobs), encoding="utf-8")
+    return path
+
+
+def test_failing_jobs_do_not_stop_workers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = SEOZoomClient(cache=None, transport=SEOZoomSimulator(latency=0, jitter=0), units=UnitLedger())
+
+    async def broken(*args: object, **kwargs: object) -> None:
+        raise KeyError("campo")
+
+    monkeypatch.setattr(client, "domain_authority", broken)
+    jobs = [{"id": f"rotto-{i}", "method": "domain_authority", "args": {"domains": ["a.it"]}} for i in range(4)]
+    jobs += [{"id": f"ok-{i}", "method": "domain_metrics", "args": {"domains": [f"d{i}.it"]}} for i in range(6)]
+    out = io.StringIO()
+
+    async def run() -> dict[str, int]:
+        try:
+            return await asyncio.wait_for(run_batch(client, _jobs(tmp_path, jobs), out, concurrency=2), 10)
+        finally:
+            await client.aclose()
+
+    stats = asyncio.run(run())
+    assert stats["ok"] == 6 and stats["failed"] == 4
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert {r["id"] for r in records if not r["ok"]} == {f"rotto-{i}" for i in range(4)}
+    # Le unità dei job sono attribuite al tool "batch"
+    assert client.units.session_by_tool.get("batch") == stats["units"] > 0
+
+
+def test_completed_ids_drops_truncated_line(tmp_path: Path) -> None:
+    output = tmp_path / "out.ndjson"
+    output.write_text(
+        json.dumps({"id": "a", "ok": True}) + "\n"
+        + json.dumps({"id": "b", "ok": False}) + "\n"
+        + '{"id": "c", "ok": tr',
+        encoding="utf-8",
+    )
+    assert completed_ids(output) == {"a"}
+    assert output.read_text(encoding="utf-8").endswith('"ok": false}\n')
@@ -0,0 +1,143 @@
+"""Micro-batching, divisione delle risposte aggregate e deduplica delle richieste in corso."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp.batching import Coalescer, SingleFlight, _split
+from seozoom_mcp.client import MAX_ITEMS, SEOZoomClient
+from seozoom_mcp.units import UnitLedger
+
+
+def _response(records: list[Any], used: int = 40) -> dict[str, Any]:
+    return {"UnitsUsed": used, "UnitsRemaining": 1000, "ResultRows": len(records), "response": records}
+
+
+def test_split_by_field() -> None:
+    data = _response([{"keyword": "Pasta"}, {"keyword": "mare"}, {"keyword": "mare"}, {"keyword": "roma"}])
+    part = _split(data, "keyword", ["pasta", "mare", "roma"], ["mare"])
+    assert part["response"] == [{"keyword": "mare"}, {"keyword": "mare"}]
+    assert part["ResultRows"] == 2 and part["UnitsUsed"] == 20
+    # Il confronto ignora maiuscole e spazi
+    assert _split(data, "keyword", ["pasta", "mare", "roma"], [" PASTA"])["response"] == [{"keyword": "Pasta"}]
+
+
+def test_split_by_position_and_empty() -> None:
+    data = _response([{"za": 1}, {"za": 2}])
+    assert _split(data, "domain", ["a.it", "b.it"], ["b.it"])["response"] == [{"za": 2}]
+    # Nessun record: le unità si ripartiscono per valori richiesti
+    assert _split(_response([], used=30), "domain", ["a.it", "b.it", "c.it"], ["a.it"])["UnitsUsed"] == 10
+
+
+def test_split_refuses_ambiguous_responses() -> None:
+    assert _split(_response([{"za": 1}, {"za": 2}, {"za": 3}]), "domain", ["a.it", "b.it"], ["a.it"]) is None
+    assert _split({"response": "testo"}, "domain", ["a.it", "b.it"], ["a.it"]) is None
+
+
+def test_unsplittable_batch_falls_back_to_single_requests() -> None:
+    calls: list[str] = []
+    discarded: list[Any] = []
+
+    async def fetch(path: str, params: dict[str, Any]) -> Any:
+        calls.append(params["domain"])
+        # Tre righe anonime per due domini: non divisibile
+        return _response([{"za": v} for v in params["domain"].split("|")] + [{"za": "extra"}])
+
+    async def run() -> list[Any]:
+        coalescer = Coalescer(fetch, 0.01, MAX_ITEMS, discard=lambda *args: discarded.append(args))
+        params = {"action": "authority", "db": "it"}
+        return await asyncio.gather(*(coalescer.submit("domains", {**params, "domain": d}, "domain") for d in ("a.it", "b.it")))
+
+    a, b = asyncio.run(run())
+    assert calls == ["a.it|b.it", "a.it", "b.it"]
+    assert len(discarded) == 1 and discarded[0][1]["domain"] == "a.it|b.it"
+    assert a["response"] == [{"za": "a.it"}, {"za": "extra"}]
+    assert b["response"] == [{"za": "b.it"}, {"za": "extra"}]
+
+
+def test_concurrent_calls_share_one_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "20")
+    sim = SEOZoomSimulator(latency=0.01, jitter=0)
+    client = SEOZoomClient(cache=None, transport=sim, units=UnitLedger())
+    keywords = [f"parola {i}" for i in range(8)]
+
+    async def run() -> list[Any]:
+        try:
+            return await asyncio.gather(*(client.keyword_metrics([k]) for k in keywords))
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(run())
+    assert sim.requests["keywords/metrics"] == 1
+    assert [r["response"][0]["keyword"] for r in results] == keywords
+    # Ogni chiamante paga la sua parte: il registro conta le unità una volta sola
+    assert sum(r["UnitsUsed"] for r in results) == client.units.session_used == sim.units_used
+
+
+def test_single_flight_collapses_identical_calls() -> None:
+    started = 0
+
+    async def slow() -> str:
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def run() -> list[str]:
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0)
+        # Un chiamante annullato non interrompe gli altri
+        first.cancel()
+        results = [await second, await flight.do("k", slow)]
+        assert flight.collapsed == 1
+        return results
+
+    assert asyncio.run(run()) == ["ok", "ok"]
+    assert started == 2
+
+
+def test_single_flight_shares_result_and_error() -> None:
+    calls = 0
+
+    async def fetch(value: Any) -> Any:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    async def run() -> None:
+        flight = SingleFlight()
+        assert await asyncio.gather(*(flight.do("k", lambda: fetch({"rows": 3})) for _ in range(5))) == [{"rows": 3}] * 5
+        assert (calls, flight.calls, flight.collapsed) == (1, 5, 4)
+        results = await asyncio.gather(*(flight.do("k", lambda: fetch(ValueError("errore"))) for _ in range(3)),
+                                       return_exceptions=True)
+        assert calls == 2 and len({id(r) for r in results}) == 1 and isinstance(results[0], ValueError)
+        # La chiave viene liberata: la chiamata successiva riparte
+        assert not flight._inflight
+        assert await flight.do("k", lambda: fetch("nuovo")) == "nuovo" and calls == 3
+
+    asyncio.run(run())
+
+
+def test_identical_client_requests_share_one_fetch(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "0")
+    sim = SEOZoomSimulator(latency=0.01, jitter=0)
+    client = SEOZoomClient(cache=None, transport=sim, units=UnitLedger())
+
+    async def run() -> list[Any]:
+        try:
+            return await asyncio.gather(*(client.keyword_metrics(["pasta"]) for _ in range(4)))
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(run())
+    assert sim.requests["keywords/metrics"] == 1 and client.singleflight.collapsed == 3
+    assert all(r["response"] == results[0]["response"] for r in results)
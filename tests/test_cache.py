@@ -0,0 +1,123 @@
+"""Cache delle risposte: TTL per azione, scadenza ed espulsione LRU dei due backend."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from seozoom_mcp import cache as cache_module
+from seozoom_mcp.cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_TTL,
+    HOUR,
+    MemoryCache,
+    SQLiteCache,
+    approx_size,
+    cache_from_env,
+    cache_key,
+    ttl_for,
+)
+from seozoom_mcp.client import SEOZoomClient, SEOZoomError
+from seozoom_mcp.records import Records
+
+
+class Clock:
+    """Sostituisce time.time nel modulo della cache."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.now = 1_000_000.0
+        monkeypatch.setattr(cache_module.time, "time", lambda: self.now)
+
+
+def test_ttl_and_key() -> None:
+    past = (date.today() - timedelta(days=30)).isoformat()
+    assert ttl_for("keywords", {"action": "serphistory", "date": past}) is None
+    # Uno snapshot di oggi può ancora cambiare
+    assert ttl_for("keywords", {"action": "serphistory", "date": date.today().isoformat()}) == DEFAULT_TTL
+    assert ttl_for("projects", {"action": "keywords"}) == HOUR
+    assert cache_key("domains", {"domain": "a.it", "action": "metrics", "api_key": "x", "limit": None}) == (
+        cache_key("domains", {"action": "metrics", "domain": "a.it"})
+    )
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_expiry(backend: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = Clock(monkeypatch)
+    cache = MemoryCache() if backend == "memory" else SQLiteCache(tmp_path / "c.sqlite3")
+    cache.set("a", {"response": [1]}, 10)
+    cache.set("b", {"response": [2]}, None)
+    clock.now += 9
+    assert cache.get("a") == ({"response": [1]}, 1_000_000.0)
+    clock.now += 1
+    assert cache.get("a") is None
+    clock.now += 10 * 365 * 86400
+    assert cache.get("b") is not None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_memory_lru() -> None:
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1, None)
+    cache.set("b", 2, None)
+    cache.get("a")
+    cache.set("c", 3, None)
+    assert cache.get("b") is None and cache.get("a") is not None and len(cache) == 2
+
+
+def test_memory_size_bound() -> None:
+    page = {"response": Records({"keyword": f"kw{i}", "volume": i} for i in range(500))}
+    size = approx_size(page)
+    cache = MemoryCache(max_entries=1000, max_bytes=3 * size)
+    for i in range(5):
+        cache.set(f"export{i}", page, None)
+    # Solo le ultime tre pagine entrano nel limite in byte
+    assert len(cache) == 3 and cache.bytes == 3 * size and cache.get("export1") is None
+    cache.set("export4", {"response": [1]}, None)
+    assert cache.bytes == 2 * size + approx_size({"response": [1]})
+    # Una risposta più grande dell'intero limite non viene conservata
+    cache.set("enorme", {"response": [{}] * 100_000}, None)
+    assert cache.get("enorme") is None and len(cache) == 3
+
+
+def test_sqlite_evicts_in_batches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = Clock(monkeypatch)
+    cache = SQLiteCache(tmp_path / "c.sqlite3", max_entries=20)
+    for i in range(20):
+        cache.set(f"k{i}", i, None)
+        clock.now += cache_module.ACCESS_RESOLUTION
+    assert cache.get("k0") is not None
+    counts = []
+    evictions = 0
+    evict = cache._evict
+
+    def counting(now: float) -> None:
+        nonlocal evictions
+        evictions += 1
+        evict(now)
+
+    monkeypatch.setattr(cache, "_evict", counting)
+    for i in range(20, 26):
+        clock.now += 1
+        cache.set(f"k{i}", i, None)
+        counts.append(len(cache))
+    # Oltre il limite si scende a 18 voci in una volta, non a ogni scrittura
+    assert counts == [18, 19, 20, 18, 19, 20] and evictions == 2
+    # k0 è stato letto di recente: le voci espulse sono le meno usate
+    assert cache.get("k0") is not None and cache.get("k1") is None and cache.get("k7") is not None
+    cache.close()
+    assert len(SQLiteCache(tmp_path / "c.sqlite3", max_entries=20)) == 20
+
+
+def test_cache_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEOZOOM_CACHE", "memory")
+    monkeypatch.setenv("SEOZOOM_CACHE_MAX_MB", "0.5")
+    cache = cache_from_env()
+    assert isinstance(cache, MemoryCache) and cache._max_bytes == 512 * 1024 < DEFAULT_MAX_BYTES
+    # Valori non validi: errore del client con il nome della variabile, non un ValueError generico
+    for name, value in (("SEOZOOM_CACHE_MAX_MB", "tanti"), ("SEOZOOM_CACHE_MAX_ENTRIES", "-5"), ("SEOZOOM_CACHE", "redis")):
+        with monkeypatch.context() as m:
+            m.setenv(name, value)
+            with pytest.raises(SEOZoomError, match=f"{name} '{value}' non valido"):
+                SEOZoomClient()
@@ -0,0 +1,46 @@
+"""Liste oltre il limite dell'azione: divisione in blocchi e unione delle risposte."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp.client import MAX_ITEMS, SEOZoomClient, _merge_responses
+from seozoom_mcp.units import UnitLedger
+
+
+def test_long_list_is_split_and_merged(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "0")
+    sim = SEOZoomSimulator(latency=0, jitter=0)
+    client = SEOZoomClient(cache=None, transport=sim, units=UnitLedger())
+    keywords = [f"parola {i}" for i in range(2 * MAX_ITEMS["keywords", "metrics"] + 50)]
+
+    async def run() -> Any:
+        try:
+            return await client.keyword_metrics(keywords)
+        finally:
+            await client.aclose()
+
+    data = asyncio.run(run())
+    assert sim.requests["keywords/metrics"] == 3
+    # Righe nell'ordine dei blocchi, unità e righe sommate
+    assert [r["keyword"] for r in data["response"]] == keywords
+    assert data["ResultRows"] == len(keywords)
+    assert data["UnitsUsed"] == sim.units_used == client.units.session_used == 10 * len(keywords)
+
+
+def test_merge_responses() -> None:
+    merged = _merge_responses([
+        {"UnitsUsed": 10, "UnitsRemaining": 90, "ResultRows": 2, "response": [{"k": 1}, {"k": 2}]},
+        {"UnitsUsed": 5, "UnitsRemaining": 50, "ResultRows": 1, "response": {"k": 3}, "Cache": {"hit": True, "age": 30, "saved": 5}},
+        {"UnitsUsed": 0, "UnitsRemaining": 80, "ResultRows": 0, "response": None},
+    ])
+    assert merged["response"] == [{"k": 1}, {"k": 2}, {"k": 3}]
+    assert (merged["UnitsUsed"], merged["ResultRows"]) == (15, 3)
+    # Le unità rimanenti di una risposta in cache non sono attuali
+    assert merged["UnitsRemaining"] == 80
+    assert merged["Cache"] == {"hit": True, "partial": True, "age": 30, "saved": 5}
+    assert _merge_responses([{"response": [1]}]) == {"response": [1]}
@@ -0,0 +1,88 @@
+"""Formati di output e selezione lato server: filtro, ordinamento, top-N e campi."""
+
+from __future__ import annotations
+
+import pytest
+
+from seozoom_mcp.formatting import parse_where, render, select
+
+ROWS = [
+    {"keyword": "scarpe running", "volume": 1200, "intent": "Commercial", "trend": [1, 2]},
+    {"keyword": "scarpe\tda trail", "volume": "90", "intent": "informational"},
+    {"keyword": "sandali", "volume": None, "intent": "commercial", "note": "a, \"b\""},
+    {"keyword": "Infradito", "volume": 300, "intent": "transactional"},
+]
+
+
+def test_json_and_compact() -> None:
+    assert render({"città": "Roma"}) == '{\n  "città": "Roma"\n}'
+    assert render(ROWS[:1], "compact") == '[{"keyword":"scarpe running","volume":1200,"intent":"Commercial","trend":[1,2]}]'
+
+
+def test_table() -> None:
+    # Colonne unite nell'ordine di apparizione, tab e a capo nei valori sostituiti da spazi
+    assert render(ROWS, "table").splitlines() == [
+        "keyword\tvolume\tintent\ttrend\tnote",
+        "scarpe running\t1200\tCommercial\t[1,2]\t",
+        "scarpe da trail\t90\tinformational\t\t",
+        "sandali\t\tcommercial\t\ta, \"b\"",
+        "Infradito\t300\ttransactional\t\t",
+    ]
+
+
+def test_csv() -> None:
+    assert render(ROWS[2:], "csv").splitlines() == [
+        "keyword,volume,intent,note",
+        'sandali,,commercial,"a, ""b"""',
+        "Infradito,300,transactional,",
+    ]
+
+
+def test_non_tabular_bodies_fall_back_to_compact() -> None:
+    assert render({"a": 1}, "csv") == '{"a":1}'
+    assert render([1, {"a": 2}], "table") == '[1,{"a":2}]'
+    assert render([], "table") == "[]"
+    with pytest.raises(ValueError, match="Formato 'xml' non valido"):
+        render(ROWS, "xml")
+
+
+def _keywords(where: list[str]) -> list[str]:
+    return [r["keyword"] for r in select(ROWS, where=where)]
+
+
+def test_where() -> None:
+    assert _keywords(["volume>=300"]) == ["scarpe running", "Infradito"]
+    # Numeri in stringa confrontati come numeri, testo senza distinzione di maiuscole
+    assert _keywords(["volume<100"]) == ["scarpe\tda trail"]
+    assert _keywords(["intent=commercial"]) == ["scarpe running", "sandali"]
+    assert _keywords(["intent!=commercial", "keyword~SCARPE"]) == ["scarpe\tda trail"]
+    # Confronto d'ordine tra testo e numero: nessuna corrispondenza
+    assert _keywords(["intent>3"]) == []
+    assert parse_where([" kd <= 30 "]) == [("kd", "<=", "30")]
+
+
+def test_sort_top_fields() -> None:
+    rows = select(ROWS, fields=["keyword", "volume"], sort="-volume", top=3)
+    assert rows == [
+        {"keyword": "scarpe running", "volume": 1200},
+        {"keyword": "Infradito", "volume": 300},
+        {"keyword": "scarpe\tda trail", "volume": "90"},
+    ]
+    # I record senza il campo finiscono in fondo in entrambi gli ordini
+    assert select(ROWS, sort="volume")[-1]["keyword"] == "sandali"
+    assert [r["keyword"] for r in select(ROWS, sort="keyword")] == ["Infradito", "sandali", "scarpe\tda trail", "scarpe running"]
+    assert select(ROWS, top=0) == []
+    assert select([1, {"k": 2}], fields=["k"]) == [1, {"k": 2}]
+
+
+@pytest.mark.parametrize(("options", "message"), [
+    ({"where": ["volume"]}, "Condizione 'volume' non valida"),
+    ({"where": ["volume 10"]}, "non valida"),
+    ({"where": ["=10"]}, "non valida"),
+    ({"sort": "-"}, "Ordinamento '-' non valido"),
+    ({"sort": " "}, "non valido"),
+    ({"top": -1}, "top deve essere >= 0"),
+])
+def test_invalid_options(options: dict, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        select(ROWS, **options)
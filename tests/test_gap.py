@@ -0,0 +1,74 @@
+"""Keyword gap: classificazione, punteggio, ordinamento e soglie su un piccolo insieme fisso."""
+
+from __future__ import annotations
+
+import pytest
+
+from seozoom_mcp.gap import MAX_COMPETITORS, GapIndex, ctr
+
+
+def _index() -> GapIndex:
+    index = GapIndex("target.it", ["a.it", "b.it"])
+    index.add_target([
+        {"keyword": "scarpe", "position": 5, "volume": 1000},
+        {"keyword": "borse", "position": 2, "volume": 500},
+        {"keyword": "cappelli", "position": 8, "volume": 100},
+        # Righe senza keyword o non posizionate vengono ignorate
+        {"keyword": "", "position": 1},
+        {"keyword": "ombrelli", "position": 0, "volume": 50},
+    ])
+    index.add_competitor(0, [
+        {"keyword": "scarpe", "position": 1, "volume": 1000},
+        {"keyword": "borse", "position": 3, "volume": 500},
+        {"keyword": "guanti", "position": 2, "volume": 800},
+    ])
+    index.add_competitor(1, [
+        {"keyword": "guanti", "position": 4, "volume": 900},
+        {"keyword": "sciarpe", "position": 15, "volume": 2000},
+        # Più URL per la stessa keyword: conta la posizione migliore
+        {"keyword": "scarpe", "position": 12, "volume": 1000},
+        {"keyword": " Scarpe", "position": 3, "volume": 1000},
+    ])
+    return index
+
+
+def test_classification() -> None:
+    assert _index().summary() == {
+        "keywords": 5,
+        "rows": {"target.it": 3, "a.it": 3, "b.it": 4},
+        "shared": 2,
+        "missing": 2,
+        "weaker": 1,
+        "unique": 1,
+    }
+
+
+def test_ranking_and_scores() -> None:
+    rows = _index().opportunities()
+    # guanti: 900 × CTR(2) × (1 + 2/2); scarpe: 1000 × (CTR(1) − CTR(5)); sciarpe: 2000 × CTR(15) × (1 + 1/2)
+    assert [(r["keyword"], r["gap"], r["score"]) for r in rows] == [
+        ("guanti", "missing", 270.0),
+        ("scarpe", "weaker", 210.0),
+        ("sciarpe", "missing", 30.0),
+    ]
+    assert rows[0] == {
+        "keyword": "guanti", "gap": "missing", "volume": 900, "position": None,
+        "best_position": 2, "best_competitor": "a.it", "competitors": 2, "score": 270.0,
+    }
+    assert (rows[1]["position"], rows[1]["best_competitor"]) == (5, "a.it")
+    # borse (target più in alto) e cappelli (solo target) non sono opportunità
+    assert {r["keyword"] for r in rows}.isdisjoint({"borse", "cappelli"})
+
+
+def test_cutoffs() -> None:
+    index = _index()
+    assert [r["keyword"] for r in index.opportunities(top=2)] == ["guanti", "scarpe"]
+    assert [r["keyword"] for r in index.opportunities(min_volume=1000)] == ["scarpe", "sciarpe"]
+    assert [r["keyword"] for r in index.opportunities(gap="missing")] == ["guanti", "sciarpe"]
+    assert [r["keyword"] for r in index.opportunities(gap="weaker")] == ["scarpe"]
+
+
+def test_ctr_and_limits() -> None:
+    assert (ctr(0), ctr(1), ctr(10), ctr(11), ctr(21)) == (0.0, 0.28, 0.02, 0.01, 0.002)
+    with pytest.raises(ValueError):
+        GapIndex("target.it", [f"c{i}.it" for i in range(MAX_COMPETITORS + 1)])
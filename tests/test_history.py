@@ -0,0 +1,102 @@
+"""Serie storiche: solo i punti mancanti vengono scaricati, quelli passati archiviati."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp.client import SEOZoomClient, SEOZoomError
+from seozoom_mcp.history import date_range
+from seozoom_mcp.units import UnitLedger
+
+
+def _client(monkeypatch: pytest.MonkeyPatch, sim: SEOZoomSimulator) -> SEOZoomClient:
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "0")
+    return SEOZoomClient(cache=None, transport=sim, units=UnitLedger())
+
+
+def test_only_missing_dates_are_fetched(monkeypatch: pytest.MonkeyPatch) -> None:
+    sim = SEOZoomSimulator(latency=0, jitter=0)
+    client = _client(monkeypatch, sim)
+
+    async def run() -> tuple[Any, Any]:
+        try:
+            first = await client.domain_metrics_history_range(["a.it", "b.it"], "2024-01-15", "2024-03-15")
+            second = await client.domain_metrics_history_range(["a.it", "b.it"], "2024-01-15", "2024-05-15")
+        finally:
+            await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["History"] == {"stored": 0, "fetched": 6, "missing": 0}
+    # Gennaio-marzo dall'archivio, solo aprile e maggio scaricati
+    assert second["History"] == {"stored": 6, "fetched": 4, "missing": 0}
+    assert sim.requests["domains/metricshistory"] == 5
+    assert [(r["domain"], r["date"]) for r in second["response"][:2]] == [("a.it", "2024-01-15"), ("a.it", "2024-02-15")]
+
+
+def test_keys_not_returned_are_not_archived(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _client(monkeypatch, SEOZoomSimulator(latency=0, jitter=0))
+    fetch = client.domain_metrics_history
+
+    async def partial(domains: list[str], date: str, db: str | None = None) -> Any:
+        # L'API risponde solo per il primo dominio
+        return await fetch(domains[:1], date, db)
+
+    monkeypatch.setattr(client, "domain_metrics_history", partial)
+
+    async def run() -> Any:
+        try:
+            await client.domain_metrics_history_range(["a.it", "assente.it"], "2024-01-15", "2024-02-15")
+            return client.history.get_many("domain_metrics", "it", ["a.it", "assente.it"], ["2024-01-15", "2024-02-15"])
+        finally:
+            await client.aclose()
+
+    stored = asyncio.run(run())
+    assert {key for key, _ in stored} == {"a.it"}
+
+
+def test_failed_date_keeps_fetched_points(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _client(monkeypatch, SEOZoomSimulator(latency=0, jitter=0))
+    fetch = client.domain_metrics_history
+
+    async def flaky(domains: list[str], date: str, db: str | None = None) -> Any:
+        if date == "2024-02-15":
+            raise SEOZoomError("errore simulato")
+        return await fetch(domains, date, db)
+
+    monkeypatch.setattr(client, "domain_metrics_history", flaky)
+
+    async def run() -> Any:
+        try:
+            with pytest.raises(SEOZoomError):
+                await client.domain_metrics_history_range(["a.it"], "2024-01-15", "2024-03-15")
+            return client.history.get_many("domain_metrics", "it", ["a.it"], date_range("2024-01-15", "2024-03-15"))
+        finally:
+            await client.aclose()
+
+    assert sorted(day for _, day in asyncio.run(run())) == ["2024-01-15", "2024-03-15"]
+
+
+def test_date_range_steps() -> None:
+    assert date_range("2024-01-31", "2024-04-30") == ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"]
+    assert date_range("2024-01-01", "2024-01-15", "week") == ["2024-01-01", "2024-01-08", "2024-01-15"]
+    with pytest.raises(ValueError):
+        date_range("2024-02-01", "2024-01-01")
+
+
+def test_markets_sum_history_counts(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _client(monkeypatch, SEOZoomSimulator(latency=0, jitter=0))
+
+    async def run() -> Any:
+        try:
+            return await client.multi_db(
+                ["it", "es"], lambda d: client.domain_metrics_history_range(["a.it"], "2024-01-15", "2024-02-15", db=d),
+            )
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run())["History"] == {"stored": 0, "fetched": 4, "missing": 0}
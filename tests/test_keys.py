@@ -0,0 +1,59 @@
+"""Pool di API key: instradamento sulle unità residue ed esclusione delle chiavi."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp.client import SEOZoomClient, SEOZoomError
+from seozoom_mcp.keys import quota_exhausted
+from seozoom_mcp.units import UnitLedger
+
+
+def _client(monkeypatch: pytest.MonkeyPatch, transport: httpx.AsyncBaseTransport) -> SEOZoomClient:
+    monkeypatch.setenv("SEOZOOM_API_KEYS", "uno,due")
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "0")
+    return SEOZoomClient(cache=None, transport=transport, units=UnitLedger())
+
+
+def _run(client: SEOZoomClient, calls: Any) -> Any:
+    async def run() -> Any:
+        try:
+            return await calls()
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_quota_messages() -> None:
+    assert quota_exhausted("API units exhausted")
+    assert quota_exhausted("Unità esaurite")
+    assert not quota_exhausted("Forbidden: endpoint not included in your plan")
+
+
+def test_exhausted_key_leaves_the_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    sim = SEOZoomSimulator(latency=0, jitter=0, key_units={"uno": 5, "due": 1_000})
+    client = _client(monkeypatch, sim)
+    result = _run(client, lambda: client.domain_metrics(["a.it"]))
+    assert result["response"]
+    keys = {k["name"]: k for k in client.keys.snapshot()}
+    assert not keys["key1"]["active"] and keys["key2"]["active"]
+
+
+def test_permission_error_keeps_the_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(403, json={"message": "Forbidden: endpoint not included in your plan"})
+
+    client = _client(monkeypatch, httpx.MockTransport(handler))
+
+    async def calls() -> None:
+        with pytest.raises(SEOZoomError, match="plan"):
+            await client.domain_metrics(["a.it"])
+
+    _run(client, calls)
+    assert all(k["active"] and k["error"] is None for k in client.keys.snapshot())
@@ -0,0 +1,48 @@
+"""Indice locale delle keyword: estrazione dalle risposte, filtri, ordinamento e ricerca testuale."""
+
+from __future__ import annotations
+
+import pytest
+
+from seozoom_mcp.keyword_index import KeywordIndex
+
+
+@pytest.fixture
+def index() -> KeywordIndex:
+    index = KeywordIndex(":memory:")
+    index.add("keywords", {"action": "metrics", "db": "it"}, {"response": [
+        {"keyword": "Scarpe Running", "volume": 12_000, "kd": 45, "cpc": 0.8, "intent": "commercial"},
+        {"keyword": "scarpe running donna", "search_volume": 3_000, "difficulty": 22, "intent": "Commercial"},
+        {"keyword": "ricetta pasta_fredda", "volume": 9_000, "kd": 12, "intent": "informational"},
+        {"volume": 1},
+    ]})
+    index.add("domains", {"action": "bestpages", "db": "it"}, {"response": [{"keyword": "ignorata"}]})
+    # Una nuova fonte aggiorna i campi che riporta e mantiene gli altri
+    index.add("urls", {"action": "keywords", "db": "it"}, {"response": [{"keyword": "scarpe running", "volume": 15_000}]})
+    return index
+
+
+def test_rows_and_merge(index: KeywordIndex) -> None:
+    found = index.search("it", sort="keyword")
+    assert found["indexed"] == 3
+    first = found["rows"][1]
+    assert (first["keyword"], first["volume"], first["kd"], first["source"]) == ("scarpe running", 15_000, 45, "urls/keywords")
+    assert index.search("en")["indexed"] == 0
+
+
+def test_where_and_sort_ignore_case(index: KeywordIndex) -> None:
+    found = index.search("it", where=["KD<30", "Intent=commercial"], sort="-Volume")
+    assert [r["keyword"] for r in found["rows"]] == ["scarpe running donna"]
+    assert index.search("it", sort="KD")["rows"][0]["keyword"] == "ricetta pasta_fredda"
+    with pytest.raises(ValueError, match="non filtrabile"):
+        index.search("it", where=["trend>1"])
+    with pytest.raises(ValueError, match="Operatore"):
+        index.search("it", where=["intent>a"])
+
+
+def test_text_search(index: KeywordIndex) -> None:
+    assert index.search("it", text="scarp donna")["matched"] == 1
+    assert index.search("it", text="running")["matched"] == 2
+    # % e _ sono caratteri normali nei filtri "contiene"
+    assert index.search("it", where=["keyword~a_f"])["matched"] == 1
+    assert index.search("it", where=["keyword~%"])["matched"] == 0
@@ -0,0 +1,74 @@
+"""Metriche: istogrammi, contatori, formato Prometheus e misure dei tool via _tool."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp import server
+from seozoom_mcp.client import SEOZoomClient
+from seozoom_mcp.metrics import Histogram, Metrics
+from seozoom_mcp.units import UnitLedger
+
+
+def test_histogram() -> None:
+    hist = Histogram((0.01, 0.1, 1.0))
+    for value in (0.002, 0.002, 0.2, 3.0):
+        hist.observe(value)
+    assert hist.counts == [2, 0, 1, 1]
+    # p50: secondo valore, bucket ≤ 0.01; p99: oltre l'ultimo bucket, vale il massimo
+    assert hist.snapshot() == {"count": 4, "sum": 3.204, "avg": 0.801, "p50": 0.01, "p99": 3.0, "max": 3.0}
+    assert Histogram((1.0,)).snapshot()["p50"] == 0.0
+
+
+def test_prometheus_and_trace(tmp_path: Path) -> None:
+    metrics = Metrics(tmp_path / "trace.jsonl")
+    metrics.observe("tool_seconds", "keyword_metrics", 0.02)
+    metrics.inc("http_requests_total", "200")
+    metrics.inc("units_used_total", "keywords/metrics", 30)
+    metrics.trace("tool", tool="keyword_metrics", seconds=0.02)
+    metrics.close()
+    text = metrics.prometheus()
+    assert "# TYPE seozoom_tool_seconds histogram" in text
+    assert 'seozoom_tool_seconds_bucket{tool="keyword_metrics",le="0.01"} 0' in text
+    assert 'seozoom_tool_seconds_bucket{tool="keyword_metrics",le="0.025"} 1' in text
+    assert 'seozoom_tool_seconds_count{tool="keyword_metrics"} 1' in text
+    assert 'seozoom_http_requests_total{status="200"} 1' in text
+    assert 'seozoom_units_used_total{action="keywords/metrics"} 30' in text
+    event = json.loads((tmp_path / "trace.jsonl").read_text(encoding="utf-8"))
+    assert event["event"] == "tool" and event["tool"] == "keyword_metrics"
+
+
+def test_tool_calls_are_measured(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "0")
+    client = SEOZoomClient(cache=None, transport=SEOZoomSimulator(latency=0, jitter=0), units=UnitLedger())
+    monkeypatch.setattr(server, "_client", client)
+
+    async def run() -> tuple[str, Any]:
+        try:
+            out = await server.keyword_metrics(["pasta", "mare"], format="table")
+            with pytest.raises(ValueError):
+                await server.fetch_page("r_sconosciuto")
+            return out, await server.server_metrics(format="prometheus")
+        finally:
+            await client.aclose()
+
+    out, text = asyncio.run(run())
+    snapshot = json.loads(server.metrics_resource())
+    counters, histograms = snapshot["counters"], snapshot["histograms"]
+    assert counters["tool_calls_total"] == {"fetch_page": 1, "keyword_metrics": 1, "server_metrics": 1}
+    assert counters["tool_errors_total"] == {"fetch_page": 1}
+    assert counters["http_requests_total"] == {"200": 1}
+    assert counters["units_used_total"] == {"keywords/metrics": 20}
+    assert histograms["tool_response_bytes"]["keyword_metrics"]["sum"] == len(out.encode("utf-8"))
+    assert histograms["tool_seconds"]["fetch_page"]["count"] == 1
+    assert {"tool_fmt_seconds", "http_seconds", "http_decode_seconds"} <= histograms.keys()
+    # Il testo Prometheus è prodotto durante la chiamata: non contiene ancora la sua durata
+    assert 'seozoom_tool_calls_total{tool="keyword_metrics"} 1' in text
+    assert 'seozoom_tool_errors_total{tool="fetch_page"} 1' in text
+    assert 'seozoom_tool_seconds_count{tool="server_metrics"}' not in text
@@ -0,0 +1,71 @@
+"""Confronto tra mercati: fan-out per database, unione delle risposte e mercati in errore."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+
+from seozoom_mcp.client import SEOZoomClient, SEOZoomError
+from seozoom_mcp.formatting import compare
+from seozoom_mcp.units import UnitLedger
+
+VOLUMES = {"it": 1000, "es": 400}
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    db = request.url.params["db"]
+    if db not in VOLUMES:
+        return httpx.Response(400, json={"message": f"Database {db} non disponibile"})
+    keywords = request.url.params["keyword"].split("|")
+    rows = [{"keyword": k, "volume": VOLUMES[db] + i, "intent": "commercial"} for i, k in enumerate(keywords)]
+    return httpx.Response(200, json={"UnitsUsed": 10 * len(rows), "UnitsRemaining": 500, "ResultRows": len(rows), "response": rows})
+
+
+def _client(monkeypatch: pytest.MonkeyPatch) -> SEOZoomClient:
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "0")
+    return SEOZoomClient(cache=None, transport=httpx.MockTransport(_handler), units=UnitLedger())
+
+
+def test_failed_market_is_reported(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _client(monkeypatch)
+
+    async def run() -> Any:
+        try:
+            return await client.multi_db(["it", "fr", "es", "it"], lambda d: client.keyword_metrics(["pasta", "mare"], d))
+        finally:
+            await client.aclose()
+
+    data = asyncio.run(run())
+    assert data["Markets"] == {
+        "it": {"UnitsUsed": 20, "ResultRows": 2},
+        "fr": {"Error": "Database fr non disponibile"},
+        "es": {"UnitsUsed": 20, "ResultRows": 2},
+    }
+    assert (data["UnitsUsed"], data["ResultRows"], data["UnitsRemaining"]) == (40, 4, 500)
+    # Righe nell'ordine dei mercati, ognuna con il suo database
+    assert [(r["db"], r["keyword"], r["volume"]) for r in data["response"]] == [
+        ("it", "pasta", 1000), ("it", "mare", 1001), ("es", "pasta", 400), ("es", "mare", 401),
+    ]
+    assert compare(data["response"], ["it", "es"]) == [
+        {"keyword": "pasta", "campo": "volume", "it": 1000, "es": 400},
+        {"keyword": "mare", "campo": "volume", "it": 1001, "es": 401},
+    ]
+
+
+def test_single_market_and_all_failing(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _client(monkeypatch)
+
+    async def run() -> Any:
+        try:
+            with pytest.raises(SEOZoomError, match="non disponibile"):
+                await client.multi_db(["fr", "de"], lambda d: client.keyword_metrics(["pasta"], d))
+            return await client.multi_db("es", lambda d: client.keyword_metrics(["pasta"], d))
+        finally:
+            await client.aclose()
+
+    data = asyncio.run(run())
+    # Un solo mercato: risposta invariata, senza "Markets" né campo "db"
+    assert "Markets" not in data and data["response"] == [{"keyword": "pasta", "volume": 400, "intent": "commercial"}]
@@ -0,0 +1,47 @@
+"""Iteratori paginati: prefetch, fine dei dati, max_rows e max_units come limite rigido."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp.client import SEOZoomClient
+from seozoom_mcp.units import UnitLedger
+
+
+def _client(sim: SEOZoomSimulator) -> SEOZoomClient:
+    return SEOZoomClient(cache=None, transport=sim, units=UnitLedger())
+
+
+def _drain(client: SEOZoomClient, pages: AsyncIterator[Any]) -> list[int]:
+    async def run() -> list[int]:
+        try:
+            return [len(page["response"]) async for page in pages]
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("max_units", [3000, 12_345, 50])
+def test_max_units_is_a_hard_cap(max_units: int) -> None:
+    sim = SEOZoomSimulator(latency=0, jitter=0, domain_rows=50_000)
+    client = _client(sim)
+    sizes = _drain(client, client.domain_ai_keywords_pages("esempio.it", max_units=max_units))
+    # 10 unità per riga: la prima pagina è già ridotta al budget
+    assert sim.units_used <= max_units
+    assert sum(sizes) == max_units // 10
+    assert all(size <= 500 for size in sizes)
+
+
+def test_stops_at_last_page_and_max_rows() -> None:
+    sim = SEOZoomSimulator(latency=0, jitter=0, domain_rows=1_234)
+    client = _client(sim)
+    assert _drain(client, client.domain_keywords_pages("esempio.it", "best")) == [500, 500, 234]
+
+    client = _client(sim)
+    assert _drain(client, client.domain_keywords_pages("esempio.it", "best", page_size=300, max_rows=700)) == [300, 300, 100]
@@ -0,0 +1,48 @@
+"""Prefetch dei progetti: cache calda per project_report e stale-while-revalidate."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp.cache import HOUR, MemoryCache
+from seozoom_mcp.client import SEOZoomClient
+from seozoom_mcp.prefetch import ProjectPrefetcher
+from seozoom_mcp.units import UnitLedger
+
+
+def test_report_hits_prefetched_entries_and_stale_is_refreshed(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    sim = SEOZoomSimulator(latency=0, jitter=0)
+    client = SEOZoomClient(cache=MemoryCache(), transport=sim, units=UnitLedger())
+    prefetcher = ProjectPrefetcher(client, interval=HOUR, lock_path=None)
+    # Fuori dall'event loop attiva solo stale-while-revalidate, senza ciclo periodico
+    prefetcher.start()
+
+    async def run() -> tuple[Any, Any, Any]:
+        try:
+            stats = await prefetcher.refresh()
+            assert stats["errors"] == stats["skipped"] == 0
+            warm = sim.requests.copy()
+            report = await client.project_report("190000")
+            # Tutte le fonti del report dalla cache del prefetch
+            assert sim.requests == warm and report["UnitsUsed"] == 0
+
+            now[0] += HOUR + 60
+            stale = await client.project_overview("190000")
+            await asyncio.gather(*client._revalidating.values())
+            assert sim.requests["projects/overview"] == warm["projects/overview"] + 1
+            return report, stale, await client.project_overview("190000")
+        finally:
+            await client.aclose()
+
+    report, stale, fresh = asyncio.run(run())
+    assert len(report["response"]["pages"]) > 0 and "error" not in str(report["Report"])
+    assert stale["Cache"]["stale"] is True
+    assert "stale" not in fresh["Cache"] and fresh["Cache"]["age"] == 0
+    assert client.units.session_by_tool["prefetch"] > 0
@@ -0,0 +1,78 @@
+"""Righe compatte e decodifica in streaming: ogni punto di taglio dei blocchi dà lo stesso risultato."""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+
+import pytest
+
+from seozoom_mcp.records import Records, StreamDecoder
+
+BODY = {
+    "UnitsUsed": 30,
+    "Nota": "città \"più\" ✓",
+    "response": [
+        {"keyword": "città", "volume": 12345, "cpc": -1.5e3, "trend": [1, 2, 3], "ai": True, "url": None},
+        {"keyword": "caffè", "volume": 7, "cpc": 0.25, "intent": "informational"},
+        {"keyword": "x", "volume": 2**70, "cpc": 3},
+    ],
+    "ResultRows": 3,
+}
+
+
+def _decode(chunks: list[bytes]) -> object:
+    decoder = StreamDecoder()
+    for chunk in chunks:
+        decoder.feed(chunk)
+    data = decoder.close()
+    assert decoder.bytes == sum(map(len, chunks))
+    return data
+
+
+def _plain(data: object) -> object:
+    if isinstance(data, dict) and isinstance(data.get("response"), Records):
+        return {**data, "response": list(data["response"])}
+    return data
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_split_point(indent: int | None) -> None:
+    raw = json.dumps(BODY, ensure_ascii=False, indent=indent).encode()
+    for cut in range(1, len(raw)):
+        # Numeri, stringhe, parole chiave e caratteri UTF-8 spezzati tra due blocchi
+        assert _plain(_decode([raw[:cut], raw[cut:]])) == BODY, raw[:cut]
+
+
+def test_random_chunks() -> None:
+    rng = random.Random(0)
+    body = {"response": [{"keyword": f"kw {i}", "volume": i * 1001, "cpc": i / 7} for i in range(500)], "UnitsUsed": 5000}
+    raw = json.dumps(body).encode()
+    for _ in range(20):
+        cuts = sorted(rng.sample(range(1, len(raw)), 40))
+        chunks = [raw[a:b] for a, b in zip([0, *cuts], [*cuts, len(raw)])]
+        data = _decode(chunks)
+        assert isinstance(data["response"], Records)
+        assert _plain(data) == body
+
+
+def test_non_object_rows_and_bodies() -> None:
+    assert _decode([b'{"response": [1, {"a": 2}], "x": 1}']) == {"response": [1, {"a": 2}], "x": 1}
+    assert _decode([b"[1,", b" 2]"]) == [1, 2]
+    with pytest.raises(ValueError):
+        _decode([b'{"response": [{"a": 1}'])
+    with pytest.raises(ValueError):
+        _decode([b'{"a": 1} x'])
+
+
+def test_records_columns() -> None:
+    rows = [{"a": 1, "b": "x"}, {"a": 2.5}, {"b": "x", "c": True}]
+    records = Records(rows)
+    assert list(records) == rows and records[-1] == rows[-1] and records[:2] == rows[:2]
+    with pytest.raises(IndexError):
+        records[3]
+    # Le stringhe ripetute sono condivise, le colonne numeriche sono array compatti
+    compact = Records({"keyword": f"kw{i}", "intent": "commercial", "volume": i} for i in range(1000))
+    assert compact[5]["intent"] is compact[900]["intent"]
+    assert compact.nbytes < sum(sys.getsizeof(r) for r in compact)
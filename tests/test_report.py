@@ -0,0 +1,93 @@
+"""Report compositi: unione delle righe tra fonti, sezioni mancanti e fonti in errore."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp.client import SEOZoomClient, SEOZoomError
+from seozoom_mcp.report import build_report, merge_rows
+from seozoom_mcp.units import UnitLedger
+
+
+def test_merge_rows_joins_colliding_keys() -> None:
+    merged = merge_rows({
+        "keywords": [{"keyword": "Pasta", "volume": 10, "position": None}, {"keyword": "mare", "volume": 5}],
+        "intent_gap": [{"keyword": " pasta", "position": 3, "volume": 99}, {"keyword": "roma"}, {"keyword": None, "x": 1}, "testo"],
+    }, "keyword")
+    # Vince il primo valore non nullo; le righe senza chiave restano invariate
+    assert merged == [
+        {"keyword": "Pasta", "volume": 10, "position": 3, "sources": ["keywords", "intent_gap"]},
+        {"keyword": "mare", "volume": 5, "sources": ["keywords"]},
+        {"keyword": "roma", "sources": ["intent_gap"]},
+        {"keyword": None, "x": 1},
+        "testo",
+    ]
+    # Una sola fonte: nessun campo "sources", duplicati comunque uniti
+    assert merge_rows({"pages": [{"url": "/a", "x": 1}, {"url": "/A", "y": 2}]}, "url") == [{"url": "/a", "x": 1, "y": 2}]
+    assert merge_rows({"a": [{"k": 1}], "b": [{"k": 1}]}, None) == [{"k": 1}, {"k": 1}]
+
+
+def test_build_report_sections_and_errors() -> None:
+    report = build_report(
+        {
+            "overview": ("summary", {"UnitsUsed": 10, "UnitsRemaining": 900, "response": {"domain": "a.it", "za": None}}),
+            "authority": ("summary", {"UnitsUsed": 5, "UnitsRemaining": 895, "response": [{"za": 40, "domain": "b.it"}]}),
+            "keywords": ("keywords", {"UnitsUsed": 20, "UnitsRemaining": 880, "response": [
+                {"keyword": "b", "volume": 1}, {"keyword": "a", "volume": 3}, {"keyword": "c", "volume": 2},
+            ]}),
+            # Risposta dalla cache: le unità rimanenti riportate non sono attuali
+            "pages": ("pages", {"UnitsRemaining": 10, "Cache": True, "response": None}),
+        },
+        {"competitors": "HTTP 500"},
+        top=2,
+        sort={"keywords": "-volume"},
+    )
+    assert report == {
+        "UnitsUsed": 35,
+        "UnitsRemaining": 880,
+        "ResultRows": 3,
+        "Report": {
+            "overview": {"rows": 1},
+            "authority": {"rows": 1},
+            "keywords": {"rows": 3},
+            "pages": {"rows": 0},
+            "competitors": {"error": "HTTP 500"},
+        },
+        "response": {
+            "summary": {"domain": "a.it", "za": 40},
+            "keywords": [{"keyword": "a", "volume": 3}, {"keyword": "c", "volume": 2}],
+            "pages": [],
+        },
+    }
+
+
+def test_partial_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "0")
+    client = SEOZoomClient(cache=None, transport=SEOZoomSimulator(latency=0, jitter=0), units=UnitLedger())
+
+    async def broken(*args: Any, **kwargs: Any) -> Any:
+        raise SEOZoomError("HTTP 500: errore simulato")
+
+    monkeypatch.setattr(client, "url_intent_gap", broken)
+
+    async def run() -> Any:
+        try:
+            report = await client.url_report("https://www.esempio.it/pagina/", top=5)
+            for name in ("url_page_authority", "url_metrics", "url_keywords"):
+                monkeypatch.setattr(client, name, broken)
+            with pytest.raises(SEOZoomError, match="intent_gap: HTTP 500"):
+                await client.url_report("https://www.esempio.it/pagina/")
+            return report
+        finally:
+            await client.aclose()
+
+    report = asyncio.run(run())
+    assert report["Report"]["intent_gap"] == {"error": "HTTP 500: errore simulato"}
+    assert report["Report"]["keywords"]["rows"] > 0 and report["UnitsUsed"] > 0
+    assert report["response"]["summary"] and 0 < len(report["response"]["keywords"]) <= 5
+    # Rimasta una sola fonte nella sezione: nessun campo "sources"
+    assert not any("sources" in row for row in report["response"]["keywords"])
@@ -0,0 +1,89 @@
+"""Risultati voluminosi: handle lato server, pagine con cursore, limite di memoria e scadenza."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp import results as results_module
+from seozoom_mcp import server
+from seozoom_mcp.client import SEOZoomClient
+from seozoom_mcp.results import ResultStore
+from seozoom_mcp.units import UnitLedger
+
+ROWS = [{"keyword": f"kw {i}", "volume": i} for i in range(120)]
+
+
+def test_pages_and_cursor() -> None:
+    store = ResultStore()
+    handle, kept = store.put(ROWS)
+    assert kept == 120 and handle is not None and handle.startswith("r_")
+    assert store.page(handle, 0, 50) == (ROWS[:50], 120)
+    assert store.page(handle, 100, 50) == (ROWS[100:], 120)
+    assert store.page(handle, 500) == ([], 120)
+    with pytest.raises(ValueError, match="non trovato"):
+        store.page("r_sconosciuto")
+    with pytest.raises(ValueError):
+        store.page(handle, -1)
+
+
+def test_memory_limit_and_expiry(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(results_module.time, "time", lambda: now[0])
+    probe = ResultStore()
+    probe.put(ROWS)
+    store = ResultStore(max_bytes=2 * probe.bytes, ttl=60)
+    (first, _), (second, _) = store.put(ROWS), store.put(ROWS)
+    # Un accesso rinnova la scadenza e sposta il risultato in fondo alla coda LRU
+    now[0] += 30
+    store.page(first)
+    third, _ = store.put(ROWS)
+    assert len(store) == 2 and store.bytes == 2 * probe.bytes
+    with pytest.raises(ValueError):
+        store.page(second)
+    now[0] += 61
+    with pytest.raises(ValueError):
+        store.page(third)
+    # Da solo supera il limite: restano le prime righe che ci stanno
+    small = ResultStore(max_bytes=probe.bytes // 2)
+    handle, kept = small.put(ROWS)
+    assert 0 < kept < len(ROWS) and small.bytes <= small.max_bytes
+    assert small.page(handle, 0, 500) == (ROWS[:kept], kept)
+    assert ResultStore(max_bytes=50).put(ROWS) == (None, 0)
+
+
+def test_tool_returns_handle_for_large_results(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEOZOOM_RESULT_MAX_BYTES", "10000")
+    monkeypatch.setattr(server, "_results", None)
+    monkeypatch.setattr(server, "_client", SEOZoomClient(
+        cache=None, transport=SEOZoomSimulator(latency=0, jitter=0), units=UnitLedger(),
+    ))
+
+    async def run() -> tuple[str, str]:
+        try:
+            first = await server.project_keywords("190001", format="compact")
+            handle = re.search(r'handle="(r_[\w-]+)"', first).group(1)
+            return first, await server.fetch_page(handle, cursor=50, size=10, fields=["keyword"])
+        finally:
+            await server._client.aclose()
+
+    first, page = asyncio.run(run())
+    assert "mostrate le prime 50" in first
+    assert page.startswith("[Risultato r_") and "Righe 51-60 di" in page and "Prossimo cursore: 60" in page
+
+
+def test_oversize_result_is_truncated_with_notice(monkeypatch: pytest.MonkeyPatch) -> None:
+    rows = [{"keyword": f"parola chiave {i}", "volume": i} for i in range(2000)]
+    monkeypatch.setattr(server, "_results", ResultStore(max_bytes=20_000, threshold=1000))
+    out = server._paged(rows, "compact")
+    kept = int(re.search(r"Conservate solo le prime (\d+) righe", out).group(1))
+    assert 50 < kept < len(rows) and f"le altre {len(rows) - kept}" in out
+    # Mai l'intero risultato nella risposta
+    assert '"parola chiave 1999"' not in out and len(out) < 10_000
+
+    monkeypatch.setattr(server, "_results", ResultStore(max_bytes=2_000, threshold=1000))
+    out = server._paged(rows, "compact")
+    assert "non sono disponibili" in out and "fetch_page" not in out and len(out) < 10_000
@@ -0,0 +1,68 @@
+"""Avvio del server: l'import resta leggero e il client API viene creato solo al primo tool."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+# Soglia (ms) per l'import di seozoom_mcp.server, compreso l'SDK MCP
+MAX_IMPORT_MS = float(os.environ.get("SEOZOOM_TEST_MAX_IMPORT_MS", "3000"))
+
+# Moduli del pacchetto che l'import del server può caricare
+LIGHT_MODULES = {"seozoom_mcp", "seozoom_mcp.formatting", "seozoom_mcp.metrics", "seozoom_mcp.server"}
+
+PROBE = textwrap.dedent("""
+    import asyncio, json, sys, time
+
+    import httpx
+
+    clients = []
+    init = httpx.AsyncClient.__init__
+
+    def recording(self, *args, **kwargs):
+        clients.append(1)
+        init(self, *args, **kwargs)
+
+    httpx.AsyncClient.__init__ = recording
+
+    start = time.perf_counter()
+    import seozoom_mcp.server as server
+    import_ms = (time.perf_counter() - start) * 1000
+    tools = asyncio.run(server.mcp.list_tools())
+    print(json.dumps({
+        "import_ms": import_ms,
+        "tools": len(tools),
+        "modules": sorted(m for m in sys.modules if m.startswith("seozoom_mcp")),
+        "sqlite3": "sqlite3" in sys.modules,
+        "http_clients": len(clients),
+        "client": server._client is not None,
+    }))
+""")
+
+
+def _probe() -> dict:
+    env = {k: v for k, v in os.environ.items() if k != "SEOZOOM_API_KEY"}
+    src = os.path.join(os.path.dirname(__file__), os.pardir, "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.abspath(src), env.get("PYTHONPATH")]))
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, env=env, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_is_lazy() -> None:
+    result = _probe()
+    # Elenco dei tool senza API key, senza client HTTP né moduli del client
+    assert result["tools"] > 0
+    assert not result["client"]
+    assert result["http_clients"] == 0
+    assert set(result["modules"]) <= LIGHT_MODULES, result["modules"]
+    assert not result["sqlite3"]
+
+
+def test_import_time() -> None:
+    # Il primo avvio riempie la cache del bytecode: si misura il secondo
+    _probe()
+    result = _probe()
+    assert result["import_ms"] < MAX_IMPORT_MS, f"import in {result['import_ms']:.0f} ms"
@@ -0,0 +1,140 @@
+"""AIMD e retry del client contro il simulatore che risponde 429 con Retry-After."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from simulator import SEOZoomSimulator
+
+from seozoom_mcp import client as client_module
+from seozoom_mcp.client import SEOZoomClient
+from seozoom_mcp.limiter import AdaptiveLimiter, backoff_delay, retry_after
+from seozoom_mcp.units import UnitLedger
+
+# Valore di Retry-After inviato dal simulatore con i 429
+SIMULATOR_RETRY_AFTER = 0.1
+
+
+@pytest.fixture
+def delays(monkeypatch: pytest.MonkeyPatch) -> list[tuple[int, float | None, float]]:
+    """Registra (tentativo, Retry-After, attesa) di ogni backoff del client."""
+    calls: list[tuple[int, float | None, float]] = []
+
+    def recording(attempt: int, hint: float | None = None) -> float:
+        delay = backoff_delay(attempt, hint)
+        calls.append((attempt, hint, delay))
+        return delay
+
+    monkeypatch.setattr(client_module, "backoff_delay", recording)
+    return calls
+
+
+def _client(monkeypatch: pytest.MonkeyPatch, sim: SEOZoomSimulator) -> SEOZoomClient:
+    monkeypatch.setenv("SEOZOOM_LIMITER_INITIAL", "8")
+    monkeypatch.setenv("SEOZOOM_MAX_CONCURRENCY", "16")
+    monkeypatch.setenv("SEOZOOM_MAX_RETRIES", "10")
+    # Richieste singole: il coalescer le unirebbe in una
+    monkeypatch.setenv("SEOZOOM_BATCH_WINDOW_MS", "0")
+    return SEOZoomClient(cache=None, transport=sim, units=UnitLedger())
+
+
+def test_throttling_halves_limit_then_recovers(monkeypatch: pytest.MonkeyPatch, delays: list) -> None:
+    sim = SEOZoomSimulator(latency=0.02, jitter=0, max_concurrency=2)
+    client = _client(monkeypatch, sim)
+    limiter = client.keys.keys[0].limiter
+    limits: list[float] = []
+    on_throttle = limiter.on_throttle
+
+    def recording() -> None:
+        on_throttle()
+        limits.append(limiter.limit)
+
+    monkeypatch.setattr(limiter, "on_throttle", recording)
+
+    async def run() -> None:
+        try:
+            # Raffica oltre la concorrenza accettata dal simulatore
+            burst = await asyncio.gather(*(client.domain_metrics([f"raffica{i}.it"]) for i in range(12)))
+            assert all(r["response"] for r in burst)
+            throttled = limiter.limit
+            # Richieste in sequenza, senza 429: il limite torna a crescere
+            for i in range(20):
+                await client.domain_metrics([f"sequenza{i}.it"])
+            assert limiter.limit > throttled
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    assert sim.status[429] > 0
+    assert limits and min(limits) < 8
+    assert limiter.throttled == sim.status[429]
+    # Ogni 429 è stato ritentato fino al successo
+    assert sim.status[200] == 32
+    assert len(delays) == sim.status[429]
+
+
+def test_retry_after_is_honoured(monkeypatch: pytest.MonkeyPatch, delays: list) -> None:
+    sim = SEOZoomSimulator(latency=0.01, jitter=0, throttle_rate=0.5, seed=1)
+    client = _client(monkeypatch, sim)
+
+    async def run() -> float:
+        start = time.monotonic()
+        try:
+            for i in range(10):
+                await client.domain_metrics([f"dominio{i}.it"])
+        finally:
+            await client.aclose()
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    assert sim.status[429] > 0
+    assert delays and all(hint == SIMULATOR_RETRY_AFTER == delay for _, hint, delay in delays)
+    # Le attese sono avvenute davvero: almeno Retry-After per ogni 429
+    assert elapsed >= SIMULATOR_RETRY_AFTER * sim.status[429]
+
+
+def test_retries_exhausted_raise(monkeypatch: pytest.MonkeyPatch, delays: list) -> None:
+    sim = SEOZoomSimulator(latency=0, jitter=0, throttle_rate=1.0)
+    client = _client(monkeypatch, sim)
+    monkeypatch.setattr(client, "_max_retries", 2)
+
+    async def run() -> None:
+        try:
+            with pytest.raises(client_module.SEOZoomError):
+                await client.domain_metrics(["esempio.it"])
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    # Primo tentativo più due retry, con un'attesa tra uno e l'altro
+    assert sim.status[429] == 3
+    assert [attempt for attempt, _, _ in delays] == [0, 1]
+
+
+def test_aimd_limits() -> None:
+    async def run() -> None:
+        limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=10)
+        limiter.on_throttle()
+        assert limiter.limit == 4
+        # Un secondo segnale entro una latenza media è lo stesso picco
+        limiter.on_success(10.0)
+        assert limiter.limit == 4.25
+        limiter.on_throttle()
+        assert limiter.limit == 4.25
+        limiter.latency = 0.0
+        for _ in range(100):
+            limiter.on_success(0.0)
+        assert limiter.limit == 10
+
+    asyncio.run(run())
+
+
+def test_retry_after_parsing() -> None:
+    assert retry_after("2") == 2.0
+    assert retry_after("-1") == 0.0
+    assert retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after("poi") is None
+    assert retry_after(None) is None
+    assert backoff_delay(0, 120.0) == 30.0
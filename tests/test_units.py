@@ -0,0 +1,38 @@
+"""Registro unità: stime prima dell'invio e salvataggio differito su disco."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from seozoom_mcp.units import UnitLedger, estimate_rows
+
+
+def test_estimate_rows_without_limit() -> None:
+    assert estimate_rows("domains", {"action": "authority", "domain": "a.it|b.it"}) == 2
+    assert estimate_rows("domains", {"action": "competitor", "domain": "a.it|b.it", "limit": 5}) == 10
+    # project_keywords non ha limit: si stima come le altre pagine di progetto, non una riga
+    assert estimate_rows("projects", {"action": "keywords", "id": "1"}) == 20
+    ledger = UnitLedger(session_budget=10_000)
+    assert ledger.estimate("projects", {"action": "keywords", "id": "1"}) == 200
+    ledger.check("project_report", sum(
+        ledger.estimate("projects", {"action": action, "id": "1", "limit": limit})
+        for action, limit in [("overview", None), ("keywords", None), ("bestpages", 20), ("winnerpages", 20)]
+    ))
+
+
+def test_record_defers_save(tmp_path: Path) -> None:
+    path = tmp_path / "units.json"
+    ledger = UnitLedger(path, save_interval=3600)
+    ledger.record("tool", "domains", {"action": "metrics"}, {"UnitsUsed": 20, "UnitsRemaining": 980, "ResultRows": 2})
+    assert not path.exists()
+    assert not ledger.flush_due()
+    ledger.flush()
+    assert json.loads(path.read_text())["total_by_tool"] == {"tool": 20}
+    # Un secondo registro sullo stesso file somma i propri consumi
+    other = UnitLedger(path, save_interval=0)
+    other.record("tool", "domains", {"action": "metrics"}, {"UnitsUsed": 10, "ResultRows": 1})
+    assert other.flush_due()
+    other.flush()
+    assert json.loads(path.read_text())["total_used"] == 30
+    assert not other.flush_due()
@@ -0,0 +1,71 @@
+"""Volatilità della SERP e movimenti di posizione, con valori calcolati a mano."""
+
+from __future__ import annotations
+
+from seozoom_mcp.volatility import SerpSeries, serp_results
+
+DATES = ["2024-01-01", "2024-02-01", "2024-03-01"]
+
+
+def _series() -> SerpSeries:
+    # depth 3: un'URL assente conta come posizione 4, lo spostamento massimo per passo è 3 × 4 = 12
+    series = SerpSeries(list(reversed(DATES)), depth=3)
+    series.add("scarpe", "2024-01-01", [("a", 1), ("b", 2), ("c", 3), ("e", 5)])
+    series.add("scarpe", "2024-02-01", [("b", 1), ("a", 2), ("d", 3), ("b", 3)])
+    series.add("scarpe", "2024-03-01", [("b", 1), ("a", 2), ("c", 3)])
+    # Date fuori dalla serie ignorate
+    series.add("scarpe", "2024-04-01", [("z", 1)])
+    # Un solo snapshot
+    series.add("borse", "2024-01-01", [("x", 1)])
+    # Keyword senza snapshot a febbraio
+    series.add("guanti", "2024-01-01", [("u", 1)])
+    series.add("guanti", "2024-03-01", [("u", 3)])
+    # Keyword mai presente nei risultati
+    series.add("assente", "2024-01-01", [])
+    series.add("assente", "2024-02-01", [])
+    return series
+
+
+def test_keyword_volatility() -> None:
+    summary, _ = _series().analyze()
+    by_keyword = {row["keyword"]: row for row in summary}
+    # scarpe: a [1,2,2], b [2,1,1], c [3,4,3], d [4,3,4] → spostamenti 4 e 2 su 12 per passo
+    assert by_keyword["scarpe"] == {
+        "keyword": "scarpe", "snapshots": 3, "volatility": 25.0, "max_step_volatility": 33.3,
+        "entries": 2, "exits": 2, "stable_urls": 2,
+    }
+    assert by_keyword["borse"] == {
+        "keyword": "borse", "snapshots": 1, "volatility": 0.0, "max_step_volatility": 0.0,
+        "entries": 0, "exits": 0, "stable_urls": 1,
+    }
+    # guanti: 1 → 3 tra gennaio e marzo, un solo passo
+    assert (by_keyword["guanti"]["snapshots"], by_keyword["guanti"]["volatility"]) == (2, 16.7)
+    assert by_keyword["assente"] == {
+        "keyword": "assente", "snapshots": 2, "volatility": 0.0, "max_step_volatility": 0.0,
+        "entries": 0, "exits": 0, "stable_urls": 0,
+    }
+
+
+def test_url_movers() -> None:
+    series = _series()
+    # Prima posizione per URL e data, solo entro depth
+    assert len(series) == 12 and "e" not in series.urls and "z" not in series.urls
+    _, movers = series.analyze(top=3)
+    assert [(m["keyword"], m["url"]) for m in movers] == [("guanti", "u"), ("scarpe", "c"), ("scarpe", "d")]
+    assert movers[0] == {
+        "keyword": "guanti", "url": "u", "start": 1, "end": 3, "delta": -2, "best": 1, "worst": 3,
+        "snapshots": 2, "entries": 0, "exits": 0, "movement": 2,
+    }
+    assert movers[2] == {
+        "keyword": "scarpe", "url": "d", "start": None, "end": None, "delta": 0, "best": 3, "worst": 3,
+        "snapshots": 1, "entries": 1, "exits": 1, "movement": 2,
+    }
+    single = {m["url"]: m for m in series.analyze(top=10)[1]}["x"]
+    assert (single["start"], single["end"], single["delta"], single["movement"]) == (1, 1, 0, 0)
+
+
+def test_serp_results() -> None:
+    record = {"keyword": "k", "results": [{"url": "a", "position": "2"}, {"url": "", "position": 1}, {"url": "b"}, "x"]}
+    assert serp_results(record) == [("a", 2)]
+    assert serp_results({"url": "c", "position": 4}) == [("c", 4)]
+    assert serp_results(None) == []